@@ -0,0 +1,61 @@
+"""Per-call cost of snapshotting request kwargs for each capture mode.
+
+``legacy`` reproduces the previous behaviour (two deep copies per call).
+Run with ``python benchmarks/bench_capture.py``; prints one JSON object per
+(payload size, mode).
+"""
+
+from __future__ import annotations
+
+import copy
+import json
+import sys
+import timeit
+import tracemalloc
+
+from payloads import chat_request
+
+from pulse_sdk.capture import CAPTURE_MODES, snapshot_request
+from pulse_sdk.trace import extract_pulse_params
+
+PAYLOAD_TOKENS = (100, 2_000, 20_000, 200_000)
+
+
+def legacy(payload):
+    clean = copy.deepcopy(payload)
+    clean.pop("pulse_session_id", None)
+    return copy.deepcopy(clean)
+
+
+def capture(mode):
+    def run(payload):
+        clean, _, _ = extract_pulse_params(payload)
+        return snapshot_request(clean, mode)
+
+    return run
+
+
+def measure(func, payload) -> dict:
+    timer = timeit.Timer(lambda: func(payload))
+    loops, _ = timer.autorange()
+    best = min(timer.repeat(repeat=5, number=loops)) / loops
+
+    tracemalloc.start()
+    func(payload)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"us_per_call": round(best * 1e6, 2), "peak_alloc_bytes": peak}
+
+
+def main() -> None:
+    for tokens in PAYLOAD_TOKENS:
+        turns = max(4, tokens // 500)
+        payload = {**chat_request(tokens, turns=turns), "pulse_session_id": "bench"}
+        variants = [("legacy", legacy)] + [(m, capture(m)) for m in CAPTURE_MODES]
+        for name, func in variants:
+            result = {"approx_tokens": tokens, "mode": name, **measure(func, payload)}
+            sys.stdout.write(json.dumps(result) + "\n")
+
+
+if __name__ == "__main__":
+    main()
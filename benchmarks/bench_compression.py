@@ -0,0 +1,50 @@
+"""Bytes and CPU per batch for each compression codec.
+
+Run with ``python benchmarks/bench_compression.py``; prints one JSON object
+per (payload, codec, level) combination.
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+import time
+
+from payloads import chat_batch
+
+from pulse_sdk.compression import Compressor, zstd_available
+
+BATCH_SIZE = 10
+PAYLOAD_TOKENS = (200, 2_000, 20_000)
+CODECS = [("none", None), ("gzip", 1), ("gzip", 6), ("gzip", 9)]
+if zstd_available():
+    CODECS += [("zstd", 1), ("zstd", 3), ("zstd", 10)]
+
+
+def measure(body: bytes, codec: str, level, repeat: int = 5) -> dict:
+    compressor = Compressor(codec, level, min_bytes=0)
+    start = time.process_time()
+    for _ in range(repeat):
+        encoded, _ = compressor.encode(body)
+    cpu_ms = (time.process_time() - start) * 1000 / repeat
+    return {
+        "codec": codec,
+        "level": level,
+        "raw_bytes": len(body),
+        "sent_bytes": len(encoded),
+        "ratio": round(len(body) / len(encoded), 2),
+        "cpu_ms_per_batch": round(cpu_ms, 3),
+    }
+
+
+def main() -> None:
+    for tokens in PAYLOAD_TOKENS:
+        body = json.dumps(chat_batch(BATCH_SIZE, tokens)).encode("utf-8")
+        for codec, level in CODECS:
+            result = measure(body, codec, level)
+            result.update({"batch_size": BATCH_SIZE, "approx_tokens": tokens})
+            sys.stdout.write(json.dumps(result) + "\n")
+
+
+if __name__ == "__main__":
+    main()
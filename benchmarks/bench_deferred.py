@@ -0,0 +1,78 @@
+"""Calling-thread overhead of a traced call, built inline vs deferred.
+
+A stub OpenAI client returns a canned response instantly, so the difference
+between the raw and the observed call is what the SDK costs the caller. The
+flush worker is stopped and the buffer drained between rounds, so deferred
+building is not measured here (it runs on the worker).
+Run with ``python benchmarks/bench_deferred.py``; prints one JSON object per
+(payload size, mode).
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+import timeit
+from types import SimpleNamespace
+
+from payloads import chat_request
+
+from pulse_sdk import InMemoryTransport, Provider, init_pulse, observe, shutdown, state
+
+PAYLOAD_TOKENS = (100, 2_000, 20_000, 200_000)
+CALLS = 200
+
+RESPONSE = SimpleNamespace(
+    id="chatcmpl-1",
+    model="gpt-4o-mini-2024-07-18",
+    choices=[
+        SimpleNamespace(message=SimpleNamespace(content="ok"), finish_reason="stop")
+    ],
+    usage=SimpleNamespace(prompt_tokens=1000, completion_tokens=20),
+)
+
+
+def stub_client():
+    create = lambda **kwargs: RESPONSE  # noqa: E731
+    return SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=create))
+    )
+
+
+def per_call_us(create, payload) -> float:
+    def run():
+        for _ in range(CALLS):
+            create(**payload)
+        state._buffer.drain()
+
+    return min(timeit.repeat(run, number=1, repeat=7)) / CALLS * 1e6
+
+
+def main() -> None:
+    for tokens in PAYLOAD_TOKENS:
+        payload = chat_request(tokens, turns=max(4, tokens // 500))
+        raw = per_call_us(stub_client().chat.completions.create, payload)
+        for mode, deferred in (("inline", False), ("deferred", True)):
+            init_pulse(
+                {
+                    "api_key": "pulse_sk_bench",
+                    "transport": InMemoryTransport(),
+                    "flush_interval": 3_600_000,
+                    "max_buffer_size": CALLS,
+                    "defer_trace_build": deferred,
+                }
+            )
+            state.stop_flush_worker()
+            client = observe(stub_client(), Provider.OPENAI)
+            traced = per_call_us(client.chat.completions.create, payload)
+            shutdown()
+            result = {
+                "approx_tokens": tokens,
+                "mode": mode,
+                "overhead_us_per_call": round(traced - raw, 2),
+            }
+            sys.stdout.write(json.dumps(result) + "\n")
+
+
+if __name__ == "__main__":
+    main()
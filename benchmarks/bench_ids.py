@@ -0,0 +1,58 @@
+"""Cost of trace ids and timestamps: the previous functions vs the current ones.
+
+Run with ``python benchmarks/bench_ids.py``; prints one JSON object per
+(operation, implementation) with the time per call in nanoseconds.
+"""
+
+from __future__ import annotations
+
+import datetime
+import json
+import sys
+import time
+import timeit
+import uuid
+
+from pulse_sdk.clock import format_timestamp, wall_time
+from pulse_sdk.ids import generate_trace_id
+
+CALLS = 100_000
+
+
+def uuid4_id() -> str:
+    return str(uuid.uuid4())
+
+
+def utcnow_timestamp() -> str:
+    return datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+
+def fromtimestamp_format(epoch: float) -> str:
+    return datetime.datetime.fromtimestamp(epoch, datetime.timezone.utc).isoformat()
+
+
+CASES = (
+    ("trace_id", "uuid4", uuid4_id),
+    ("trace_id", "uuid7", generate_trace_id),
+    ("now", "time.time", time.time),
+    ("now", "wall_time", wall_time),
+    ("timestamp", "datetime.now", utcnow_timestamp),
+    ("timestamp", "wall_time+format", lambda: format_timestamp(wall_time())),
+    ("format", "fromtimestamp", lambda: fromtimestamp_format(1_700_000_000.5)),
+    ("format", "format_timestamp", lambda: format_timestamp(1_700_000_000.5)),
+)
+
+
+def main() -> None:
+    for operation, implementation, func in CASES:
+        best = min(timeit.repeat(func, number=CALLS, repeat=5))
+        result = {
+            "operation": operation,
+            "implementation": implementation,
+            "ns_per_call": round(best / CALLS * 1e9, 1),
+        }
+        sys.stdout.write(json.dumps(result) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""Cost of resolving model strings to prices.
+
+``unseen`` resolves a distinct dated or vendor-prefixed string per call (the
+high-cardinality case, with cache eviction); ``cached`` repeats one string.
+Run with ``python benchmarks/bench_pricing.py``; prints one JSON object per
+case with the time per call in nanoseconds.
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+import time
+
+from pulse_sdk.pricing import PricingIndex
+
+CALLS = 100_000
+
+
+def unseen_models(count: int):
+    prefixes = ("gpt-4o-mini", "openrouter/anthropic/claude-3.5-sonnet", "acme")
+    return [f"{prefixes[i % 3]}-{20_000_000 + i}" for i in range(count)]
+
+
+def per_call_ns(index: PricingIndex, models) -> float:
+    start = time.perf_counter()
+    for model in models:
+        index.cost(model, 1000, 100)
+    return (time.perf_counter() - start) / len(models) * 1e9
+
+
+def main() -> None:
+    cases = (
+        ("unseen", unseen_models(CALLS)),
+        ("cached", ["gpt-4o-mini-2024-07-18"] * CALLS),
+    )
+    for case, models in cases:
+        index = PricingIndex()
+        result = {"case": case, "ns_per_call": round(per_call_ns(index, models), 1)}
+        sys.stdout.write(json.dumps(result) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Memory held by buffered traces: wire-shaped dicts vs slotted records.
+
+Builds 10k traces from the same normalized response and measures what they
+keep alive with ``tracemalloc``. Request bodies are shared across traces, so
+the numbers show the per-trace structure rather than the prompt text (which
+is identical in both forms).
+Run with ``python benchmarks/bench_records.py``; prints one JSON object per
+form.
+"""
+
+from __future__ import annotations
+
+import gc
+import json
+import sys
+import tracemalloc
+
+from payloads import chat_request
+
+from pulse_sdk import Provider
+from pulse_sdk.trace import build_record, build_trace
+from pulse_sdk.types import NormalizedResponse
+
+TRACES = 10_000
+
+RESPONSE = NormalizedResponse(
+    model="gpt-4o-mini-2024-07-18",
+    content="Your order shipped yesterday and should arrive on Friday.",
+    input_tokens=1000,
+    output_tokens=20,
+    finish_reason="stop",
+    provider_request_id="chatcmpl-1",
+)
+
+
+def measure(build) -> int:
+    request = chat_request(500)
+    gc.collect()
+    tracemalloc.start()
+    traces = [
+        build(request, RESPONSE, Provider.OPENAI, 120.0, session_id="s-1")
+        for _ in range(TRACES)
+    ]
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del traces
+    return held
+
+
+def main() -> None:
+    for form, build in (("dict", build_trace), ("record", build_record)):
+        held = measure(build)
+        result = {
+            "form": form,
+            "traces": TRACES,
+            "bytes": held,
+            "bytes_per_trace": round(held / TRACES),
+        }
+        sys.stdout.write(json.dumps(result) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Cost of encoding one flush batch with each serializer backend.
+
+``legacy`` is the previous ``json.dumps(batch)``; ``pre_encoded`` is the flush
+side of ``encode_in_background`` (the per-trace work already done by the
+worker). Run with ``python benchmarks/bench_serialization.py``; prints one JSON
+object per (trace size, backend).
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+import timeit
+
+from payloads import chat_batch
+
+from pulse_sdk.serialization import Serializer, orjson_available
+
+TRACE_TOKENS = (100, 2_000, 20_000)
+BATCH_SIZE = 100
+
+
+def measure(func) -> dict:
+    timer = timeit.Timer(func)
+    loops, _ = timer.autorange()
+    best = min(timer.repeat(repeat=5, number=loops)) / loops
+    return {"ms_per_batch": round(best * 1e3, 3)}
+
+
+def main() -> None:
+    backends = ["json"] + (["orjson"] if orjson_available() else [])
+    for tokens in TRACE_TOKENS:
+        batch = chat_batch(BATCH_SIZE, tokens)
+        variants = [("legacy", lambda: json.dumps(batch).encode("utf-8"))]
+        for backend in backends:
+            serializer = Serializer(backend)
+            variants.append((backend, lambda s=serializer: s.encode_batch(batch)))
+
+            def pre_encoded(s=serializer):
+                s.pre_encode(batch)
+                start = timeit.default_timer()
+                s.encode_batch(batch)
+                return timeit.default_timer() - start
+
+            flush_only = min(pre_encoded() for _ in range(20))
+            result = {
+                "approx_tokens": tokens,
+                "backend": f"{backend}+pre_encoded",
+                "ms_per_batch": round(flush_only * 1e3, 3),
+            }
+            sys.stdout.write(json.dumps(result) + "\n")
+        for name, func in variants:
+            result = {"approx_tokens": tokens, "backend": name, **measure(func)}
+            sys.stdout.write(json.dumps(result) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Synthetic but realistic chat payloads shared by the benchmarks."""
+
+from __future__ import annotations
+
+import random
+from typing import Any, Dict, List
+
+_WORDS = (
+    "the a model user assistant request response token context window prompt "
+    "function call tool result error retry latency cost session trace batch "
+    "please summarize explain the following document in detail with examples "
+    "customer order invoice account refund shipping address status update "
+    "python code def return import class self value list dict string number "
+    "because however therefore although meanwhile finally first second third"
+).split()
+
+SYSTEM_PROMPT = (
+    "You are a helpful support assistant for an online store. Answer politely, "
+    "cite the relevant order details, never invent tracking numbers, and escalate "
+    "to a human agent when the customer asks for a refund above the limit. "
+) * 8
+
+
+def _sentence(rng: random.Random) -> str:
+    words = [rng.choice(_WORDS) for _ in range(rng.randint(8, 20))]
+    return " ".join(words).capitalize() + "."
+
+
+def text(rng: random.Random, approx_tokens: int) -> str:
+    parts: List[str] = []
+    length = 0
+    target = approx_tokens * 4  # ~4 characters per token
+    while length < target:
+        sentence = _sentence(rng)
+        parts.append(sentence)
+        length += len(sentence) + 1
+    return " ".join(parts)
+
+
+def chat_request(
+    approx_tokens: int, *, turns: int = 6, seed: int = 0
+) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    per_message = max(approx_tokens // max(turns, 1), 1)
+    messages: List[Dict[str, Any]] = [{"role": "system", "content": SYSTEM_PROMPT}]
+    for turn in range(turns):
+        role = "user" if turn % 2 == 0 else "assistant"
+        messages.append({"role": role, "content": text(rng, per_message)})
+    return {
+        "model": "gpt-4o-mini",
+        "messages": messages,
+        "temperature": 0.2,
+        "max_tokens": 512,
+    }
+
+
+def chat_trace(approx_tokens: int, *, seed: int = 0) -> Dict[str, Any]:
+    rng = random.Random(seed + 1)
+    output = text(rng, 200)
+    return {
+        "trace_id": f"00000000-0000-0000-0000-{seed:012d}",
+        "timestamp": "2025-01-01T00:00:00+00:00",
+        "provider": "openai",
+        "model_requested": "gpt-4o-mini",
+        "model_used": "gpt-4o-mini-2024-07-18",
+        "request_body": chat_request(approx_tokens, seed=seed),
+        "response_body": {
+            "content": output,
+            "inputTokens": approx_tokens,
+            "outputTokens": 200,
+            "finishReason": "stop",
+            "model": "gpt-4o-mini-2024-07-18",
+        },
+        "input_tokens": approx_tokens,
+        "output_tokens": 200,
+        "output_text": output,
+        "finish_reason": "stop",
+        "status": "success",
+        "latency_ms": 850,
+    }
+
+
+def chat_batch(size: int, approx_tokens: int) -> List[Dict[str, Any]]:
+    return [chat_trace(approx_tokens, seed=index) for index in range(size)]
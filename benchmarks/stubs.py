@@ -0,0 +1,48 @@
+"""Provider clients that answer instantly with canned responses."""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+from typing import Any, Dict
+
+OPENAI_RESPONSE = SimpleNamespace(
+    id="chatcmpl-1",
+    model="gpt-4o-mini-2024-07-18",
+    choices=[
+        SimpleNamespace(
+            message=SimpleNamespace(content="Your order shipped yesterday."),
+            finish_reason="stop",
+        )
+    ],
+    usage=SimpleNamespace(prompt_tokens=1000, completion_tokens=20),
+)
+
+ANTHROPIC_RESPONSE = SimpleNamespace(
+    id="msg_1",
+    model="claude-3-5-haiku-20241022",
+    content=[SimpleNamespace(type="text", text="Your order shipped yesterday.")],
+    usage=SimpleNamespace(input_tokens=1000, output_tokens=20),
+    stop_reason="end_turn",
+)
+
+
+def openai_client() -> Any:
+    create = lambda **kwargs: OPENAI_RESPONSE  # noqa: E731
+    return SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=create))
+    )
+
+
+def anthropic_client() -> Any:
+    create = lambda **kwargs: ANTHROPIC_RESPONSE  # noqa: E731
+    return SimpleNamespace(messages=SimpleNamespace(create=create))
+
+
+def anthropic_request(openai_request: Dict[str, Any]) -> Dict[str, Any]:
+    messages = openai_request["messages"]
+    return {
+        "model": "claude-3-5-haiku-20241022",
+        "system": messages[0]["content"],
+        "messages": messages[1:],
+        "max_tokens": openai_request["max_tokens"],
+    }
@@ -0,0 +1,310 @@
+"""SDK benchmark suite: call-path overhead, components and flush throughput.
+
+Run with ``python benchmarks/suite.py [--quick] [--only PART ...]``. Prints
+one JSON object per measurement (the first describes the environment), so
+results can be saved with ``> results.jsonl`` and compared across releases.
+
+Parts:
+
+* ``call_overhead``: stub OpenAI and Anthropic clients called raw and
+  through ``observe()``, for payloads from a few to ~200k tokens. Reports
+  per-call p50/p99 latency and the bytes allocated per call (peak and
+  still held, i.e. the buffered trace).
+* ``components``: ``build_trace``, ``calculate_cost`` and batch
+  serialization in isolation.
+* ``flush_throughput``: ``flush_buffer`` uploading prebuilt traces to an
+  in-process fake ingestion endpoint over HTTP.
+* ``upload_concurrency``: the same against an endpoint that takes 50 ms per
+  request, for several ``max_in_flight`` settings.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import importlib.metadata
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+from fake_ingestion import FakeIngestion
+from payloads import chat_batch, chat_request
+from stubs import anthropic_client, anthropic_request, openai_client
+
+from pulse_sdk import InMemoryTransport, Provider, init_pulse, observe, shutdown, state
+from pulse_sdk.pricing import PricingIndex, calculate_cost
+from pulse_sdk.serialization import Serializer, orjson_available
+from pulse_sdk.trace import build_trace
+from pulse_sdk.types import NormalizedResponse
+
+PAYLOAD_TOKENS = (10, 1_000, 20_000, 200_000)
+PARTS = ("call_overhead", "components", "flush_throughput", "upload_concurrency")
+
+
+def emit(result: Dict[str, Any]) -> None:
+    sys.stdout.write(json.dumps(result) + "\n")
+    sys.stdout.flush()
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(int(q * len(ordered)), len(ordered) - 1)]  # noqa
+    return {
+        "p50_us": round(pick(0.50) / 1e3, 2),
+        "p99_us": round(pick(0.99) / 1e3, 2),
+        "mean_us": round(sum(ordered) / len(ordered) / 1e3, 2),
+    }
+
+
+def timed_calls(func: Callable[[], Any], calls: int) -> List[float]:
+    clock = time.perf_counter_ns
+    samples = []
+    for _ in range(calls):
+        start = clock()
+        func()
+        samples.append(clock() - start)
+    return samples
+
+
+def allocated_per_call(func: Callable[[], Any], calls: int) -> Dict[str, int]:
+    gc.collect()
+    tracemalloc.start()
+    for _ in range(calls):
+        func()
+    held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"held_bytes_per_call": held // calls, "peak_bytes": peak}
+
+
+def call_overhead(quick: bool) -> None:
+    # observe() patches the client in place, so each mode gets its own.
+    clients = {
+        "openai": (openai_client, Provider.OPENAI, lambda c: c.chat.completions),
+        "anthropic": (anthropic_client, Provider.ANTHROPIC, lambda c: c.messages),
+    }
+    for tokens in PAYLOAD_TOKENS:
+        calls = 50 if tokens >= 100_000 else (200 if quick else 1_000)
+        request = chat_request(tokens, turns=max(4, tokens // 500))
+        payloads = {"openai": request, "anthropic": anthropic_request(request)}
+        for name, (new_client, provider, resource) in clients.items():
+            payload = payloads[name]
+            init_pulse(
+                {
+                    "api_key": "pulse_sk_bench",
+                    "transport": InMemoryTransport(),
+                    "flush_interval": 3_600_000,
+                    "max_buffer_size": 100_000,
+                    "max_buffer_bytes": None,
+                }
+            )
+            state.stop_flush_worker()
+            targets = {
+                "raw": resource(new_client()).create,
+                "observed": resource(observe(new_client(), provider)).create,
+            }
+            for mode, create in targets.items():
+                call = lambda: create(**payload)  # noqa: E731
+                timed_calls(call, min(calls, 20))  # warm up
+                state._buffer.drain()
+                samples = timed_calls(call, calls)
+                state._buffer.drain()
+                memory = allocated_per_call(call, min(calls, 100))
+                state._buffer.drain()
+                emit(
+                    {
+                        "benchmark": "call_overhead",
+                        "provider": name,
+                        "approx_tokens": tokens,
+                        "mode": mode,
+                        "calls": calls,
+                        **percentiles(samples),
+                        **memory,
+                    }
+                )
+            shutdown()
+
+
+def per_call_us(func: Callable[[], Any], calls: int) -> float:
+    best = min(sum(timed_calls(func, calls)) for _ in range(3))
+    return round(best / calls / 1e3, 3)
+
+
+def components(quick: bool) -> None:
+    calls = 200 if quick else 2_000
+    response = NormalizedResponse(
+        model="gpt-4o-mini-2024-07-18",
+        content="Your order shipped yesterday.",
+        input_tokens=1000,
+        output_tokens=20,
+        finish_reason="stop",
+    )
+    for tokens in PAYLOAD_TOKENS[:3]:
+        request = chat_request(tokens)
+        build = lambda: build_trace(request, response, Provider.OPENAI, 120.0)  # noqa
+        emit(
+            {
+                "benchmark": "build_trace",
+                "approx_tokens": tokens,
+                "us_per_call": per_call_us(build, calls),
+            }
+        )
+
+    emit(
+        {
+            "benchmark": "calculate_cost",
+            "case": "known_model",
+            "us_per_call": per_call_us(
+                lambda: calculate_cost("gpt-4o-mini-2024-07-18", 1000, 20), calls
+            ),
+        }
+    )
+    index = PricingIndex()
+    unseen = iter(f"acme-model-{i}" for i in range(10**9))
+    emit(
+        {
+            "benchmark": "calculate_cost",
+            "case": "unseen_model",
+            "us_per_call": per_call_us(lambda: index.cost(next(unseen), 1, 1), calls),
+        }
+    )
+
+    backends = ["json"] + (["orjson"] if orjson_available() else [])
+    for tokens in PAYLOAD_TOKENS[:3]:
+        batch = chat_batch(100, tokens)
+        for backend in backends:
+            serializer = Serializer(backend)
+            encode = lambda s=serializer: s.encode_batch(batch)  # noqa: E731
+            start = time.perf_counter()
+            size = len(encode())
+            elapsed = min(
+                (time.perf_counter() - start, *(_elapsed(encode) for _ in range(4)))
+            )
+            emit(
+                {
+                    "benchmark": "serialize_batch",
+                    "backend": backend,
+                    "approx_tokens": tokens,
+                    "batch_size": len(batch),
+                    "ms_per_batch": round(elapsed * 1e3, 3),
+                    "mb_per_s": round(size / elapsed / 1e6, 1),
+                }
+            )
+
+
+def _elapsed(func: Callable[[], Any]) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def flush_throughput(quick: bool) -> None:
+    total = 1_000 if quick else 5_000
+    for tokens in (100, 2_000):
+        traces = chat_batch(100, tokens)
+        for compression in ("none", "gzip"):
+            with FakeIngestion() as fake:
+                init_pulse(
+                    {
+                        "api_key": "pulse_sk_bench",
+                        "api_url": fake.url,
+                        "batch_size": 100,
+                        "flush_interval": 3_600_000,
+                        "max_buffer_size": total,
+                        "max_buffer_bytes": None,
+                        "compression": compression,
+                    }
+                )
+                state.stop_flush_worker()
+                for i in range(total):
+                    state.add_to_buffer(dict(traces[i % len(traces)]))
+                start = time.perf_counter()
+                while len(state._buffer):
+                    state.flush_buffer()
+                elapsed = time.perf_counter() - start
+                shutdown()
+                emit(
+                    {
+                        "benchmark": "flush_throughput",
+                        "approx_tokens": tokens,
+                        "compression": compression,
+                        "traces": total,
+                        "requests": fake.requests,
+                        "traces_per_s": round(total / elapsed),
+                        "wire_mb_per_s": round(fake.bytes / elapsed / 1e6, 2),
+                    }
+                )
+
+
+def upload_concurrency(quick: bool) -> None:
+    total = 1_000 if quick else 4_000
+    traces = chat_batch(100, 100)
+    baseline = None
+    for max_in_flight in (1, 2, 4, 8):
+        with FakeIngestion(delay=0.05) as fake:
+            init_pulse(
+                {
+                    "api_key": "pulse_sk_bench",
+                    "api_url": fake.url,
+                    # Fixed batches, so only the concurrency changes.
+                    "batch_size": 50,
+                    "adaptive_batching": False,
+                    "flush_interval": 3_600_000,
+                    "max_buffer_size": total,
+                    "max_buffer_bytes": None,
+                    "max_in_flight": max_in_flight,
+                }
+            )
+            state.stop_flush_worker()
+            for i in range(total):
+                state.add_to_buffer(dict(traces[i % len(traces)]))
+            start = time.perf_counter()
+            while len(state._buffer):
+                state.flush_buffer()
+            elapsed = time.perf_counter() - start
+            shutdown()
+            throughput = total / elapsed
+            baseline = baseline or throughput
+            emit(
+                {
+                    "benchmark": "upload_concurrency",
+                    "max_in_flight": max_in_flight,
+                    "server_delay_ms": 50,
+                    "traces": total,
+                    "requests": fake.requests,
+                    "traces_per_s": round(throughput),
+                    "speedup": round(throughput / baseline, 2),
+                }
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--quick", action="store_true", help="fewer iterations")
+    parser.add_argument("--only", nargs="+", choices=PARTS, default=list(PARTS))
+    args = parser.parse_args()
+
+    emit(
+        {
+            "benchmark": "environment",
+            "sdk_version": importlib.metadata.version("pulse-trace-sdk"),
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "orjson": orjson_available(),
+        }
+    )
+    parts = {
+        "call_overhead": call_overhead,
+        "components": components,
+        "flush_throughput": flush_throughput,
+        "upload_concurrency": upload_concurrency,
+    }
+    for part in args.only:
+        parts[part](args.quick)
+
+
+if __name__ == "__main__":
+    main()
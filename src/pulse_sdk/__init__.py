@@ -3,23 +3,37 @@ from __future__ import annotations
 from .config import load_config
 from .providers import observe_anthropic, observe_openai
 from .state import (
+    aflush,
     flush_buffer,
+    get_buffer_stats,
+    get_stats,
+    persist_remaining,
     reset_state,
     set_config,
+    set_transport,
     start_flush_worker,
     stop_flush_worker,
 )
+from .transport import (
+    HttpTransport,
+    InMemoryTransport,
+    Transport,
+    UnixSocketTransport,
+    create_transport,
+)
 from .types import ObserveOptions, Provider, PulseConfig
 
 
 def init_pulse(config: PulseConfig) -> None:
     resolved = load_config(config)
     set_config(resolved)
+    set_transport(create_transport(resolved))
     start_flush_worker()
 
 
 def shutdown() -> None:
     stop_flush_worker()
+    persist_remaining()
     reset_state()
 
 
@@ -36,6 +50,13 @@ __all__ = [
     "shutdown",
     "observe",
     "flush_buffer",
+    "aflush",
+    "get_buffer_stats",
+    "get_stats",
     "Provider",
     "ObserveOptions",
+    "Transport",
+    "HttpTransport",
+    "InMemoryTransport",
+    "UnixSocketTransport",
 ]
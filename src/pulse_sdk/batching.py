@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import threading
+
+MAX_BATCH_SIZE = 10_000
+DEFAULT_MAX_BATCH_SIZE = 1_000
+DEFAULT_BATCH_BYTES = 1024 * 1024
+MIN_BATCH_BYTES = 1024
+DEFAULT_BATCH_TARGET_LATENCY = 500  # ms
+MIN_FLUSH_INTERVAL = 10  # ms
+DEFAULT_MAX_IN_FLIGHT = 1
+MAX_IN_FLIGHT = 32
+
+
+class BatchController:
+    """Decides how many traces go into the next upload request.
+
+    A batch holds at most ``limit`` traces and, by estimated JSON size, at
+    most ``max_bytes`` (a single larger trace still goes alone). With
+    ``adaptive`` the limit follows AIMD, as in TCP congestion control: each
+    full batch acknowledged within ``target_latency`` ms raises it by a fixed
+    step, up to ``max_size``; a slower or failed request halves it, down to
+    one. Without ``adaptive`` the limit stays at ``initial``.
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        max_size: int = DEFAULT_MAX_BATCH_SIZE,
+        max_bytes: int = DEFAULT_BATCH_BYTES,
+        target_latency: int = DEFAULT_BATCH_TARGET_LATENCY,
+        adaptive: bool = True,
+    ) -> None:
+        self.initial = initial
+        self.max_size = max(max_size, initial)
+        self.max_bytes = max_bytes
+        self.target_latency = target_latency / 1000.0
+        self.adaptive = adaptive
+        self.limit = initial
+        self._step = max(1, initial // 2)
+        self._lock = threading.Lock()
+
+    def record(self, count: int, seconds: float, ok: bool) -> None:
+        """Adjust the limit after a request carrying ``count`` traces."""
+        if not self.adaptive:
+            return
+        with self._lock:
+            if not ok or seconds > self.target_latency:
+                self.limit = max(1, self.limit // 2)
+            elif count >= self.limit:
+                # Only a batch that hit the limit says a bigger one was wanted.
+                self.limit = min(self.max_size, self.limit + self._step)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.limit = self.initial
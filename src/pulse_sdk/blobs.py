@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from .types import Trace
+
+BLOB_REF_KEY = "pulse_blob"
+DEFAULT_BLOB_MIN_BYTES = 4096
+DEFAULT_BLOB_CACHE_SIZE = 4096
+
+Blobs = Dict[str, str]
+
+
+def blob_digest(content: str) -> str:
+    return "sha256:" + hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def is_blob_ref(value: Any) -> bool:
+    return isinstance(value, dict) and len(value) == 1 and BLOB_REF_KEY in value
+
+
+class BlobStore:
+    """Content-addressed offload of large strings in ``request_body``.
+
+    Strings of at least ``min_bytes`` are replaced by ``{"pulse_blob": digest}``
+    and uploaded separately. Digests that were confirmed uploaded are kept in a
+    bounded LRU (optionally expiring after ``ttl`` seconds), so a repeated
+    system prompt or document costs one hash instead of another upload.
+    """
+
+    def __init__(
+        self,
+        min_bytes: int = DEFAULT_BLOB_MIN_BYTES,
+        cache_size: int = DEFAULT_BLOB_CACHE_SIZE,
+        ttl: Optional[float] = None,
+    ) -> None:
+        self.min_bytes = min_bytes
+        self.cache_size = cache_size
+        self.ttl = ttl
+        self._uploaded: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def offload(self, traces: List[Trace]) -> Tuple[List[Trace], Blobs]:
+        """Return traces with large strings replaced by blob refs, plus the
+        blobs that still have to be uploaded before those traces are sent."""
+        pending: Blobs = {}
+        result = []
+        for trace in traces:
+            body = trace.get("request_body")
+            if body is None:
+                result.append(trace)
+                continue
+            new_body = self._visit(body, pending)
+            result.append(
+                trace if new_body is body else {**trace, "request_body": new_body}
+            )
+        return result, pending
+
+    def mark_uploaded(self, digests: List[str]) -> None:
+        now = time.monotonic()
+        with self._lock:
+            for digest in digests:
+                self._uploaded[digest] = now
+                self._uploaded.move_to_end(digest)
+            while len(self._uploaded) > self.cache_size:
+                self._uploaded.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._uploaded.clear()
+
+    def _is_uploaded(self, digest: str) -> bool:
+        with self._lock:
+            uploaded_at = self._uploaded.get(digest)
+            if uploaded_at is None:
+                return False
+            if self.ttl is not None and time.monotonic() - uploaded_at > self.ttl:
+                del self._uploaded[digest]
+                return False
+            self._uploaded.move_to_end(digest)
+            return True
+
+    def _visit(self, value: Any, pending: Blobs) -> Any:
+        if isinstance(value, str):
+            if len(value) < self.min_bytes:
+                return value
+            digest = blob_digest(value)
+            if digest not in pending and not self._is_uploaded(digest):
+                pending[digest] = value
+            return {BLOB_REF_KEY: digest}
+        if isinstance(value, dict):
+            changed = False
+            result = {}
+            for key, item in value.items():
+                new_item = self._visit(item, pending)
+                changed = changed or new_item is not item
+                result[key] = new_item
+            return result if changed else value
+        if isinstance(value, list):
+            items = [self._visit(item, pending) for item in value]
+            if any(new is not old for new, old in zip(items, value)):
+                return items
+            return value
+        return value
+
+
+def resolve_blob_refs(value: Any, blobs: Blobs) -> Any:
+    """Inverse of ``BlobStore.offload`` for a single body (used by readers)."""
+    if is_blob_ref(value):
+        return blobs[value[BLOB_REF_KEY]]
+    if isinstance(value, dict):
+        return {key: resolve_blob_refs(item, blobs) for key, item in value.items()}
+    if isinstance(value, list):
+        return [resolve_blob_refs(item, blobs) for item in value]
+    return value
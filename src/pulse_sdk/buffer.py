@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+import random
+import threading
+import time
+from collections import deque
+from itertools import islice
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from .types import Trace
+
+OVERFLOW_POLICIES = ("drop_newest", "drop_oldest", "block", "sample")
+DEFAULT_MAX_BUFFER_SIZE = 10_000
+DEFAULT_MAX_BUFFER_BYTES = 64 * 1024 * 1024
+DEFAULT_OVERFLOW_POLICY = "drop_newest"
+DEFAULT_BLOCK_TIMEOUT = 100  # ms
+
+# Reasons a trace can be dropped besides the overflow policies.
+DROP_REASONS = OVERFLOW_POLICIES + ("retries_exhausted", "requeue_overflow", "rejected")
+
+# (trace, estimated size, delivery attempts so far)
+Entry = Tuple[Trace, int, int]
+
+
+def estimate_size(value: Any) -> int:
+    """Rough JSON size of ``value``; walks containers but never encodes."""
+    if isinstance(value, str):
+        return len(value) + 2
+    if isinstance(value, dict):
+        return 2 + sum(
+            len(key) + 4 + estimate_size(item) for key, item in value.items()
+        )
+    if isinstance(value, (list, tuple)):
+        return 2 + sum(estimate_size(item) + 1 for item in value)
+    return 8
+
+
+class TraceBuffer:
+    """Bounded FIFO of traces waiting to be flushed.
+
+    Bounded by trace count and, when ``max_bytes`` is set, by the estimated
+    size of the buffered traces. When full, ``overflow_policy`` decides:
+
+    ``drop_newest``  reject the incoming trace
+    ``drop_oldest``  evict from the head until the new trace fits
+    ``block``        wait up to ``block_timeout`` ms for the flush worker to
+                     make room, then reject (this blocks the calling thread)
+    ``sample``       reservoir-sample: every trace offered while the buffer is
+                     full has an equal chance of being kept
+
+    ``on_full`` is called when an incoming trace does not fit and ``on_drop``
+    receives every trace that leaves the buffer without being sent. Entry
+    sizes are estimated when ``max_bytes`` is set or ``measure`` is true
+    (``take`` needs them to cap a batch by bytes).
+    """
+
+    def __init__(
+        self,
+        max_size: int = DEFAULT_MAX_BUFFER_SIZE,
+        max_bytes: Optional[int] = DEFAULT_MAX_BUFFER_BYTES,
+        overflow_policy: str = DEFAULT_OVERFLOW_POLICY,
+        block_timeout: int = DEFAULT_BLOCK_TIMEOUT,
+        on_full: Optional[Callable[[], None]] = None,
+        on_drop: Optional[Callable[[List[Trace]], None]] = None,
+        measure: bool = False,
+    ) -> None:
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unsupported overflow policy: {overflow_policy}")
+        self.max_size = max_size
+        self.max_bytes = max_bytes
+        self.overflow_policy = overflow_policy
+        self.block_timeout = block_timeout / 1000.0
+        self.on_full = on_full
+        self.on_drop = on_drop
+        self._measure = measure or max_bytes is not None
+        self._items: Deque[Entry] = deque()
+        self._bytes = 0
+        self._offered_while_full = 0
+        self._unseen = 0
+        self._lock = threading.Lock()
+        self._not_full = threading.Condition(self._lock)
+        self._dropped: Dict[str, int] = {reason: 0 for reason in DROP_REASONS}
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    @property
+    def dropped(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._dropped)
+
+    def put(self, trace: Trace) -> int:
+        """Enqueue ``trace``; return the new length, or -1 if it was dropped."""
+        size = 0
+        if self._measure:
+            # Records that are not trace dicts yet (trace.PendingTrace) know
+            # their own size; walking their payload is what they avoid.
+            size = (
+                estimate_size(trace)
+                if isinstance(trace, dict)
+                else trace.estimated_size  # type: ignore[attr-defined]
+            )
+        evicted: List[Trace] = []
+        with self._lock:
+            length = self._put(trace, size, evicted)
+        if evicted and self.on_drop is not None:
+            # Outside the lock: the hook may do I/O (see Spool).
+            self.on_drop(evicted)
+        return length
+
+    def _put(self, trace: Trace, size: int, evicted: List[Trace]) -> int:
+        if self._fits(size):
+            return self._append(trace, size)
+
+        if self.on_full is not None:
+            self.on_full()
+        policy = self.overflow_policy
+        if policy == "drop_oldest":
+            while self._items and not self._fits(size):
+                evicted.append(self._popleft()[0])
+                self._dropped[policy] += 1
+            if self._fits(size):
+                return self._append(trace, size)
+        elif policy == "block":
+            deadline = time.monotonic() + self.block_timeout
+            while not self._fits(size):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._not_full.wait(remaining):
+                    break
+            if self._fits(size):
+                return self._append(trace, size)
+        elif policy == "sample" and self._items:
+            self._offered_while_full += 1
+            slot = random.randrange(len(self._items) + self._offered_while_full)
+            if slot < len(self._items):
+                evicted_trace, evicted_size, _ = self._items[slot]
+                del self._items[slot]
+                self._bytes -= evicted_size
+                self._dropped[policy] += 1
+                evicted.append(evicted_trace)
+                if self._fits(size):
+                    return self._append(trace, size)
+
+        self._dropped[policy] += 1
+        evicted.append(trace)
+        return -1
+
+    def drain(self, limit: Optional[int] = None) -> List[Trace]:
+        return [entry[0] for entry in self.take(limit)]
+
+    def take(
+        self, limit: Optional[int] = None, max_bytes: Optional[int] = None
+    ) -> List[Entry]:
+        """Remove up to ``limit`` entries from the head, oldest first, stopping
+        before their estimated size would exceed ``max_bytes`` (the first
+        entry is always taken)."""
+        with self._lock:
+            count = len(self._items) if limit is None else min(limit, len(self._items))
+            if max_bytes is None:
+                entries = [self._popleft() for _ in range(count)]
+            else:
+                entries = []
+                total = 0
+                while len(entries) < count:
+                    size = self._items[0][1]
+                    if entries and total + size > max_bytes:
+                        break
+                    total += size
+                    entries.append(self._popleft())
+            if not self._items:
+                self._offered_while_full = 0
+            self._not_full.notify_all()
+        return entries
+
+    def peek(self) -> List[Trace]:
+        """Buffered traces, oldest first, without removing them."""
+        with self._lock:
+            return [entry[0] for entry in self._items]
+
+    def peek_new(self) -> List[Trace]:
+        """Traces appended since the last ``peek_new``, oldest first, without
+        removing them. Costs the number of new traces, not the buffer size."""
+        with self._lock:
+            count = min(self._unseen, len(self._items))
+            self._unseen = 0
+            newest = [entry[0] for entry in islice(reversed(self._items), count)]
+        newest.reverse()
+        return newest
+
+    def requeue(self, entries: List[Entry]) -> int:
+        """Put entries that failed to send back at the head, counting one more
+        delivery attempt. Entries that no longer fit are dropped; returns how
+        many were dropped."""
+        evicted: List[Trace] = []
+        with self._lock:
+            for trace, size, attempts in reversed(entries):
+                if self._fits(size):
+                    self._items.appendleft((trace, size, attempts + 1))
+                    self._bytes += size
+                else:
+                    evicted.append(trace)
+            self._dropped["requeue_overflow"] += len(evicted)
+        if evicted and self.on_drop is not None:
+            self.on_drop(evicted)
+        return len(evicted)
+
+    def record_dropped(self, reason: str, count: int = 1) -> None:
+        with self._lock:
+            self._dropped[reason] = self._dropped.get(reason, 0) + count
+
+    def _fits(self, size: int) -> bool:
+        if len(self._items) >= self.max_size:
+            return False
+        return (
+            self.max_bytes is None
+            or not self._items
+            or self._bytes + size <= self.max_bytes
+        )
+
+    def _append(self, trace: Trace, size: int) -> int:
+        self._items.append((trace, size, 0))
+        self._bytes += size
+        self._unseen += 1
+        return len(self._items)
+
+    def _popleft(self) -> Entry:
+        entry = self._items.popleft()
+        self._bytes -= entry[1]
+        return entry
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import copy
+import hashlib
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+CAPTURE_MODES = ("full", "shallow", "none")
+
+# Request fields that carry prompt content rather than call parameters.
+_CONTENT_FIELDS = frozenset({"messages", "system", "prompt", "input"})
+
+
+def snapshot_request(payload: Dict[str, Any], mode: str) -> Dict[str, Any]:
+    """Copy the request kwargs for the trace according to ``capture_mode``.
+
+    ``full``    deep copy; the trace is immune to any later mutation.
+    ``shallow`` copies the top-level dict and each message dict, sharing
+                nested content (parts, images) with the caller. Safe unless
+                the caller mutates message contents in place after the call.
+    ``none``    keeps scalar call parameters (model, temperature, ...) only.
+    """
+    if mode == "full":
+        return copy.deepcopy(payload)
+
+    if mode == "shallow":
+        snapshot = dict(payload)
+        messages = snapshot.get("messages")
+        if isinstance(messages, list):
+            snapshot["messages"] = [
+                dict(message) if isinstance(message, dict) else message
+                for message in messages
+            ]
+        return snapshot
+
+    return {
+        key: value
+        for key, value in payload.items()
+        if key not in _CONTENT_FIELDS
+        and (value is None or isinstance(value, (str, int, float, bool)))
+    }
+
+
+def capture_references(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """What the calling thread keeps when trace building is deferred.
+
+    Copies the kwargs dict and the ``messages`` list, so rebinding kwargs or
+    appending to / replacing items of ``messages`` after the call does not
+    leak into the trace. Message dicts and their content are still shared
+    until the flush worker takes the ``capture_mode`` snapshot: code that
+    mutates them in place right after the call must not use deferred
+    building.
+    """
+    references = dict(payload)
+    messages = references.get("messages")
+    if isinstance(messages, list):
+        references["messages"] = list(messages)
+    return references
+
+
+BINARY_PART_MODES = ("placeholder", "drop", "keep")
+DEFAULT_MAX_FIELD_BYTES = 256 * 1024
+MIN_MAX_FIELD_BYTES = 256
+
+_TRUNCATION_MARKER_BYTES = 64
+
+
+@dataclass(frozen=True)
+class CapturePolicy:
+    """Bounds what a single trace can hold.
+
+    ``max_field_bytes`` caps every string in the request body as well as the
+    output text (``None`` disables the cap); oversized strings keep their head
+    and tail. ``binary_parts`` controls base64 payloads (images, audio,
+    documents): replace with a size+hash placeholder, drop, or keep as-is.
+    """
+
+    max_field_bytes: Optional[int] = DEFAULT_MAX_FIELD_BYTES
+    binary_parts: str = "placeholder"
+
+
+def truncate_middle(text: str, max_bytes: Optional[int]) -> Tuple[str, bool]:
+    # Strings of up to max_bytes / 4 characters cannot exceed the limit.
+    if max_bytes is None or len(text) * 4 <= max_bytes:
+        return text, False
+    encoded = text.encode("utf-8")
+    if len(encoded) <= max_bytes:
+        return text, False
+
+    half = max(max_bytes - _TRUNCATION_MARKER_BYTES, 0) // 2
+    head = encoded[:half].decode("utf-8", errors="ignore")
+    tail = encoded[len(encoded) - half :].decode("utf-8", errors="ignore")
+    omitted = len(encoded) - 2 * half
+    return f"{head}…[truncated {omitted} bytes]…{tail}", True
+
+
+def _binary_placeholder(data: str, media_type: Optional[str], mode: str) -> str:
+    size = len(data) * 3 // 4  # decoded size of the base64 payload
+    if mode == "drop":
+        return f"[binary {media_type or 'data'} omitted]"
+    digest = hashlib.sha256(data.encode("ascii", errors="replace")).hexdigest()
+    return f"[binary {media_type or 'data'}, {size} bytes, sha256:{digest}]"
+
+
+def _data_url_media_type(value: str) -> Optional[str]:
+    # data:image/png;base64,....
+    if not value.startswith("data:"):
+        return None
+    header, sep, _ = value[:128].partition(",")
+    if not sep or not header.endswith(";base64"):
+        return None
+    return header[5:-7] or "application/octet-stream"
+
+
+class _PolicyWalker:
+    """Copy-on-write walk: containers are rebuilt only when something changed,
+    so payloads shared with the caller are never mutated."""
+
+    def __init__(self, policy: CapturePolicy) -> None:
+        self.policy = policy
+        self.truncated = False
+
+    def visit(self, value: Any) -> Any:
+        if isinstance(value, str):
+            return self._visit_str(value)
+        if isinstance(value, dict):
+            return self._visit_dict(value)
+        if isinstance(value, list):
+            changed = False
+            items = []
+            for item in value:
+                new_item = self.visit(item)
+                changed = changed or new_item is not item
+                items.append(new_item)
+            return items if changed else value
+        return value
+
+    def _visit_str(self, value: str, media_type: Optional[str] = None) -> str:
+        mode = self.policy.binary_parts
+        if mode != "keep":
+            data_media_type = media_type or _data_url_media_type(value)
+            if data_media_type is not None:
+                self.truncated = True
+                return _binary_placeholder(value, data_media_type, mode)
+        new_value, truncated = truncate_middle(value, self.policy.max_field_bytes)
+        self.truncated = self.truncated or truncated
+        return new_value
+
+    def _visit_dict(self, value: Dict[str, Any]) -> Dict[str, Any]:
+        # {"type": "base64", "media_type": ..., "data": ...}   (Anthropic)
+        # {"input_audio": {"data": ..., "format": "wav"}}       (OpenAI)
+        raw_binary = value.get("type") == "base64" or "format" in value
+        changed = False
+        result: Dict[str, Any] = {}
+        for key, item in value.items():
+            if key == "data" and raw_binary and isinstance(item, str):
+                media_type = value.get("media_type") or value.get("format") or "data"
+                new_item = self._visit_str(item, str(media_type))
+            else:
+                new_item = self.visit(item)
+            changed = changed or new_item is not item
+            result[key] = new_item
+        return result if changed else value
+
+
+def apply_capture_policy(
+    value: Any, policy: Optional[CapturePolicy]
+) -> Tuple[Any, bool]:
+    """Return ``value`` bounded by ``policy`` and whether anything was cut."""
+    if policy is None or (
+        policy.max_field_bytes is None and policy.binary_parts == "keep"
+    ):
+        return value, False
+    walker = _PolicyWalker(policy)
+    return walker.visit(value), walker.truncated
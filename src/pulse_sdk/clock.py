@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import math
+import time
+from typing import Optional, Tuple
+
+# The anchor is refreshed this often so the derived wall clock follows NTP
+# adjustments instead of drifting with the monotonic clock.
+REANCHOR_SECONDS = 60.0
+
+_anchor: Tuple[float, float] = (time.time(), time.perf_counter())
+_second_prefix: Tuple[int, str] = (-1, "")
+
+
+def wall_time(perf: Optional[float] = None) -> float:
+    """Epoch seconds for ``perf`` (a ``time.perf_counter()`` reading).
+
+    Derived from a per-process (wall, perf_counter) anchor, so a call that
+    already read ``perf_counter`` for its latency gets its timestamp without
+    a second clock read, and timestamps taken between re-anchors never go
+    backwards.
+    """
+    global _anchor
+    if perf is None:
+        perf = time.perf_counter()
+    wall, base = _anchor
+    if perf - base > REANCHOR_SECONDS:
+        wall, base = _anchor = (time.time(), time.perf_counter())
+    return wall + (perf - base)
+
+
+def format_timestamp(epoch: float) -> str:
+    """ISO 8601 UTC timestamp with microseconds (``...T03:04:05.000006+00:00``).
+
+    The date and time of day are formatted once per second and cached.
+    """
+    global _second_prefix
+    # Rounded like datetime.fromtimestamp: the fraction alone, half to even.
+    fraction, whole = math.modf(epoch)
+    seconds, micros = divmod(int(whole) * 1_000_000 + round(fraction * 1e6), 1_000_000)
+    cached, prefix = _second_prefix
+    if seconds != cached:
+        prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(seconds))
+        _second_prefix = (seconds, prefix)
+    return f"{prefix}.{micros:06d}+00:00"
@@ -0,0 +1,263 @@
+"""Host-local trace collector.
+
+Run ``python -m pulse_sdk.collector`` next to a fleet of worker processes and
+point them at it with ``init_pulse({..., "collector_socket": path})``. Workers
+write frames to a Unix domain socket (see ``UnixSocketTransport``); the
+collector buffers traces from all of them and uploads full, compressed
+batches over one pooled HTTP connection using the regular SDK exporter, so
+retries, the circuit breaker and the disk spool apply here as well.
+
+Blob offload and session deltas are done by the collector (``--blob-offload``,
+``--session-delta``) and switched off in the workers, and workers' metric
+rollups are merged into the collector's, so everything a worker hands over
+is retried like its traces.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import select
+import signal
+import socket
+import socketserver
+import stat
+import tempfile
+import threading
+import time
+from typing import List, Optional
+
+from . import init_pulse, shutdown, state
+from .config import ConfigError
+from .transport import FRAME_HEADER, MAX_FRAME_BYTES
+from .types import PulseConfig
+
+DEFAULT_COLLECTOR_SOCKET = os.path.join(tempfile.gettempdir(), "pulse-collector.sock")
+DEFAULT_COLLECTOR_BATCH_SIZE = 100
+DEFAULT_COLLECTOR_FLUSH_INTERVAL = 1000  # ms
+DEFAULT_COLLECTOR_BUFFER_SIZE = 50_000
+# How long stop() keeps reading from connected workers before giving up.
+DRAIN_TIMEOUT = 5.0  # seconds
+_POLL_INTERVAL = 0.1  # seconds
+
+
+class _FrameHandler(socketserver.BaseRequestHandler):
+    # Reads with a timeout so an idle connection notices the server stopping;
+    # anything a worker wrote before that is still read first.
+    server: "_Server"
+    request: socket.socket
+
+    def setup(self) -> None:
+        self.request.settimeout(_POLL_INTERVAL)
+
+    def handle(self) -> None:
+        while True:
+            header = self._read(FRAME_HEADER.size)
+            if header is None:
+                return
+            (length,) = FRAME_HEADER.unpack(header)
+            if length > MAX_FRAME_BYTES:
+                print(f"Pulse collector: dropping connection, {length}-byte frame")
+                return
+            payload = self._read(length)
+            if payload is None:
+                return  # the writer went away (or stalled) mid-frame
+            try:
+                message = json.loads(payload)
+            except ValueError:
+                print("Pulse collector: dropping connection, malformed frame")
+                return
+            self.server.collector.receive(message)
+
+    def _read(self, size: int) -> Optional[bytes]:
+        """Exactly ``size`` bytes, or None at end of stream or once stopped."""
+        data = bytearray()
+        while len(data) < size:
+            try:
+                chunk = self.request.recv(min(size - len(data), 1 << 20))
+            except socket.timeout:
+                if self.server.stopping():
+                    return None
+                continue
+            except OSError:
+                return None
+            if not chunk or self.server.past_deadline():
+                return None
+            data += chunk
+        return bytes(data)
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    # Handler threads are joined by server_close(), so stop() returns only
+    # once every frame already written to the socket has been received.
+    daemon_threads = False
+    block_on_close = True
+
+    def __init__(self, path: str, collector: "Collector") -> None:
+        self.collector = collector
+        self.drain_deadline: Optional[float] = None
+        super().__init__(path, _FrameHandler)
+
+    def stopping(self) -> bool:
+        return self.drain_deadline is not None
+
+    def past_deadline(self) -> bool:
+        # Idle connections end as soon as stopping begins; a worker that keeps
+        # writing is cut off here.
+        deadline = self.drain_deadline
+        return deadline is not None and time.monotonic() > deadline
+
+    def accept_backlog(self) -> None:
+        """Handle connections that were queued but never accepted."""
+        while select.select([self.socket], [], [], 0)[0]:
+            try:
+                request, address = self.get_request()
+            except OSError:
+                return
+            self.process_request(request, address)
+
+
+class Collector:
+    """Listens on ``socket_path`` and feeds received traces to the exporter.
+
+    ``init_pulse`` must already have been called with the upload settings.
+    """
+
+    def __init__(self, socket_path: str = DEFAULT_COLLECTOR_SOCKET) -> None:
+        self.socket_path = socket_path
+        self._server: Optional[_Server] = None
+
+    def receive(self, message: dict) -> None:
+        metrics = message.get("metrics")
+        if metrics:
+            # Merged into the collector's own rollups, which are uploaded on
+            # its metrics interval and kept for the next one on failure.
+            aggregator = state.get_metrics()
+            if aggregator is None:
+                print("Pulse collector: dropping metrics, metrics are disabled")
+            else:
+                try:
+                    aggregator.merge_rollups(metrics)
+                except (KeyError, TypeError, ValueError) as exc:
+                    print(f"Pulse collector: dropping malformed metrics: {exc}")
+        for trace in message.get("traces") or ():
+            state.add_to_buffer(trace)
+
+    def bind(self) -> _Server:
+        """Create the socket; clients can connect from here on."""
+        if self._server is None:
+            _remove_stale_socket(self.socket_path)
+            self._server = _Server(self.socket_path, self)
+        return self._server
+
+    def start(self) -> None:
+        """Serve from a background thread."""
+        threading.Thread(
+            target=self.bind().serve_forever, name="pulse-collector", daemon=True
+        ).start()
+
+    def serve_forever(self) -> None:
+        # Returns immediately if stop() already ran on the bound server.
+        self.bind().serve_forever()
+
+    def stop(self) -> None:
+        """Stop accepting connections and receive what workers already sent.
+
+        New connections are refused from here on; connections still waiting
+        to be accepted are handled, and the call returns once every handler
+        has read the frames written before it (or ``DRAIN_TIMEOUT`` passed).
+        """
+        server = self._server
+        if server is None:
+            return
+        server.shutdown()
+        _remove_stale_socket(self.socket_path)
+        server.accept_backlog()
+        server.drain_deadline = time.monotonic() + DRAIN_TIMEOUT
+        server.server_close()  # joins the handler threads
+        self._server = None
+
+
+def _remove_stale_socket(path: str) -> None:
+    try:
+        if stat.S_ISSOCK(os.stat(path).st_mode):
+            os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def _parse_args(argv: Optional[List[str]]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m pulse_sdk.collector",
+        description="Collect traces from local processes and upload them to Pulse.",
+    )
+    parser.add_argument(
+        "--socket",
+        default=os.environ.get("PULSE_COLLECTOR_SOCKET", DEFAULT_COLLECTOR_SOCKET),
+    )
+    parser.add_argument("--api-key", default=os.environ.get("PULSE_API_KEY"))
+    parser.add_argument("--api-url", default=os.environ.get("PULSE_API_URL"))
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_COLLECTOR_BATCH_SIZE)
+    parser.add_argument(
+        "--flush-interval", type=int, default=DEFAULT_COLLECTOR_FLUSH_INTERVAL
+    )
+    parser.add_argument(
+        "--max-buffer-size", type=int, default=DEFAULT_COLLECTOR_BUFFER_SIZE
+    )
+    parser.add_argument("--compression", default="gzip")
+    parser.add_argument("--spool-dir")
+    parser.add_argument("--blob-offload", action="store_true")
+    parser.add_argument("--session-delta", action="store_true")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = _parse_args(argv)
+    config: PulseConfig = {
+        "api_key": args.api_key,
+        "batch_size": args.batch_size,
+        "flush_interval": args.flush_interval,
+        "max_buffer_size": args.max_buffer_size,
+        "compression": args.compression,
+        "pool_maxsize": 1,
+        "blob_offload": args.blob_offload,
+        "session_delta": args.session_delta,
+        "metrics": True,
+    }
+    if args.api_url:
+        config["api_url"] = args.api_url
+    if args.spool_dir:
+        config["spool_dir"] = args.spool_dir
+    try:
+        init_pulse(config)
+    except ConfigError as exc:
+        raise SystemExit(str(exc)) from exc
+
+    collector = Collector(args.socket)
+    collector.bind()
+    stopping = threading.Event()
+    # serve_forever() must be stopped from another thread.
+    stopper = threading.Thread(target=collector.stop, name="pulse-collector-stop")
+
+    def _stop(signum, frame) -> None:
+        if not stopping.is_set():
+            stopping.set()
+            stopper.start()
+
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+    print(f"Pulse collector: listening on {args.socket}", flush=True)
+    try:
+        collector.serve_forever()
+    finally:
+        if stopping.is_set():
+            # serve_forever() returns before stop() has drained the workers'
+            # connections; the final flush has to wait for those traces.
+            stopper.join()
+        shutdown()
+        _remove_stale_socket(args.socket)
+
+
+if __name__ == "__main__":
+    main()
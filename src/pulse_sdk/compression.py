@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import gzip
+import threading
+from typing import Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:  # optional dependency: pip install pulse-trace-sdk[zstd]
+    zstandard = None  # type: ignore[assignment]
+
+CODECS = ("none", "gzip", "zstd")
+LEVEL_RANGES = {"gzip": (1, 9), "zstd": (1, 22)}
+DEFAULT_LEVELS = {"gzip": 6, "zstd": 3}
+
+
+def zstd_available() -> bool:
+    return zstandard is not None
+
+
+class Compressor:
+    """Compresses request bodies above a size threshold.
+
+    ``encode`` returns the body to send and the ``Content-Encoding`` value to
+    advertise, or ``None`` when the body is sent as-is.
+    """
+
+    def __init__(
+        self, codec: str = "none", level: Optional[int] = None, min_bytes: int = 0
+    ):
+        if codec not in CODECS:
+            raise ValueError(f"Unsupported compression codec: {codec}")
+        if codec == "zstd" and zstandard is None:
+            raise ValueError("zstd compression requires the 'zstandard' package")
+        self.codec = codec
+        self.level = level if level is not None else DEFAULT_LEVELS.get(codec, 0)
+        self.min_bytes = min_bytes
+        self._local = threading.local()
+
+    def encode(self, body: bytes) -> Tuple[bytes, Optional[str]]:
+        if self.codec == "none" or len(body) < self.min_bytes:
+            return body, None
+        if self.codec == "gzip":
+            return gzip.compress(body, compresslevel=self.level, mtime=0), "gzip"
+        return self._zstd().compress(body), "zstd"
+
+    def _zstd(self):
+        # ZstdCompressor instances are not thread-safe; keep one per thread.
+        compressor = getattr(self._local, "zstd", None)
+        if compressor is None:
+            compressor = zstandard.ZstdCompressor(level=self.level)
+            self._local.zstd = compressor
+        return compressor
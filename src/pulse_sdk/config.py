@@ -1,10 +1,60 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Optional
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional
 
+from .batching import (
+    DEFAULT_BATCH_BYTES,
+    DEFAULT_BATCH_TARGET_LATENCY,
+    DEFAULT_MAX_BATCH_SIZE,
+    DEFAULT_MAX_IN_FLIGHT,
+    MAX_BATCH_SIZE,
+    MAX_IN_FLIGHT,
+    MIN_BATCH_BYTES,
+    MIN_FLUSH_INTERVAL,
+)
+from .blobs import DEFAULT_BLOB_CACHE_SIZE, DEFAULT_BLOB_MIN_BYTES
+from .buffer import (
+    DEFAULT_BLOCK_TIMEOUT,
+    DEFAULT_MAX_BUFFER_BYTES,
+    DEFAULT_MAX_BUFFER_SIZE,
+    DEFAULT_OVERFLOW_POLICY,
+    OVERFLOW_POLICIES,
+)
+from .capture import (
+    BINARY_PART_MODES,
+    CAPTURE_MODES,
+    DEFAULT_MAX_FIELD_BYTES,
+    MIN_MAX_FIELD_BYTES,
+    CapturePolicy,
+)
+from .compression import CODECS, LEVEL_RANGES, zstd_available
+from .delta import DEFAULT_SESSION_DELTA_CACHE_SIZE
+from .metrics import DEFAULT_METRICS_INTERVAL, DEFAULT_METRICS_MAX_SERIES
+from .pricing import PricingIndex
+from .retry import (
+    DEFAULT_CIRCUIT_FAILURE_THRESHOLD,
+    DEFAULT_CIRCUIT_RESET_TIMEOUT,
+    DEFAULT_MAX_RETRIES,
+    DEFAULT_RETRY_BASE_DELAY,
+    DEFAULT_RETRY_MAX_DELAY,
+)
+from .sampling import SamplingPolicy
+from .serialization import SERIALIZERS, orjson_available
+from .spool import (
+    DEFAULT_SPOOL_FSYNC_INTERVAL,
+    DEFAULT_SPOOL_MAX_BYTES,
+    DEFAULT_SPOOL_SEGMENT_BYTES,
+)
+from .telemetry import DEFAULT_STATS_INTERVAL
 from .types import PulseConfig
 
+if TYPE_CHECKING:
+    from .transport import Transport
+
+
+DEFAULT_REQUEST_TIMEOUT = 10_000  # ms
+
 
 @dataclass(frozen=True)
 class ResolvedConfig:
@@ -13,12 +63,63 @@ class ResolvedConfig:
     batch_size: int
     flush_interval: int
     enabled: bool
+    max_batch_size: int = DEFAULT_MAX_BATCH_SIZE
+    batch_bytes: int = DEFAULT_BATCH_BYTES
+    adaptive_batching: bool = True
+    batch_target_latency: int = DEFAULT_BATCH_TARGET_LATENCY
+    max_in_flight: int = DEFAULT_MAX_IN_FLIGHT
+    pool_connections: int = 1
+    pool_maxsize: int = 2
+    compression: str = "none"
+    compression_level: Optional[int] = None
+    compression_min_bytes: int = 1024
+    capture_mode: str = "full"
+    capture_policy: CapturePolicy = CapturePolicy()
+    sampling: SamplingPolicy = SamplingPolicy()
+    blob_offload: bool = False
+    blob_min_bytes: int = DEFAULT_BLOB_MIN_BYTES
+    blob_cache_size: int = DEFAULT_BLOB_CACHE_SIZE
+    blob_ttl: Optional[float] = None
+    session_delta: bool = False
+    session_delta_cache_size: int = DEFAULT_SESSION_DELTA_CACHE_SIZE
+    max_buffer_size: int = DEFAULT_MAX_BUFFER_SIZE
+    max_buffer_bytes: Optional[int] = DEFAULT_MAX_BUFFER_BYTES
+    overflow_policy: str = DEFAULT_OVERFLOW_POLICY
+    block_timeout: int = DEFAULT_BLOCK_TIMEOUT
+    request_timeout: int = DEFAULT_REQUEST_TIMEOUT
+    max_retries: int = DEFAULT_MAX_RETRIES
+    retry_base_delay: int = DEFAULT_RETRY_BASE_DELAY
+    retry_max_delay: int = DEFAULT_RETRY_MAX_DELAY
+    circuit_failure_threshold: int = DEFAULT_CIRCUIT_FAILURE_THRESHOLD
+    circuit_reset_timeout: int = DEFAULT_CIRCUIT_RESET_TIMEOUT
+    spool_dir: Optional[str] = None
+    spool_max_bytes: int = DEFAULT_SPOOL_MAX_BYTES
+    spool_segment_bytes: int = DEFAULT_SPOOL_SEGMENT_BYTES
+    spool_fsync_interval: int = DEFAULT_SPOOL_FSYNC_INTERVAL
+    collector_socket: Optional[str] = None
+    defer_trace_build: bool = False
+    serializer: str = "auto"
+    encode_in_background: bool = False
+    pricing_file: Optional[str] = None
+    pricing: Optional[PricingIndex] = None
+    metrics: bool = False
+    metrics_interval: int = DEFAULT_METRICS_INTERVAL
+    metrics_max_series: int = DEFAULT_METRICS_MAX_SERIES
+    metrics_tag_key: Optional[str] = None
+    stats_callback: Optional[Callable[[Dict[str, Any]], None]] = None
+    stats_interval: int = DEFAULT_STATS_INTERVAL
+    transport: Optional["Transport"] = None
 
 
 DEFAULT_API_URL = "http://localhost:3000"
 DEFAULT_BATCH_SIZE = 10
 DEFAULT_FLUSH_INTERVAL = 5000  # ms
 DEFAULT_ENABLED = True
+DEFAULT_POOL_CONNECTIONS = 1
+DEFAULT_POOL_MAXSIZE = 2
+DEFAULT_COMPRESSION = "none"
+DEFAULT_COMPRESSION_MIN_BYTES = 1024
+DEFAULT_CAPTURE_MODE = "full"
 
 
 class ConfigError(ValueError):
@@ -34,20 +135,334 @@ def load_config(config: PulseConfig) -> ResolvedConfig:
         raise ConfigError("Pulse SDK: api_key must start with 'pulse_sk_'")
 
     batch_size = int(config.get("batch_size", DEFAULT_BATCH_SIZE))
-    if batch_size < 1 or batch_size > 100:
-        raise ConfigError("Pulse SDK: batch_size must be between 1 and 100")
+    if batch_size < 1 or batch_size > MAX_BATCH_SIZE:
+        raise ConfigError(
+            f"Pulse SDK: batch_size must be between 1 and {MAX_BATCH_SIZE}"
+        )
+
+    max_batch_size = int(
+        config.get("max_batch_size", max(batch_size, DEFAULT_MAX_BATCH_SIZE))
+    )
+    if max_batch_size < batch_size or max_batch_size > MAX_BATCH_SIZE:
+        raise ConfigError(
+            "Pulse SDK: max_batch_size must be between batch_size "
+            f"and {MAX_BATCH_SIZE}"
+        )
+
+    batch_bytes = int(config.get("batch_bytes", DEFAULT_BATCH_BYTES))
+    if batch_bytes < MIN_BATCH_BYTES:
+        raise ConfigError(f"Pulse SDK: batch_bytes must be at least {MIN_BATCH_BYTES}")
+
+    adaptive_batching = bool(config.get("adaptive_batching", True))
+    batch_target_latency = int(
+        config.get("batch_target_latency", DEFAULT_BATCH_TARGET_LATENCY)
+    )
+    if batch_target_latency < 1:
+        raise ConfigError("Pulse SDK: batch_target_latency must be positive")
+
+    max_in_flight = int(config.get("max_in_flight", DEFAULT_MAX_IN_FLIGHT))
+    if max_in_flight < 1 or max_in_flight > MAX_IN_FLIGHT:
+        raise ConfigError(
+            f"Pulse SDK: max_in_flight must be between 1 and {MAX_IN_FLIGHT}"
+        )
 
     flush_interval = int(config.get("flush_interval", DEFAULT_FLUSH_INTERVAL))
-    if flush_interval < 1000:
-        raise ConfigError("Pulse SDK: flush_interval must be at least 1000ms")
+    if flush_interval < MIN_FLUSH_INTERVAL:
+        raise ConfigError(
+            f"Pulse SDK: flush_interval must be at least {MIN_FLUSH_INTERVAL}ms"
+        )
 
     api_url = config.get("api_url", DEFAULT_API_URL)
     enabled = bool(config.get("enabled", DEFAULT_ENABLED))
 
+    pool_connections = int(config.get("pool_connections", DEFAULT_POOL_CONNECTIONS))
+    if pool_connections < 1:
+        raise ConfigError("Pulse SDK: pool_connections must be at least 1")
+
+    pool_maxsize = int(config.get("pool_maxsize", DEFAULT_POOL_MAXSIZE))
+    if pool_maxsize < 1:
+        raise ConfigError("Pulse SDK: pool_maxsize must be at least 1")
+
+    compression = str(config.get("compression", DEFAULT_COMPRESSION)).lower()
+    if compression not in CODECS:
+        raise ConfigError(f"Pulse SDK: compression must be one of {', '.join(CODECS)}")
+    if compression == "zstd" and not zstd_available():
+        raise ConfigError(
+            "Pulse SDK: zstd compression requires the 'zstandard' package"
+        )
+
+    compression_level = config.get("compression_level")
+    if compression_level is not None:
+        compression_level = int(compression_level)
+        low, high = LEVEL_RANGES.get(
+            compression, (compression_level, compression_level)
+        )
+        if not low <= compression_level <= high:
+            raise ConfigError(
+                f"Pulse SDK: compression_level for {compression} must be between {low} and {high}"
+            )
+
+    compression_min_bytes = int(
+        config.get("compression_min_bytes", DEFAULT_COMPRESSION_MIN_BYTES)
+    )
+    if compression_min_bytes < 0:
+        raise ConfigError("Pulse SDK: compression_min_bytes must be non-negative")
+
+    capture_mode = str(config.get("capture_mode", DEFAULT_CAPTURE_MODE)).lower()
+    if capture_mode not in CAPTURE_MODES:
+        raise ConfigError(
+            f"Pulse SDK: capture_mode must be one of {', '.join(CAPTURE_MODES)}"
+        )
+
+    max_field_bytes = config.get("max_field_bytes", DEFAULT_MAX_FIELD_BYTES)
+    if max_field_bytes is not None:
+        max_field_bytes = int(max_field_bytes)
+        if max_field_bytes < MIN_MAX_FIELD_BYTES:
+            raise ConfigError(
+                f"Pulse SDK: max_field_bytes must be at least {MIN_MAX_FIELD_BYTES}"
+            )
+
+    binary_parts = str(config.get("binary_parts", "placeholder")).lower()
+    if binary_parts not in BINARY_PART_MODES:
+        raise ConfigError(
+            f"Pulse SDK: binary_parts must be one of {', '.join(BINARY_PART_MODES)}"
+        )
+
+    sample_rate = _sample_rate("sample_rate", config.get("sample_rate", 1.0))
+    provider_rates = {
+        str(getattr(provider, "value", provider)): _sample_rate(
+            f"provider_sample_rates[{provider!r}]", rate
+        )
+        for provider, rate in (config.get("provider_sample_rates") or {}).items()
+    }
+    model_rates = {
+        str(model): _sample_rate(f"model_sample_rates[{model!r}]", rate)
+        for model, rate in (config.get("model_sample_rates") or {}).items()
+    }
+    keep_slow_ms = config.get("keep_slow_ms")
+    if keep_slow_ms is not None:
+        keep_slow_ms = float(keep_slow_ms)
+        if keep_slow_ms < 0:
+            raise ConfigError("Pulse SDK: keep_slow_ms must be non-negative")
+    keep_cost_cents = config.get("keep_cost_cents")
+    if keep_cost_cents is not None:
+        keep_cost_cents = float(keep_cost_cents)
+        if keep_cost_cents < 0:
+            raise ConfigError("Pulse SDK: keep_cost_cents must be non-negative")
+
+    blob_offload = bool(config.get("blob_offload", False))
+    blob_min_bytes = int(config.get("blob_min_bytes", DEFAULT_BLOB_MIN_BYTES))
+    if blob_min_bytes < 256:
+        raise ConfigError("Pulse SDK: blob_min_bytes must be at least 256")
+
+    blob_cache_size = int(config.get("blob_cache_size", DEFAULT_BLOB_CACHE_SIZE))
+    if blob_cache_size < 1:
+        raise ConfigError("Pulse SDK: blob_cache_size must be at least 1")
+
+    blob_ttl = config.get("blob_ttl")
+    if blob_ttl is not None:
+        blob_ttl = float(blob_ttl)
+        if blob_ttl <= 0:
+            raise ConfigError("Pulse SDK: blob_ttl must be positive")
+
+    session_delta = bool(config.get("session_delta", False))
+    session_delta_cache_size = int(
+        config.get("session_delta_cache_size", DEFAULT_SESSION_DELTA_CACHE_SIZE)
+    )
+    if session_delta_cache_size < 1:
+        raise ConfigError("Pulse SDK: session_delta_cache_size must be at least 1")
+
+    max_buffer_size = int(config.get("max_buffer_size", DEFAULT_MAX_BUFFER_SIZE))
+    if max_buffer_size < batch_size:
+        raise ConfigError("Pulse SDK: max_buffer_size must be at least batch_size")
+
+    max_buffer_bytes = config.get("max_buffer_bytes", DEFAULT_MAX_BUFFER_BYTES)
+    if max_buffer_bytes is not None:
+        max_buffer_bytes = int(max_buffer_bytes)
+        if max_buffer_bytes < 1:
+            raise ConfigError("Pulse SDK: max_buffer_bytes must be positive")
+
+    overflow_policy = str(
+        config.get("overflow_policy", DEFAULT_OVERFLOW_POLICY)
+    ).lower()
+    if overflow_policy not in OVERFLOW_POLICIES:
+        raise ConfigError(
+            f"Pulse SDK: overflow_policy must be one of {', '.join(OVERFLOW_POLICIES)}"
+        )
+
+    block_timeout = int(config.get("block_timeout", DEFAULT_BLOCK_TIMEOUT))
+    if block_timeout < 0:
+        raise ConfigError("Pulse SDK: block_timeout must be non-negative")
+
+    request_timeout = int(config.get("request_timeout", DEFAULT_REQUEST_TIMEOUT))
+    if request_timeout < 1:
+        raise ConfigError("Pulse SDK: request_timeout must be positive")
+
+    max_retries = int(config.get("max_retries", DEFAULT_MAX_RETRIES))
+    if max_retries < 0:
+        raise ConfigError("Pulse SDK: max_retries must be non-negative")
+
+    retry_base_delay = int(config.get("retry_base_delay", DEFAULT_RETRY_BASE_DELAY))
+    retry_max_delay = int(config.get("retry_max_delay", DEFAULT_RETRY_MAX_DELAY))
+    if retry_base_delay < 1 or retry_max_delay < retry_base_delay:
+        raise ConfigError(
+            "Pulse SDK: retry delays must satisfy 1 <= retry_base_delay <= retry_max_delay"
+        )
+
+    circuit_failure_threshold = int(
+        config.get("circuit_failure_threshold", DEFAULT_CIRCUIT_FAILURE_THRESHOLD)
+    )
+    if circuit_failure_threshold < 1:
+        raise ConfigError("Pulse SDK: circuit_failure_threshold must be at least 1")
+
+    circuit_reset_timeout = int(
+        config.get("circuit_reset_timeout", DEFAULT_CIRCUIT_RESET_TIMEOUT)
+    )
+    if circuit_reset_timeout < 0:
+        raise ConfigError("Pulse SDK: circuit_reset_timeout must be non-negative")
+
+    spool_dir = config.get("spool_dir")
+    spool_max_bytes = int(config.get("spool_max_bytes", DEFAULT_SPOOL_MAX_BYTES))
+    spool_segment_bytes = int(
+        config.get("spool_segment_bytes", DEFAULT_SPOOL_SEGMENT_BYTES)
+    )
+    if not 0 < spool_segment_bytes <= spool_max_bytes:
+        raise ConfigError(
+            "Pulse SDK: spool_segment_bytes must be positive and at most spool_max_bytes"
+        )
+    spool_fsync_interval = int(
+        config.get("spool_fsync_interval", DEFAULT_SPOOL_FSYNC_INTERVAL)
+    )
+    if spool_fsync_interval < 0:
+        raise ConfigError("Pulse SDK: spool_fsync_interval must be non-negative")
+
+    defer_trace_build = bool(config.get("defer_trace_build", False))
+
+    serializer = str(config.get("serializer", "auto")).lower()
+    if serializer not in SERIALIZERS:
+        raise ConfigError(
+            f"Pulse SDK: serializer must be one of {', '.join(SERIALIZERS)}"
+        )
+    if serializer == "orjson" and not orjson_available():
+        raise ConfigError(
+            "Pulse SDK: the orjson serializer requires the 'orjson' package"
+        )
+    encode_in_background = bool(config.get("encode_in_background", False))
+
+    pricing_file = config.get("pricing_file")
+    pricing = None
+    if pricing_file:
+        try:
+            pricing = PricingIndex(pricing_file=str(pricing_file))
+        except (OSError, ValueError) as exc:
+            raise ConfigError(
+                f"Pulse SDK: cannot load pricing_file {pricing_file}: {exc}"
+            ) from exc
+
+    metrics = bool(config.get("metrics", False))
+    metrics_interval = int(config.get("metrics_interval", DEFAULT_METRICS_INTERVAL))
+    if metrics_interval < 1000:
+        raise ConfigError("Pulse SDK: metrics_interval must be at least 1000ms")
+    metrics_max_series = int(
+        config.get("metrics_max_series", DEFAULT_METRICS_MAX_SERIES)
+    )
+    if metrics_max_series < 1:
+        raise ConfigError("Pulse SDK: metrics_max_series must be at least 1")
+    metrics_tag_key = config.get("metrics_tag_key")
+
+    stats_callback = config.get("stats_callback")
+    if stats_callback is not None and not callable(stats_callback):
+        raise ConfigError("Pulse SDK: stats_callback must be callable")
+    stats_interval = int(config.get("stats_interval", DEFAULT_STATS_INTERVAL))
+    if stats_interval < 1000:
+        raise ConfigError("Pulse SDK: stats_interval must be at least 1000ms")
+
+    collector_socket = config.get("collector_socket")
+    transport = config.get("transport")
+    if transport is not None:
+        from .transport import Transport
+
+        if not isinstance(transport, Transport):
+            raise ConfigError("Pulse SDK: transport must be a Transport instance")
+        if collector_socket:
+            raise ConfigError(
+                "Pulse SDK: transport and collector_socket are mutually exclusive"
+            )
+        if blob_offload and type(transport).send_blobs is Transport.send_blobs:
+            raise ConfigError(
+                "Pulse SDK: blob_offload requires a transport that implements "
+                "send_blobs"
+            )
+        if metrics and type(transport).send_metrics is Transport.send_metrics:
+            raise ConfigError(
+                "Pulse SDK: metrics requires a transport that implements "
+                "send_metrics"
+            )
+
     return ResolvedConfig(
         api_key=api_key,
         api_url=api_url,
         batch_size=batch_size,
         flush_interval=flush_interval,
         enabled=enabled,
+        max_batch_size=max_batch_size,
+        batch_bytes=batch_bytes,
+        adaptive_batching=adaptive_batching,
+        batch_target_latency=batch_target_latency,
+        max_in_flight=max_in_flight,
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        compression=compression,
+        compression_level=compression_level,
+        compression_min_bytes=compression_min_bytes,
+        capture_mode=capture_mode,
+        capture_policy=CapturePolicy(max_field_bytes, binary_parts),
+        sampling=SamplingPolicy(
+            sample_rate,
+            provider_rates,
+            model_rates,
+            bool(config.get("keep_errors", True)),
+            keep_slow_ms,
+            keep_cost_cents,
+        ),
+        blob_offload=blob_offload,
+        blob_min_bytes=blob_min_bytes,
+        blob_cache_size=blob_cache_size,
+        blob_ttl=blob_ttl,
+        session_delta=session_delta,
+        session_delta_cache_size=session_delta_cache_size,
+        max_buffer_size=max_buffer_size,
+        max_buffer_bytes=max_buffer_bytes,
+        overflow_policy=overflow_policy,
+        block_timeout=block_timeout,
+        request_timeout=request_timeout,
+        max_retries=max_retries,
+        retry_base_delay=retry_base_delay,
+        retry_max_delay=retry_max_delay,
+        circuit_failure_threshold=circuit_failure_threshold,
+        circuit_reset_timeout=circuit_reset_timeout,
+        spool_dir=str(spool_dir) if spool_dir else None,
+        spool_max_bytes=spool_max_bytes,
+        spool_segment_bytes=spool_segment_bytes,
+        spool_fsync_interval=spool_fsync_interval,
+        collector_socket=str(collector_socket) if collector_socket else None,
+        defer_trace_build=defer_trace_build,
+        serializer=serializer,
+        encode_in_background=encode_in_background,
+        pricing_file=str(pricing_file) if pricing_file else None,
+        pricing=pricing,
+        metrics=metrics,
+        metrics_interval=metrics_interval,
+        metrics_max_series=metrics_max_series,
+        metrics_tag_key=str(metrics_tag_key) if metrics_tag_key else None,
+        stats_callback=stats_callback,
+        stats_interval=stats_interval,
+        transport=transport,
     )
+
+
+def _sample_rate(name: str, value: object) -> float:
+    rate = float(value)  # type: ignore[arg-type]
+    if not 0.0 <= rate <= 1.0:
+        raise ConfigError(f"Pulse SDK: {name} must be between 0 and 1")
+    return rate
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Iterable, List, NamedTuple, Optional
+
+from .types import Trace
+
+DEFAULT_SESSION_DELTA_CACHE_SIZE = 4096
+
+
+class _SessionState(NamedTuple):
+    message_count: int
+    fingerprint: bytes
+    trace_id: str
+
+
+def _chain(fingerprint: bytes, message: Any) -> bytes:
+    encoded = json.dumps(message, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(fingerprint + encoded).digest()
+
+
+class SessionDeltaEncoder:
+    """Sends only the messages appended since the previous trace of a session.
+
+    For every ``session_id`` the encoder remembers a chained hash of the last
+    traced ``messages`` list (bounded LRU). When the next trace's messages
+    start with exactly that prefix, ``request_body["messages"]`` is cut down to
+    the new messages and the trace gets ``parent_trace_id`` plus
+    ``messages_offset`` so the server can rebuild the full history. Anything
+    else (edited history, unknown session, evicted entry) is sent in full.
+    """
+
+    def __init__(self, cache_size: int = DEFAULT_SESSION_DELTA_CACHE_SIZE) -> None:
+        self.cache_size = cache_size
+        self._sessions: "OrderedDict[str, _SessionState]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def encode(self, traces: List[Trace]) -> List[Trace]:
+        return [self._encode(trace) for trace in traces]
+
+    def forget(self, traces: Iterable[Trace]) -> None:
+        """Drop state for sessions whose traces never reached the server."""
+        with self._lock:
+            for trace in traces:
+                session_id = trace.get("session_id")
+                if session_id is not None:
+                    self._sessions.pop(session_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._sessions.clear()
+
+    def _encode(self, trace: Trace) -> Trace:
+        session_id = trace.get("session_id")
+        body = trace.get("request_body")
+        messages = body.get("messages") if isinstance(body, dict) else None
+        if not session_id or not isinstance(messages, list):
+            return trace
+
+        with self._lock:
+            previous: Optional[_SessionState] = self._sessions.get(session_id)
+
+        fingerprint = b""
+        offset = 0
+        for index, message in enumerate(messages):
+            if previous is not None and index == previous.message_count:
+                if fingerprint == previous.fingerprint:
+                    offset = index
+            fingerprint = _chain(fingerprint, message)
+        if (
+            previous is not None
+            and previous.message_count == len(messages)
+            and fingerprint == previous.fingerprint
+        ):
+            offset = len(messages)
+
+        with self._lock:
+            self._sessions[session_id] = _SessionState(
+                len(messages), fingerprint, trace["trace_id"]
+            )
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > self.cache_size:
+                self._sessions.popitem(last=False)
+
+        if not offset:
+            return trace
+        delta: Trace = {
+            **trace,
+            "request_body": {**body, "messages": messages[offset:]},
+        }
+        delta["parent_trace_id"] = previous.trace_id
+        delta["messages_offset"] = offset
+        return delta
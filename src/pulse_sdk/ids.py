@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import os
+import random
+import threading
+from typing import Optional
+
+from .clock import wall_time
+
+_MAX_SEQUENCE = 0xFFF
+_VERSION_AND_VARIANT = (0x7 << 76) | (0b10 << 62)
+
+
+class TraceIdGenerator:
+    """Time-ordered UUIDv7 trace ids (RFC 9562).
+
+    The first 48 bits are the Unix time in milliseconds and the 12 bits after
+    the version hold a counter, so ids from one process sort in the order
+    they were generated, even within a millisecond (the counter borrows the
+    next millisecond when it runs out). The last 62 bits are random, which
+    keeps ids from different processes apart: ``random`` is reseeded in a
+    forked child, and the lock is replaced there.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._last_ms = 0
+        self._sequence = 0
+
+    def __call__(self, epoch: Optional[float] = None) -> str:
+        ms = int((wall_time() if epoch is None else epoch) * 1000)
+        with self._lock:
+            if ms > self._last_ms:
+                self._last_ms = ms
+                self._sequence = 0
+            else:
+                self._sequence += 1
+                if self._sequence > _MAX_SEQUENCE:
+                    self._last_ms += 1
+                    self._sequence = 0
+            ms = self._last_ms
+            sequence = self._sequence
+        value = (
+            (ms << 80)
+            | (sequence << 64)
+            | _VERSION_AND_VARIANT
+            | random.getrandbits(62)
+        )
+        digits = f"{value:032x}"
+        return (
+            f"{digits[:8]}-{digits[8:12]}-{digits[12:16]}-{digits[16:20]}-{digits[20:]}"
+        )
+
+    def after_fork_in_child(self) -> None:
+        self._lock = threading.Lock()
+
+
+generate_trace_id = TraceIdGenerator()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=generate_trace_id.after_fork_in_child)
@@ -0,0 +1,313 @@
+from __future__ import annotations
+
+import math
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from .clock import format_timestamp, wall_time
+from .types import NormalizedResponse
+
+DEFAULT_METRICS_INTERVAL = 10_000  # ms
+DEFAULT_METRICS_MAX_SERIES = 1000
+OVERFLOW_LABEL = "__other__"
+MAX_TAG_LENGTH = 64
+
+RELATIVE_ACCURACY = 0.01
+_GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+_LOG_GAMMA = math.log(_GAMMA)
+MIN_INDEXED_VALUE = 1e-3  # smaller values (and zero) go to zero_count
+MAX_BINS = 2048
+
+SeriesKey = Tuple[str, str, str, Optional[str]]
+
+
+class Sketch:
+    """Mergeable quantile sketch (DDSketch) with 1% relative accuracy.
+
+    Bin ``i`` counts values in ``(gamma**(i-1), gamma**i]``, so any quantile
+    is returned within 1% of the true value and two sketches merge by adding
+    bin counts. Past ``MAX_BINS`` the lowest bins are folded together, which
+    only costs accuracy at the fast end of the distribution.
+    """
+
+    __slots__ = ("bins", "zero_count", "count", "total", "min", "max")
+
+    def __init__(self) -> None:
+        self.bins: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        if value <= MIN_INDEXED_VALUE:
+            self.zero_count += 1
+            return
+        key = math.ceil(math.log(value) / _LOG_GAMMA)
+        bins = self.bins
+        bins[key] = bins.get(key, 0) + 1
+        if len(bins) > MAX_BINS:
+            self._collapse()
+
+    def merge(self, other: "Sketch") -> None:
+        bins = self.bins
+        for key, count in other.bins.items():
+            bins[key] = bins.get(key, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        if len(bins) > MAX_BINS:
+            self._collapse()
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if rank < seen:
+                value = 2 * _GAMMA**key / (_GAMMA + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    @classmethod
+    def from_wire(cls, data: Dict[str, Any]) -> "Sketch":
+        sketch = cls()
+        sketch.bins = {int(key): count for key, count in data["bins"].items()}
+        sketch.zero_count = data["zero_count"]
+        sketch.count = data["count"]
+        sketch.total = data["sum"]
+        if sketch.count:
+            sketch.min = data["min"]
+            sketch.max = data["max"]
+        return sketch
+
+    def to_wire(self) -> Dict[str, Any]:
+        return {
+            "relative_accuracy": RELATIVE_ACCURACY,
+            "count": self.count,
+            "sum": self.total,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "zero_count": self.zero_count,
+            "bins": {str(key): count for key, count in sorted(self.bins.items())},
+        }
+
+    def _collapse(self) -> None:
+        keys = sorted(self.bins)
+        excess = keys[: len(keys) - MAX_BINS + 1]
+        folded = sum(self.bins.pop(key) for key in excess)
+        target = keys[len(excess)]
+        self.bins[target] += folded
+
+
+class Series:
+    """Aggregates for one (provider, model, status, tag) combination."""
+
+    __slots__ = (
+        "count",
+        "errors",
+        "input_tokens",
+        "output_tokens",
+        "cache_read_tokens",
+        "cache_write_tokens",
+        "cost_cents",
+        "priced",
+        "latency_ms",
+    )
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.errors = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.cache_read_tokens = 0
+        self.cache_write_tokens = 0
+        self.cost_cents = 0.0
+        self.priced = 0
+        self.latency_ms = Sketch()
+
+    def merge(self, other: "Series") -> None:
+        self.count += other.count
+        self.errors += other.errors
+        self.input_tokens += other.input_tokens
+        self.output_tokens += other.output_tokens
+        self.cache_read_tokens += other.cache_read_tokens
+        self.cache_write_tokens += other.cache_write_tokens
+        self.cost_cents += other.cost_cents
+        self.priced += other.priced
+        self.latency_ms.merge(other.latency_ms)
+
+    @classmethod
+    def from_wire(cls, rollup: Dict[str, Any]) -> "Series":
+        series = cls()
+        series.count = rollup["count"]
+        series.errors = rollup["errors"]
+        series.input_tokens = rollup["input_tokens"]
+        series.output_tokens = rollup["output_tokens"]
+        series.cache_read_tokens = rollup["cache_read_tokens"]
+        series.cache_write_tokens = rollup["cache_write_tokens"]
+        series.cost_cents = rollup["cost_cents"]
+        series.priced = rollup["priced_count"]
+        series.latency_ms = Sketch.from_wire(rollup["latency_ms"])
+        return series
+
+
+class MetricWindow:
+    """Series collected over ``[start, end)`` (epoch seconds)."""
+
+    __slots__ = ("start", "end", "series")
+
+    def __init__(
+        self, start: float, end: float, series: Dict[SeriesKey, Series]
+    ) -> None:
+        self.start = start
+        self.end = end
+        self.series = series
+
+    def to_wire(self) -> List[Dict[str, Any]]:
+        start = format_timestamp(self.start)
+        end = format_timestamp(self.end)
+        rollups = []
+        for (provider, model, status, tag), series in self.series.items():
+            rollup: Dict[str, Any] = {
+                "window_start": start,
+                "window_end": end,
+                "provider": provider,
+                "model": model,
+                "status": status,
+                "count": series.count,
+                "errors": series.errors,
+                "input_tokens": series.input_tokens,
+                "output_tokens": series.output_tokens,
+                "cache_read_tokens": series.cache_read_tokens,
+                "cache_write_tokens": series.cache_write_tokens,
+                "cost_cents": round(series.cost_cents, 6),
+                "priced_count": series.priced,
+                "latency_ms": series.latency_ms.to_wire(),
+            }
+            if tag is not None:
+                rollup["tag"] = tag
+            rollups.append(rollup)
+        return rollups
+
+
+class MetricAggregator:
+    """Per-process rollups of every traced call, sampled or not.
+
+    Calls are counted before sampling, so counts, token and cost sums and
+    latency quantiles stay exact however few raw traces are kept. At most
+    ``max_series`` label combinations are tracked per window; calls for new
+    ones beyond that are folded into a series whose model and tag are
+    ``OVERFLOW_LABEL``, so memory stays bounded under any cardinality.
+    """
+
+    def __init__(self, max_series: int = DEFAULT_METRICS_MAX_SERIES) -> None:
+        self.max_series = max_series
+        self.overflowed = 0
+        self._series: Dict[SeriesKey, Series] = {}
+        self._start = wall_time()
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        provider: str,
+        model: str,
+        latency_ms: float,
+        response: Optional[NormalizedResponse] = None,
+        cost_cents: Optional[float] = None,
+        error: bool = False,
+        tag: Optional[str] = None,
+    ) -> None:
+        status = "error" if error else "success"
+        if tag is not None and len(tag) > MAX_TAG_LENGTH:
+            tag = tag[:MAX_TAG_LENGTH]
+        key = (provider, model, status, tag)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._new_series(key)
+            series.count += 1
+            if error:
+                series.errors += 1
+            if response is not None:
+                series.input_tokens += response.input_tokens or 0
+                series.output_tokens += response.output_tokens or 0
+                series.cache_read_tokens += response.cache_read_tokens or 0
+                series.cache_write_tokens += response.cache_write_tokens or 0
+            if cost_cents is not None:
+                series.cost_cents += cost_cents
+                series.priced += 1
+            series.latency_ms.add(latency_ms)
+
+    def swap(self) -> MetricWindow:
+        """Take everything recorded since the last swap."""
+        now = wall_time()
+        with self._lock:
+            window = MetricWindow(self._start, now, self._series)
+            self._series = {}
+            self._start = now
+        return window
+
+    def restore(self, window: MetricWindow) -> None:
+        """Merge back a window that could not be sent."""
+        with self._lock:
+            self._start = min(self._start, window.start)
+            for key, series in window.series.items():
+                current = self._series.get(key)
+                if current is None:
+                    current = self._new_series(key)
+                current.merge(series)
+
+    def merge_rollups(self, rollups: List[Dict[str, Any]]) -> None:
+        """Merge rollups forwarded by another process into the current window
+        (the collector's), which they are then reported as part of."""
+        with self._lock:
+            for rollup in rollups:
+                key = (
+                    rollup["provider"],
+                    rollup["model"],
+                    rollup["status"],
+                    rollup.get("tag"),
+                )
+                current = self._series.get(key)
+                if current is None:
+                    current = self._new_series(key)
+                current.merge(Series.from_wire(rollup))
+
+    def after_fork_in_child(self) -> None:
+        # The parent reports what it recorded; the child starts afresh.
+        self._lock = threading.Lock()
+        self._series = {}
+        self._start = wall_time()
+
+    def __len__(self) -> int:
+        return len(self._series)
+
+    def _new_series(self, key: SeriesKey) -> Series:
+        if len(self._series) >= self.max_series:
+            self.overflowed += 1
+            provider, _, status, tag = key
+            key = (
+                provider,
+                OVERFLOW_LABEL,
+                status,
+                None if tag is None else OVERFLOW_LABEL,
+            )
+            series = self._series.get(key)
+            if series is not None:
+                return series
+        series = self._series[key] = Series()
+        return series
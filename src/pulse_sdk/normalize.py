@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Optional
+from typing import Any, List, Optional, Tuple
 
 from .types import NormalizedResponse
 
@@ -23,6 +23,27 @@ ANTHROPIC_STOP_REASON_MAP = {
 }
 
 
+def _token_count(value: Any) -> Optional[int]:
+    return value if isinstance(value, int) and not isinstance(value, bool) else None
+
+
+def openai_cache_read_tokens(usage: Any) -> Optional[int]:
+    details = getattr(usage, "prompt_tokens_details", None)
+    return _token_count(getattr(details, "cached_tokens", None))
+
+
+def anthropic_cache_tokens(usage: Any) -> Tuple[Optional[int], Optional[int]]:
+    """Cache-read and cache-write tokens of an Anthropic ``usage``.
+
+    Unlike OpenAI's ``cached_tokens``, these are not part of the reported
+    ``input_tokens``, which is kept as Anthropic reports it.
+    """
+    return (
+        _token_count(getattr(usage, "cache_read_input_tokens", None)),
+        _token_count(getattr(usage, "cache_creation_input_tokens", None)),
+    )
+
+
 def normalize_openai_response(response: "ChatCompletion") -> NormalizedResponse:
     choice = response.choices[0] if response.choices else None
     content = getattr(choice.message, "content", None) if choice else None
@@ -46,6 +67,7 @@ def normalize_openai_response(response: "ChatCompletion") -> NormalizedResponse:
         finish_reason=finish_reason,
         cost_cents=cost_cents,
         provider_request_id=provider_id,
+        cache_read_tokens=openai_cache_read_tokens(usage),
     )
 
 
@@ -60,6 +82,7 @@ def normalize_anthropic_response(response: "Message") -> NormalizedResponse:
 
     usage = getattr(response, "usage", None)
     input_tokens = getattr(usage, "input_tokens", None)
+    cache_read, cache_write = anthropic_cache_tokens(usage)
     output_tokens = getattr(usage, "output_tokens", None)
 
     stop_reason = getattr(response, "stop_reason", None)
@@ -72,4 +95,146 @@ def normalize_anthropic_response(response: "Message") -> NormalizedResponse:
         input_tokens=input_tokens,
         output_tokens=output_tokens,
         finish_reason=finish_reason,
+        cache_read_tokens=cache_read,
+        cache_write_tokens=cache_write,
+        cache_in_input=False,
+    )
+
+
+class OpenAIStreamAccumulator:
+    """Folds ``ChatCompletionChunk`` objects into a ``NormalizedResponse``.
+
+    Text deltas are kept as references and joined once at the end.
+    """
+
+    __slots__ = (
+        "parts",
+        "model",
+        "provider_request_id",
+        "finish_reason",
+        "input_tokens",
+        "output_tokens",
+        "cache_read_tokens",
+        "cost_cents",
     )
+
+    def __init__(self) -> None:
+        self.parts: List[str] = []
+        self.model: Optional[str] = None
+        self.provider_request_id: Optional[str] = None
+        self.finish_reason: Optional[str] = None
+        self.input_tokens: Optional[int] = None
+        self.output_tokens: Optional[int] = None
+        self.cache_read_tokens: Optional[int] = None
+        self.cost_cents: Optional[float] = None
+
+    def add(self, chunk: Any) -> bool:
+        """Record a chunk; return True if it carried output text."""
+        if self.model is None:
+            self.model = getattr(chunk, "model", None)
+            self.provider_request_id = getattr(chunk, "id", None)
+
+        usage = getattr(chunk, "usage", None)
+        if usage is not None:
+            self.input_tokens = getattr(usage, "prompt_tokens", None)
+            self.output_tokens = getattr(usage, "completion_tokens", None)
+            self.cache_read_tokens = openai_cache_read_tokens(usage)
+            cost_value = getattr(usage, "cost", None)
+            if isinstance(cost_value, (int, float)):
+                self.cost_cents = cost_value * 100
+
+        has_text = False
+        for choice in getattr(chunk, "choices", None) or ():
+            if getattr(choice, "index", 0) != 0:
+                continue
+            text = getattr(getattr(choice, "delta", None), "content", None)
+            if isinstance(text, str) and text:
+                self.parts.append(text)
+                has_text = True
+            finish_reason = getattr(choice, "finish_reason", None)
+            if finish_reason:
+                self.finish_reason = finish_reason
+        return has_text
+
+    def result(self) -> NormalizedResponse:
+        return NormalizedResponse(
+            model=self.model or "unknown",
+            content="".join(self.parts) if self.parts else None,
+            input_tokens=self.input_tokens,
+            output_tokens=self.output_tokens,
+            finish_reason=self.finish_reason,
+            cost_cents=self.cost_cents,
+            provider_request_id=self.provider_request_id,
+            cache_read_tokens=self.cache_read_tokens,
+        )
+
+
+class AnthropicStreamAccumulator:
+    """Folds Anthropic ``MessageStreamEvent`` objects into a ``NormalizedResponse``."""
+
+    __slots__ = (
+        "parts",
+        "model",
+        "provider_request_id",
+        "finish_reason",
+        "input_tokens",
+        "output_tokens",
+        "cache_read_tokens",
+        "cache_write_tokens",
+    )
+
+    def __init__(self) -> None:
+        self.parts: List[str] = []
+        self.model: Optional[str] = None
+        self.provider_request_id: Optional[str] = None
+        self.finish_reason: Optional[str] = None
+        self.input_tokens: Optional[int] = None
+        self.output_tokens: Optional[int] = None
+        self.cache_read_tokens: Optional[int] = None
+        self.cache_write_tokens: Optional[int] = None
+
+    def add(self, event: Any) -> bool:
+        """Record an event; return True if it carried output text."""
+        event_type = getattr(event, "type", None)
+        if event_type == "content_block_delta":
+            delta = getattr(event, "delta", None)
+            if getattr(delta, "type", None) == "text_delta":
+                text = getattr(delta, "text", None)
+                if text:
+                    self.parts.append(text)
+                    return True
+        elif event_type == "message_start":
+            message = getattr(event, "message", None)
+            self.model = getattr(message, "model", None)
+            self.provider_request_id = getattr(message, "id", None)
+            usage = getattr(message, "usage", None)
+            self.input_tokens = getattr(usage, "input_tokens", None)
+            self.cache_read_tokens, self.cache_write_tokens = anthropic_cache_tokens(
+                usage
+            )
+            self.output_tokens = getattr(usage, "output_tokens", None)
+        elif event_type == "message_delta":
+            stop_reason = getattr(getattr(event, "delta", None), "stop_reason", None)
+            if stop_reason:
+                self.finish_reason = ANTHROPIC_STOP_REASON_MAP.get(
+                    stop_reason, stop_reason
+                )
+            output_tokens = getattr(
+                getattr(event, "usage", None), "output_tokens", None
+            )
+            if output_tokens is not None:
+                self.output_tokens = output_tokens
+        return False
+
+    def result(self) -> NormalizedResponse:
+        return NormalizedResponse(
+            model=self.model or "unknown",
+            content="".join(self.parts) if self.parts else None,
+            input_tokens=self.input_tokens,
+            output_tokens=self.output_tokens,
+            finish_reason=self.finish_reason,
+            provider_request_id=self.provider_request_id,
+            cache_read_tokens=self.cache_read_tokens,
+            cache_write_tokens=self.cache_write_tokens,
+            cache_in_input=False,
+        )
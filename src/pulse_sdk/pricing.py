@@ -1,7 +1,14 @@
 from __future__ import annotations
 
-from typing import Dict, Optional
+import json
+import os
+import re
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
+# Prices are in cents per million tokens. ``cached_input`` (prompt-cache
+# reads) and ``cache_write`` (prompt-cache writes) are optional; when a model
+# does not list them they come from CACHE_PRICE_RATIOS, else the input price.
 ModelPricing = Dict[str, float]
 
 MODEL_PRICING: Dict[str, ModelPricing] = {
@@ -95,23 +102,251 @@ MODEL_ALIASES: Dict[str, str] = {
 }
 
 
-def _resolve_model(model: str) -> Optional[ModelPricing]:
-    if model in MODEL_PRICING:
-        return MODEL_PRICING[model]
-    alias = MODEL_ALIASES.get(model)
-    if alias and alias in MODEL_PRICING:
-        return MODEL_PRICING[alias]
-    return None
+# Multipliers of the input price, by model family (longest prefix wins).
+# An empty entry bills cache tokens at the input price, for models without
+# prompt-cache discounts inside a family that has them.
+CACHE_PRICE_RATIOS: Dict[str, Dict[str, float]] = {
+    "gpt-5": {"cached_input": 0.1},
+    "gpt-5-pro": {},
+    "gpt-4.1": {"cached_input": 0.25},
+    "gpt-4o": {"cached_input": 0.5},
+    "gpt-realtime": {"cached_input": 0.1},
+    "o1": {"cached_input": 0.5},
+    "o1-pro": {},
+    "o3": {"cached_input": 0.25},
+    "o3-pro": {},
+    "o4-mini": {"cached_input": 0.25},
+    "codex-mini": {"cached_input": 0.25},
+    "claude": {"cached_input": 0.1, "cache_write": 1.25},
+}
 
+DEFAULT_PRICING_CACHE_SIZE = 4096
+PRICING_RELOAD_INTERVAL = 5.0  # seconds between pricing file mtime checks
 
-def calculate_cost(
-    model: str, input_tokens: int, output_tokens: int
-) -> Optional[float]:
-    pricing = _resolve_model(model)
-    if not pricing:
+_DATE_SUFFIX = re.compile(r"-(?:\d{4}-\d{2}-\d{2}|\d{8}|\d{4}|latest)$")
+_MISSING: ModelPricing = {}
+
+
+def normalize_model_name(model: str) -> str:
+    """Lowercase, without ``vendor/`` prefix, ``:variant`` or date suffix."""
+    name = model.strip().lower()
+    name = name.rsplit("/", 1)[-1].split(":", 1)[0]
+    while True:
+        stripped = _DATE_SUFFIX.sub("", name)
+        if stripped == name:
+            return name
+        name = stripped
+
+
+def load_pricing_file(path: str) -> Tuple[Dict[str, ModelPricing], Dict[str, str]]:
+    """Read ``{"models": {...}, "aliases": {...}}`` from a JSON file."""
+    with open(path, encoding="utf-8") as handle:
+        data = json.load(handle)
+    if not isinstance(data, dict):
+        raise ValueError("pricing file must contain a JSON object")
+    models = data.get("models", {})
+    aliases = data.get("aliases", {})
+    if not isinstance(models, dict) or not isinstance(aliases, dict):
+        raise ValueError("'models' and 'aliases' must be objects")
+    for name, prices in models.items():
+        if (
+            not isinstance(prices, dict)
+            or "input" not in prices
+            or "output" not in prices
+            or not all(_is_price(value) for value in prices.values())
+        ):
+            raise ValueError(f"invalid prices for {name!r}")
+    return models, {str(key): str(value) for key, value in aliases.items()}
+
+
+def _is_price(value: Any) -> bool:
+    return (
+        isinstance(value, (int, float)) and not isinstance(value, bool) and value >= 0
+    )
+
+
+class PricingIndex:
+    """Resolves model strings to prices, memoized per raw string.
+
+    A model string is looked up as given, then normalized (see
+    ``normalize_model_name``, plus ``3.5`` -> ``3-5`` for Claude-style
+    names), then by its longest ``-``-separated prefix that names a known
+    model or family, so ``gpt-4o-mini-2025-01-31`` and
+    ``openrouter/anthropic/claude-sonnet-4-5`` both resolve. Each distinct
+    string is resolved once; results, misses included, are kept in a bounded
+    cache that forgets its oldest entries first.
+
+    With ``pricing_file``, entries from the file extend or override the
+    built-in tables, and the file is re-read (at most every ``reload_interval``
+    seconds, when its mtime changes) without restarting. A file that fails to
+    load keeps the previous prices.
+    """
+
+    def __init__(
+        self,
+        pricing: Optional[Dict[str, ModelPricing]] = None,
+        aliases: Optional[Dict[str, str]] = None,
+        pricing_file: Optional[str] = None,
+        cache_size: int = DEFAULT_PRICING_CACHE_SIZE,
+        reload_interval: float = PRICING_RELOAD_INTERVAL,
+    ) -> None:
+        self._base_pricing = MODEL_PRICING if pricing is None else pricing
+        self._base_aliases = MODEL_ALIASES if aliases is None else aliases
+        self.pricing_file = pricing_file
+        self.cache_size = cache_size
+        self.reload_interval = reload_interval
+        self._cache: Dict[str, ModelPricing] = {}
+        self._mtime: Optional[float] = None
+        self._next_check = 0.0
+        if pricing_file:
+            models, file_aliases = load_pricing_file(pricing_file)
+            self._mtime = os.stat(pricing_file).st_mtime
+            self._next_check = time.monotonic() + reload_interval
+            self._build(models, file_aliases)
+        else:
+            self._build({}, {})
+
+    def resolve(self, model: str) -> Optional[ModelPricing]:
+        if self.pricing_file and time.monotonic() >= self._next_check:
+            self._maybe_reload()
+        cache = self._cache
+        pricing = cache.get(model)
+        if pricing is None:
+            pricing = self._lookup(model) or _MISSING
+            if len(cache) >= self.cache_size:
+                try:
+                    del cache[next(iter(cache))]
+                except (KeyError, RuntimeError, StopIteration):
+                    pass  # another thread evicted first
+            cache[model] = pricing
+        return pricing or None
+
+    def cost(
+        self,
+        model: str,
+        input_tokens: int,
+        output_tokens: int,
+        cache_read_tokens: int = 0,
+        cache_write_tokens: int = 0,
+        cache_in_input: bool = True,
+    ) -> Optional[float]:
+        pricing = self.resolve(model)
+        if not pricing:
+            return None
+        uncached = input_tokens
+        if cache_in_input:
+            uncached = max(input_tokens - cache_read_tokens - cache_write_tokens, 0)
+        cost = uncached * pricing["input"]
+        cost += cache_read_tokens * pricing["cached_input"]
+        cost += cache_write_tokens * pricing["cache_write"]
+        cost += output_tokens * pricing["output"]
+        return round(cost / 1_000_000, 6)
+
+    def _build(
+        self, file_pricing: Dict[str, ModelPricing], file_aliases: Dict[str, str]
+    ) -> None:
+        pricing = {**self._base_pricing, **file_pricing}
+        aliases = {**self._base_aliases, **file_aliases}
+        # Each lookup name maps to the pricing entry it resolves to, so cache
+        # ratios follow the entry rather than whatever the alias looks like.
+        names: Dict[str, str] = {}
+        # Later assignments win: dated snapshots, then aliases, then exact names.
+        for name in sorted(pricing):
+            names[normalize_model_name(name)] = name
+        for alias, target in aliases.items():
+            if target in pricing:
+                names[normalize_model_name(alias)] = target
+        for name in pricing:
+            names[name.lower()] = name
+        self._exact = {
+            key: _with_cache_prices(entry.lower(), pricing[entry])
+            for key, entry in names.items()
+        }
+        self._exact.update(
+            (alias, self._exact[target.lower()])
+            for alias, target in aliases.items()
+            if target in pricing
+        )
+        self._cache = {}
+
+    def _lookup(self, model: str) -> Optional[ModelPricing]:
+        exact = self._exact
+        if model in exact:
+            return exact[model]
+        for name in _candidates(model):
+            if name in exact:
+                return exact[name]
+            parts = name.split("-")
+            for end in range(len(parts) - 1, 0, -1):
+                prefix = "-".join(parts[:end])
+                if prefix in exact:
+                    return exact[prefix]
         return None
 
-    cost = 0.0
-    cost += (input_tokens * pricing["input"]) / 1_000_000
-    cost += (output_tokens * pricing["output"]) / 1_000_000
-    return round(cost, 6)
+    def _maybe_reload(self) -> None:
+        self._next_check = time.monotonic() + self.reload_interval
+        path = self.pricing_file
+        try:
+            mtime = os.stat(path).st_mtime
+            if mtime == self._mtime:
+                return
+            models, aliases = load_pricing_file(path)
+        except (OSError, ValueError) as exc:
+            print(f"Pulse SDK: keeping previous prices, cannot load {path}: {exc}")
+            return
+        self._mtime = mtime
+        self._build(models, aliases)
+
+
+def _candidates(model: str) -> Iterator[str]:
+    name = normalize_model_name(model)
+    yield name
+    if name.startswith("claude") and "." in name:
+        yield name.replace(".", "-")
+
+
+def _with_cache_prices(name: str, pricing: ModelPricing) -> ModelPricing:
+    if "cached_input" in pricing and "cache_write" in pricing:
+        return pricing
+    families: List[str] = [
+        family for family in CACHE_PRICE_RATIOS if name.startswith(family)
+    ]
+    ratios = CACHE_PRICE_RATIOS[max(families, key=len)] if families else {}
+    return {
+        "cached_input": pricing["input"] * ratios.get("cached_input", 1.0),
+        "cache_write": pricing["input"] * ratios.get("cache_write", 1.0),
+        **pricing,
+    }
+
+
+_index = PricingIndex()
+
+
+def get_pricing_index() -> PricingIndex:
+    return _index
+
+
+def set_pricing_index(index: Optional[PricingIndex]) -> None:
+    global _index
+    _index = index if index is not None else PricingIndex()
+
+
+def calculate_cost(
+    model: str,
+    input_tokens: int,
+    output_tokens: int,
+    cache_read_tokens: int = 0,
+    cache_write_tokens: int = 0,
+    cache_in_input: bool = True,
+) -> Optional[float]:
+    """Cost in cents. Cache tokens are the prompt tokens read from and written
+    to the provider's prompt cache: part of ``input_tokens`` (OpenAI), or on
+    top of it with ``cache_in_input=False`` (Anthropic)."""
+    return _index.cost(
+        model,
+        input_tokens,
+        output_tokens,
+        cache_read_tokens,
+        cache_write_tokens,
+        cache_in_input,
+    )
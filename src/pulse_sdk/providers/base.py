@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import functools
+import inspect
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from ..capture import capture_references, snapshot_request
+from ..clock import wall_time
+from ..state import add_to_buffer, get_config, is_enabled, record_call
+from ..telemetry import get_telemetry
+from ..trace import PendingTrace, extract_pulse_params, resolve_trace_metadata
+from ..types import NormalizedResponse, ObserveOptions, Provider
+from .streaming import AsyncTracedStream, TracedStream
+
+Normalizer = Callable[[Any], NormalizedResponse]
+
+
+def is_async_callable(func: Any) -> bool:
+    # SDK methods are wrapped by sync decorators, so look through them.
+    return inspect.iscoroutinefunction(inspect.unwrap(func))
+
+
+@dataclass
+class CallContext:
+    """Everything captured about one traced call before it is sent.
+
+    ``snapshot_mode`` is the capture mode still to apply to
+    ``request_payload``: ``None`` once it has been snapshotted, otherwise the
+    snapshot is taken only if (and when) the trace is built. That is the case
+    for calls dropped by head sampling, which are kept uncopied unless a tail
+    rule keeps them, and for every call with ``defer_trace_build``.
+    """
+
+    provider: Provider
+    request_payload: Dict[str, Any]
+    session_id: Optional[str]
+    metadata: Optional[Dict[str, Any]]
+    start: float = field(default_factory=time.perf_counter)
+    sampled: bool = True
+    sample_rate: float = 1.0
+    snapshot_mode: Optional[str] = None
+    # Seconds spent in the SDK before the provider call (see _finish).
+    overhead: float = 0.0
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.start) * 1000
+
+    def record_response(self, response: Any, normalize: Normalizer) -> None:
+        self._finish(response=response, normalize=normalize)
+
+    def record_success(
+        self,
+        normalized: NormalizedResponse,
+        time_to_first_token_ms: Optional[float] = None,
+    ) -> None:
+        self._finish(
+            normalized=normalized, time_to_first_token_ms=time_to_first_token_ms
+        )
+
+    def record_error(self, exc: BaseException) -> None:
+        self._finish(error=exc)
+
+    def on_stream_finish(
+        self,
+        normalized: Optional[NormalizedResponse],
+        error: Optional[BaseException],
+        time_to_first_token_ms: Optional[float],
+    ) -> None:
+        if error is not None:
+            self.record_error(error)
+        else:
+            self.record_success(normalized, time_to_first_token_ms)
+
+    def _finish(self, **outcome: Any) -> None:
+        end = time.perf_counter()
+        pending = PendingTrace(
+            self.provider,
+            self.request_payload,
+            (end - self.start) * 1000,
+            ended_at=wall_time(end),
+            snapshot_mode=self.snapshot_mode,
+            session_id=self.session_id,
+            metadata=self.metadata,
+            sampled=self.sampled,
+            sample_rate=self.sample_rate,
+            **outcome,
+        )
+        cfg = get_config()
+        if cfg.metrics:
+            record_call(pending)
+        if cfg.defer_trace_build:
+            # The flush worker normalizes, prices and builds the trace.
+            if pending.may_be_kept(cfg.sampling):
+                add_to_buffer(pending)
+        else:
+            trace = pending.build(cfg)
+            if trace is not None:
+                add_to_buffer(trace)
+        # Streams also spend time per chunk, which is not counted here.
+        get_telemetry().record_call(self.overhead + time.perf_counter() - end)
+
+
+def _prepare_call(
+    kwargs: Dict[str, Any], provider: Provider, options: ObserveOptions | None
+) -> Tuple[Dict[str, Any], CallContext]:
+    clean_payload, pulse_session_id, pulse_metadata = extract_pulse_params(kwargs)
+
+    observe_session = options.session_id if options else None
+    observe_metadata = options.metadata if options else None
+    session_id, metadata = resolve_trace_metadata(
+        observe_session,
+        observe_metadata,
+        pulse_session_id,
+        pulse_metadata,
+    )
+
+    cfg = get_config()
+    sampled, sample_rate = cfg.sampling.head_sample(
+        provider.value, clean_payload.get("model"), session_id
+    )
+    if cfg.defer_trace_build:
+        request_payload = capture_references(clean_payload)
+        snapshot_mode: Optional[str] = cfg.capture_mode
+    elif sampled:
+        request_payload = snapshot_request(clean_payload, cfg.capture_mode)
+        snapshot_mode = None
+    else:
+        request_payload = clean_payload
+        snapshot_mode = cfg.capture_mode
+    return clean_payload, CallContext(
+        provider,
+        request_payload,
+        session_id,
+        metadata,
+        sampled=sampled,
+        sample_rate=sample_rate,
+        snapshot_mode=snapshot_mode,
+    )
+
+
+def wrap_create(
+    original_create: Callable[..., Any],
+    provider: Provider,
+    options: ObserveOptions | None,
+    normalize: Normalizer,
+    stream_accumulator: Callable[[], Any],
+) -> Callable[..., Any]:
+    """Return a traced replacement for a provider ``create`` method.
+
+    Coroutine methods (``AsyncOpenAI``, ``AsyncAnthropic``) get a coroutine
+    wrapper that awaits the call, so latency covers the full request.
+    ``stream=True`` responses are returned wrapped in a proxy that traces the
+    call once the stream is exhausted or closed.
+    """
+
+    if is_async_callable(original_create):
+
+        @functools.wraps(original_create)
+        async def async_wrapped_create(*args: Any, **kwargs: Any):
+            if not is_enabled() or args:
+                return await original_create(*args, **kwargs)
+
+            entered = time.perf_counter()
+            clean_payload, call = _prepare_call(kwargs, provider, options)
+            call.start = time.perf_counter()
+            call.overhead = call.start - entered
+            try:
+                response = await original_create(**clean_payload)
+            except Exception as exc:
+                call.record_error(exc)
+                raise
+
+            if clean_payload.get("stream"):
+                return AsyncTracedStream(
+                    response, stream_accumulator(), call.start, call.on_stream_finish
+                )
+            call.record_response(response, normalize)
+            return response
+
+        return async_wrapped_create
+
+    @functools.wraps(original_create)
+    def wrapped_create(*args: Any, **kwargs: Any):
+        if not is_enabled():
+            return original_create(*args, **kwargs)
+
+        if args:
+            # Provider SDKs use keyword-only APIs. Fall back if user passed args.
+            return original_create(*args, **kwargs)
+
+        entered = time.perf_counter()
+        clean_payload, call = _prepare_call(kwargs, provider, options)
+        call.start = time.perf_counter()
+        call.overhead = call.start - entered
+        try:
+            response = original_create(**clean_payload)
+        except Exception as exc:
+            call.record_error(exc)
+            raise
+
+        if clean_payload.get("stream"):
+            return TracedStream(
+                response, stream_accumulator(), call.start, call.on_stream_finish
+            )
+        call.record_response(response, normalize)
+        return response
+
+    return wrapped_create
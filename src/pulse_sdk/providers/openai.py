@@ -1,18 +1,10 @@
 from __future__ import annotations
 
-import copy
-import time
-from typing import Any, Dict
+from typing import Any
 
-from ..normalize import normalize_openai_response
-from ..state import add_to_buffer, is_enabled
-from ..trace import (
-    build_error_trace,
-    build_trace,
-    extract_pulse_params,
-    resolve_trace_metadata,
-)
+from ..normalize import OpenAIStreamAccumulator, normalize_openai_response
 from ..types import ObserveOptions, Provider
+from .base import wrap_create
 
 
 class OpenAIIntegrationError(RuntimeError):
@@ -37,56 +29,11 @@ def observe_openai(
     if completions is None or not hasattr(completions, "create"):
         raise OpenAIIntegrationError("Client is missing chat.completions.create")
 
-    original_create = completions.create
-
-    def wrapped_create(*args: Any, **kwargs: Any):
-        if not is_enabled():
-            return original_create(*args, **kwargs)
-
-        if args:
-            # openai-python uses keyword-only API. Fall back if user passed args.
-            return original_create(*args, **kwargs)
-
-        clean_payload, pulse_session_id, pulse_metadata = extract_pulse_params(kwargs)
-        request_payload: Dict[str, Any] = copy.deepcopy(clean_payload)
-
-        observe_session = options.session_id if options else None
-        observe_metadata = options.metadata if options else None
-        session_id, metadata = resolve_trace_metadata(
-            observe_session,
-            observe_metadata,
-            pulse_session_id,
-            pulse_metadata,
-        )
-
-        start = time.perf_counter()
-        try:
-            response = original_create(**clean_payload)
-        except Exception as exc:
-            latency = (time.perf_counter() - start) * 1000
-            trace = build_error_trace(
-                request_payload,
-                exc,
-                provider,
-                latency,
-                session_id,
-                metadata,
-            )
-            add_to_buffer(trace)
-            raise
-
-        latency = (time.perf_counter() - start) * 1000
-        normalized = normalize_openai_response(response)
-        trace = build_trace(
-            request_payload,
-            normalized,
-            provider,
-            latency,
-            session_id,
-            metadata,
-        )
-        add_to_buffer(trace)
-        return response
-
-    completions.create = wrapped_create  # type: ignore[assignment]
+    completions.create = wrap_create(  # type: ignore[assignment]
+        completions.create,
+        provider,
+        options,
+        normalize_openai_response,
+        OpenAIStreamAccumulator,
+    )
     return client
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import time
+from typing import Any, Callable, Optional
+
+from ..types import NormalizedResponse
+
+# (response or None, error or None, time to first token in ms or None)
+StreamCallback = Callable[
+    [Optional[NormalizedResponse], Optional[BaseException], Optional[float]], None
+]
+
+
+class StreamAbandoned(Exception):
+    """Recorded for a stream garbage-collected before it ended or was closed."""
+
+
+class _StreamTracer:
+    """Shared bookkeeping for the sync and async stream proxies.
+
+    The trace is emitted once: when the stream ends, fails or is cancelled,
+    when it is closed, or, for a stream the caller abandoned (a ``break``
+    without ``close()``), when it is garbage-collected.
+    """
+
+    def __init__(
+        self, stream: Any, accumulator: Any, start: float, on_finish: StreamCallback
+    ):
+        self._stream = stream
+        self._accumulator = accumulator
+        self._start = start
+        self._on_finish = on_finish
+        self._first_token_ms: Optional[float] = None
+        self._finished = False
+
+    def _observe(self, chunk: Any) -> None:
+        if self._accumulator.add(chunk) and self._first_token_ms is None:
+            self._first_token_ms = (time.perf_counter() - self._start) * 1000
+
+    def _finish(self, error: Optional[BaseException] = None) -> None:
+        if self._finished:
+            return
+        self._finished = True
+        response = None if error is not None else self._accumulator.result()
+        self._on_finish(response, error, self._first_token_ms)
+
+    def __del__(self) -> None:
+        if self.__dict__.get("_finished", True):
+            return
+        try:
+            self._finish(StreamAbandoned("stream was neither consumed nor closed"))
+        except Exception:
+            pass  # e.g. collected at interpreter exit, after shutdown()
+
+    def __getattr__(self, name: str) -> Any:
+        if name == "_stream":
+            raise AttributeError(name)
+        return getattr(self._stream, name)
+
+
+class TracedStream(_StreamTracer):
+    """Wraps a provider ``Stream`` and emits one trace when it ends or closes."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._iterator = iter(self._stream)
+
+    def __iter__(self) -> "TracedStream":
+        return self
+
+    def __next__(self) -> Any:
+        try:
+            chunk = next(self._iterator)
+        except StopIteration:
+            self._finish()
+            raise
+        except BaseException as exc:  # including cancellation and Ctrl-C
+            self._finish(exc)
+            raise
+        self._observe(chunk)
+        return chunk
+
+    def __enter__(self) -> "TracedStream":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        try:
+            close = getattr(self._stream, "close", None)
+            if close is not None:
+                close()
+        finally:
+            self._finish()
+
+
+class AsyncTracedStream(_StreamTracer):
+    """Async counterpart of :class:`TracedStream` for ``AsyncStream`` objects."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._iterator = self._stream.__aiter__()
+
+    def __aiter__(self) -> "AsyncTracedStream":
+        return self
+
+    async def __anext__(self) -> Any:
+        try:
+            chunk = await self._iterator.__anext__()
+        except StopAsyncIteration:
+            self._finish()
+            raise
+        except BaseException as exc:  # including cancellation and Ctrl-C
+            self._finish(exc)
+            raise
+        self._observe(chunk)
+        return chunk
+
+    async def __aenter__(self) -> "AsyncTracedStream":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        try:
+            close = getattr(self._stream, "close", None)
+            if close is not None:
+                result = close()
+                if hasattr(result, "__await__"):
+                    await result
+        finally:
+            self._finish()
+
+    aclose = close
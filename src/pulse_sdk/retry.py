@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import random
+import threading
+import time
+from typing import Optional
+
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_RETRY_BASE_DELAY = 500  # ms
+DEFAULT_RETRY_MAX_DELAY = 30_000  # ms
+DEFAULT_CIRCUIT_FAILURE_THRESHOLD = 5
+DEFAULT_CIRCUIT_RESET_TIMEOUT = 30_000  # ms
+# Longest Retry-After honoured, in case a server (or proxy) sends nonsense.
+MAX_RETRY_AFTER = 3600.0  # seconds
+
+
+class RetryPolicy:
+    """Jittered exponential backoff shared by every batch of a process.
+
+    Backoff is tracked per exporter rather than per batch: after ``n``
+    consecutive failures no batch is sent before ``backoff(n)`` has elapsed.
+    A server's ``Retry-After`` is a floor on that wait, even beyond
+    ``max_delay`` (up to ``MAX_RETRY_AFTER``).
+    """
+
+    def __init__(
+        self,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        base_delay: int = DEFAULT_RETRY_BASE_DELAY,
+        max_delay: int = DEFAULT_RETRY_MAX_DELAY,
+    ) -> None:
+        self.max_retries = max_retries
+        self.base_delay = base_delay / 1000.0
+        self.max_delay = max_delay / 1000.0
+        self._not_before = 0.0
+        self._lock = threading.Lock()
+
+    def backoff(self, failures: int) -> float:
+        cap = min(self.max_delay, self.base_delay * (2 ** max(failures - 1, 0)))
+        # "Equal jitter": never retry sooner than half the cap.
+        return cap / 2 + random.uniform(0, cap / 2)
+
+    def schedule(self, failures: int, retry_after: Optional[float] = None) -> float:
+        delay = self.backoff(failures)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, MAX_RETRY_AFTER))
+        with self._lock:
+            self._not_before = time.monotonic() + delay
+        return delay
+
+    def reset(self) -> None:
+        with self._lock:
+            self._not_before = 0.0
+
+    def remaining(self) -> float:
+        """Seconds until the next send is allowed (0 when allowed now)."""
+        return max(self._not_before - time.monotonic(), 0.0)
+
+
+class CircuitBreaker:
+    """Stops sending after repeated failures and probes again later.
+
+    ``closed``     normal operation
+    ``open``       ``failure_threshold`` consecutive failures; sends are
+                   skipped until ``reset_timeout`` ms have passed
+    ``half_open``  one probe batch is let through; success closes the
+                   circuit, failure opens it again
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = DEFAULT_CIRCUIT_FAILURE_THRESHOLD,
+        reset_timeout: int = DEFAULT_CIRCUIT_RESET_TIMEOUT,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout / 1000.0
+        self.failures = 0
+        self._state = "closed"
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            state = self._current_state()
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def remaining(self) -> float:
+        """Seconds until an open circuit lets a probe through (0 otherwise)."""
+        with self._lock:
+            if self._current_state() != "open":
+                return 0.0
+            return max(self._opened_at + self.reset_timeout - time.monotonic(), 0.0)
+
+    def release(self) -> None:
+        """Give back a probe slot that was not used for a real send."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self._state = "closed"
+            self._probe_in_flight = False
+
+    def record_failure(self) -> int:
+        with self._lock:
+            self.failures += 1
+            if self._probe_in_flight or self.failures >= self.failure_threshold:
+                self._state = "open"
+                self._opened_at = time.monotonic()
+            self._probe_in_flight = False
+            return self.failures
+
+    def _current_state(self) -> str:
+        if (
+            self._state == "open"
+            and time.monotonic() - self._opened_at >= self.reset_timeout
+        ):
+            self._state = "half_open"
+        return self._state
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import hashlib
+import random
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+SAMPLE_REASONS = ("head", "error", "slow", "expensive")
+
+_HASH_SCALE = float(1 << 64)
+
+
+def session_fraction(session_id: str) -> float:
+    """Map a session id to a stable point in [0, 1)."""
+    digest = hashlib.blake2b(session_id.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") / _HASH_SCALE
+
+
+@dataclass(frozen=True)
+class SamplingPolicy:
+    """Decides which calls become traces.
+
+    Head sampling happens before any payload is copied: the rate comes from
+    ``model_rates`` (exact name, else longest matching prefix), then
+    ``provider_rates``, then ``rate``. Calls with a session id are decided by
+    a hash of the id, so a session is kept or dropped as a whole (and a
+    session kept at a low rate is also kept at any higher one). Calls without
+    a session id are sampled at random: their trace id is only assigned when
+    the call ends, after this decision has been made. Tail rules
+    then keep sampled-out calls that failed, took at least ``keep_slow_ms``
+    or cost at least ``keep_cost_cents``.
+    """
+
+    rate: float = 1.0
+    provider_rates: Dict[str, float] = field(default_factory=dict)
+    model_rates: Dict[str, float] = field(default_factory=dict)
+    keep_errors: bool = True
+    keep_slow_ms: Optional[float] = None
+    keep_cost_cents: Optional[float] = None
+    _rate_cache: Dict[Tuple[str, Optional[str]], float] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+
+    def head_rate(self, provider: str, model: Optional[str]) -> float:
+        key = (provider, model)
+        rate = self._rate_cache.get(key)
+        if rate is None:
+            rate = self._resolve_rate(provider, model)
+            if len(self._rate_cache) < 1024:
+                self._rate_cache[key] = rate
+        return rate
+
+    def head_sample(
+        self, provider: str, model: Optional[str], session_id: Optional[str]
+    ) -> Tuple[bool, float]:
+        rate = self.head_rate(provider, model)
+        if rate >= 1.0:
+            return True, rate
+        if rate <= 0.0:
+            return False, rate
+        point = session_fraction(session_id) if session_id else random.random()
+        return point < rate, rate
+
+    def tail_reason(
+        self, error: bool, latency_ms: float, cost_cents: Optional[float]
+    ) -> Optional[str]:
+        if error and self.keep_errors:
+            return "error"
+        if self.keep_slow_ms is not None and latency_ms >= self.keep_slow_ms:
+            return "slow"
+        if (
+            self.keep_cost_cents is not None
+            and cost_cents is not None
+            and cost_cents >= self.keep_cost_cents
+        ):
+            return "expensive"
+        return None
+
+    def _resolve_rate(self, provider: str, model: Optional[str]) -> float:
+        if model and self.model_rates:
+            if model in self.model_rates:
+                return self.model_rates[model]
+            prefixes = [
+                prefix for prefix in self.model_rates if model.startswith(prefix)
+            ]
+            if prefixes:
+                return self.model_rates[max(prefixes, key=len)]
+        return self.provider_rates.get(provider, self.rate)
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import dataclasses
+import datetime
+import decimal
+import enum
+import json
+import threading
+import uuid
+from typing import Any, Dict, Iterable, List, Tuple
+
+try:
+    import orjson
+except ImportError:  # optional dependency: pip install pulse-trace-sdk[orjson]
+    orjson = None  # type: ignore[assignment]
+
+from .telemetry import get_telemetry
+from .trace import to_wire
+from .types import Trace
+
+SERIALIZERS = ("auto", "orjson", "json")
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def orjson_available() -> bool:
+    return orjson is not None
+
+
+def json_default(value: Any) -> Any:
+    """Fallback for objects users pass in kwargs or ``pulse_metadata``."""
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return f"[binary data, {len(bytes(value))} bytes]"
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    model_dump = getattr(value, "model_dump", None)  # pydantic v2
+    if callable(model_dump):
+        return model_dump(mode="json")
+    if hasattr(value, "__fields__") and callable(getattr(value, "dict", None)):
+        return value.dict()  # pydantic v1
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    return str(value)
+
+
+class Serializer:
+    """Encodes traces to JSON bytes, with orjson when it is installed.
+
+    Traces are encoded one at a time and joined, so a trace that cannot be
+    encoded (e.g. a circular reference in metadata) is dropped on its own
+    instead of failing the batch, and other threads get the GIL between
+    traces rather than waiting out one long ``dumps`` of the whole batch.
+    ``pre_encode`` lets the flush worker encode traces while they wait in the
+    buffer; ``encode_batch`` then reuses those bytes for the same objects.
+    Buffered ``TraceRecord`` objects are expanded to the wire shape here.
+    """
+
+    def __init__(self, backend: str = "auto") -> None:
+        if backend not in SERIALIZERS:
+            raise ValueError(f"Unsupported serializer: {backend}")
+        if backend == "orjson" and orjson is None:
+            raise ValueError("the orjson serializer requires the 'orjson' package")
+        if backend == "auto":
+            backend = "orjson" if orjson is not None else "json"
+        self.backend = backend
+        self.dropped = 0
+        self._encoded: Dict[int, Tuple[Trace, bytes]] = {}
+        self._lock = threading.Lock()
+
+    def after_fork(self) -> None:
+        # The lock may have been held by the parent's worker mid pre-encode,
+        # and the cached bytes belong to traces the child never sends.
+        self._lock = threading.Lock()
+        self._encoded = {}
+
+    def dumps(self, value: Any) -> bytes:
+        if self.backend == "orjson":
+            try:
+                return orjson.dumps(value, default=json_default, option=_ORJSON_OPTIONS)
+            except TypeError:
+                pass  # e.g. integers wider than 64 bits; stdlib copes
+        # ensure_ascii=False would take the slower pure-Python string path.
+        return json.dumps(value, default=json_default, separators=(",", ":")).encode(
+            "utf-8"
+        )
+
+    def encode_batch(self, traces: Iterable[Trace]) -> bytes:
+        parts: List[bytes] = []
+        for trace in traces:
+            with self._lock:
+                cached = self._encoded.pop(id(trace), None)
+            if cached is not None and cached[0] is trace:
+                parts.append(cached[1])
+                continue
+            try:
+                parts.append(self.dumps(to_wire(trace)))
+            except (TypeError, ValueError) as exc:
+                # Batches are encoded on several upload threads at once.
+                with self._lock:
+                    self.dropped += 1
+                get_telemetry().record_unencodable()
+                print(f"Pulse SDK: dropping trace that cannot be encoded: {exc}")
+        return b"[" + b",".join(parts) + b"]"
+
+    @property
+    def cached(self) -> int:
+        return len(self._encoded)
+
+    def pre_encode(self, traces: List[Trace]) -> None:
+        """Encode traces as they arrive in the buffer, ahead of the flush."""
+        for trace in traces:
+            try:
+                data = self.dumps(to_wire(trace))
+            except (TypeError, ValueError):
+                continue  # encode_batch reports it
+            with self._lock:
+                self._encoded[id(trace)] = (trace, data)
+
+    def prune(self, traces: List[Trace]) -> None:
+        """Forget cached bytes for everything but ``traces`` (still buffered)."""
+        with self._lock:
+            self._encoded = {
+                key: self._encoded[key]
+                for key in map(id, traces)
+                if key in self._encoded
+            }
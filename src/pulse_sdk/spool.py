@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from typing import List, Optional, Tuple
+
+from .serialization import json_default
+from .types import Trace
+
+DEFAULT_SPOOL_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_SPOOL_SEGMENT_BYTES = 8 * 1024 * 1024
+DEFAULT_SPOOL_FSYNC_INTERVAL = 1000  # ms
+
+_HEADER = struct.Struct(">II")  # payload length, crc32
+_OPEN_SUFFIX = ".open"
+_SEALED_SUFFIX = ".seg"
+_CLAIMED_SUFFIX = ".claimed"
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def read_segment(path: str) -> List[Trace]:
+    """Read every intact record of a segment; a torn tail is ignored."""
+    traces: List[Trace] = []
+    with open(path, "rb") as handle:
+        size = os.fstat(handle.fileno()).st_size
+        if size == 0:
+            return traces
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            offset = 0
+            while offset + _HEADER.size <= size:
+                length, crc = _HEADER.unpack_from(data, offset)
+                start = offset + _HEADER.size
+                payload = data[start : start + length]
+                if len(payload) < length or zlib.crc32(payload) != crc:
+                    break
+                traces.append(json.loads(payload))
+                offset = start + length
+    return traces
+
+
+class Spool:
+    """Append-only, segmented on-disk queue of traces that could not be sent.
+
+    Records are length-prefixed, CRC-checked JSON appended to the process's
+    open segment; writes are buffered and fsynced at most every
+    ``fsync_interval`` ms (and whenever a segment is sealed). Segments are
+    named ``<time_ns>-<pid>`` so several processes can share a directory; a
+    segment is claimed by renaming it before it is replayed, so each one is
+    replayed once. When the directory grows past ``max_bytes`` the oldest
+    sealed segments are deleted first.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_bytes: int = DEFAULT_SPOOL_MAX_BYTES,
+        segment_bytes: int = DEFAULT_SPOOL_SEGMENT_BYTES,
+        fsync_interval: int = DEFAULT_SPOOL_FSYNC_INTERVAL,
+    ) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.segment_bytes = segment_bytes
+        self.fsync_interval = fsync_interval / 1000.0
+        self.evicted_segments = 0
+        self._lock = threading.Lock()
+        self._file = None
+        self._path: Optional[str] = None
+        self._segment_size = 0
+        self._records = 0
+        self._last_fsync = time.monotonic()
+        os.makedirs(directory, exist_ok=True)
+        self._recover_orphans()
+        self._total_bytes = sum(size for _, size in self._segments())
+
+    @property
+    def size_bytes(self) -> int:
+        return self._total_bytes
+
+    def append(self, traces: List[Trace]) -> None:
+        if not traces:
+            return
+        records = []
+        for trace in traces:
+            payload = json.dumps(trace, default=json_default).encode("utf-8")
+            records.append(_HEADER.pack(len(payload), zlib.crc32(payload)) + payload)
+        data = b"".join(records)
+
+        with self._lock:
+            if self._file is None:
+                self._open_segment()
+            self._file.write(data)
+            self._segment_size += len(data)
+            self._total_bytes += len(data)
+            self._records += len(records)
+            if self._segment_size >= self.segment_bytes:
+                self._seal()
+            elif time.monotonic() - self._last_fsync >= self.fsync_interval:
+                self._sync()
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def has_pending(self) -> bool:
+        with self._lock:
+            return self._records > 0 or bool(self._sealed_paths())
+
+    def pop_segment(self) -> Optional[List[Trace]]:
+        """Claim the oldest segment, return its traces and delete it."""
+        with self._lock:
+            if not self._sealed_paths() and self._records:
+                self._seal()
+            for path in self._sealed_paths():
+                claimed = f"{path}.{os.getpid()}{_CLAIMED_SUFFIX}"
+                try:
+                    os.rename(path, claimed)
+                except OSError:
+                    continue  # another process claimed it first
+                size = os.path.getsize(claimed)
+                try:
+                    traces = read_segment(claimed)
+                finally:
+                    os.remove(claimed)
+                    self._total_bytes = max(self._total_bytes - size, 0)
+                return traces
+        return None
+
+    def sync(self) -> None:
+        with self._lock:
+            self._sync()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._seal()
+
+    def before_fork(self) -> None:
+        # Hold the lock across fork() with nothing left in the write buffer,
+        # so the child cannot write the parent's records a second time.
+        self._lock.acquire()
+        if self._file is not None:
+            self._file.flush()
+
+    def after_fork_in_parent(self) -> None:
+        self._lock.release()
+
+    def after_fork_in_child(self) -> None:
+        """Detach from the parent's open segment; the child starts its own."""
+        self._lock = threading.Lock()
+        if self._file is not None:
+            self._file.close()
+        self._file = None
+        self._path = None
+        self._segment_size = 0
+        self._records = 0
+
+    def _open_segment(self) -> None:
+        name = f"{time.time_ns():020d}-{os.getpid()}{_OPEN_SUFFIX}"
+        self._path = os.path.join(self.directory, name)
+        self._file = open(self._path, "ab")
+        self._segment_size = 0
+        self._records = 0
+
+    def _sync(self) -> None:
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        self._last_fsync = time.monotonic()
+
+    def _seal(self) -> None:
+        self._sync()
+        self._file.close()
+        if self._records:
+            os.rename(self._path, self._path[: -len(_OPEN_SUFFIX)] + _SEALED_SUFFIX)
+        else:
+            os.remove(self._path)
+        self._file = None
+        self._path = None
+        self._segment_size = 0
+        self._records = 0
+
+    def _segments(self) -> List[Tuple[str, int]]:
+        result = []
+        for name in sorted(os.listdir(self.directory)):
+            if name.endswith((_SEALED_SUFFIX, _OPEN_SUFFIX)):
+                path = os.path.join(self.directory, name)
+                try:
+                    result.append((path, os.path.getsize(path)))
+                except OSError:
+                    continue
+        return result
+
+    def _sealed_paths(self) -> List[str]:
+        return [
+            os.path.join(self.directory, name)
+            for name in sorted(os.listdir(self.directory))
+            if name.endswith(_SEALED_SUFFIX)
+        ]
+
+    def _recover_orphans(self) -> None:
+        # Segments left open by a dead writer, or claimed by a replayer that
+        # died before deleting them, become replayable again.
+        for name in os.listdir(self.directory):
+            if name.endswith(_CLAIMED_SUFFIX):
+                # <time>-<writer pid>.seg.<claimer pid>.claimed
+                base, _, owner = name[: -len(_CLAIMED_SUFFIX)].rpartition(".")
+                stem = base[: -len(_SEALED_SUFFIX)]
+            elif name.endswith(_OPEN_SUFFIX):
+                # <time>-<writer pid>.open
+                stem = name[: -len(_OPEN_SUFFIX)]
+                owner = stem.rpartition("-")[2]
+            else:
+                continue
+            try:
+                pid = int(owner)
+            except ValueError:
+                continue
+            if pid == os.getpid() or not _pid_alive(pid):
+                try:
+                    os.rename(
+                        os.path.join(self.directory, name),
+                        os.path.join(self.directory, stem + _SEALED_SUFFIX),
+                    )
+                except OSError:
+                    pass
+
+    def _evict(self) -> None:
+        for path in self._sealed_paths():
+            if self._total_bytes <= self.max_bytes:
+                return
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+            except OSError:
+                continue
+            self._total_bytes -= size
+            self.evicted_segments += 1
@@ -1,23 +1,120 @@
 from __future__ import annotations
 
+import asyncio
+import math
+import os
 import threading
 import time
-from typing import List
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import wait as futures_wait
+from typing import Any, Callable, Dict, List, Tuple
 
+from .batching import BatchController
+from .blobs import BlobStore
+from .buffer import Entry, TraceBuffer
 from .config import ResolvedConfig
-from .transport import send_traces
+from .delta import SessionDeltaEncoder
+from .metrics import MetricAggregator
+from .pricing import set_pricing_index
+from .retry import CircuitBreaker, RetryPolicy
+from .spool import Spool
+from .telemetry import get_telemetry, reset_telemetry
+from .trace import PendingTrace, response_cost, to_wire
+from .transport import Transport, create_transport
 from .types import Trace
 
 _config: ResolvedConfig | None = None
-_buffer: List[Trace] = []
-_buffer_lock = threading.Lock()
+_transport: Transport | None = None
+_transport_lock = threading.Lock()
+_blob_store: BlobStore | None = None
+_delta_encoder: SessionDeltaEncoder | None = None
+_metrics: MetricAggregator | None = None
+_spool: Spool | None = None
+_spooled = 0
+# Traces evicted on a caller's thread, waiting for the worker to spool them.
+_spool_handoff: List[Trace] = []
+_spool_handoff_lock = threading.Lock()
+_buffer = TraceBuffer()
+_retry_policy = RetryPolicy()
+_circuit_breaker = CircuitBreaker()
+_batcher = BatchController(1)
+_upload_pool: ThreadPoolExecutor | None = None
 _flush_thread: threading.Thread | None = None
+_stats_thread: threading.Thread | None = None
 _stop_event: threading.Event | None = None
+_wake_event: threading.Event | None = None
+# Distinguishes "flush now" wake-ups from "a trace arrived, encode it" ones.
+_flush_requested = False
+# Set in a forked child whose parent was running the flush worker.
+_restart_worker = False
 
 
 def set_config(config: ResolvedConfig) -> None:
-    global _config
+    global _config, _buffer, _retry_policy, _circuit_breaker, _batcher
+    global _upload_pool, _metrics, _spool, _blob_store, _delta_encoder
+    if _metrics is not None:
+        # Send the last window under the settings it was recorded with.
+        flush_metrics()
+        _metrics = None
+    # Likewise, traces evicted so far go to the spool they were meant for.
+    _drain_spool_handoff()
+    with _transport_lock:
+        spool, _spool = _spool, None
+        _blob_store = None
+        _delta_encoder = None
+    if spool is not None:
+        spool.close()
     _config = config
+    pool, _upload_pool = _upload_pool, None
+    if pool is not None:
+        # Sized for the previous max_in_flight; running uploads still finish.
+        pool.shutdown(wait=False)
+    set_pricing_index(config.pricing)
+    _retry_policy, _circuit_breaker = _create_retry_state(config)
+    _batcher = _create_batcher(config)
+    previous = _buffer
+    _buffer = _create_buffer(config)
+    for trace in previous.drain():
+        _buffer.put(trace)
+
+
+def _create_buffer(config: ResolvedConfig | None) -> TraceBuffer:
+    if config is None:
+        return TraceBuffer(on_full=_wake_flush_worker)
+    return TraceBuffer(
+        config.max_buffer_size,
+        config.max_buffer_bytes,
+        config.overflow_policy,
+        config.block_timeout,
+        on_full=_wake_flush_worker,
+        on_drop=_hand_to_spool if config.spool_dir else None,
+        measure=True,
+    )
+
+
+def _create_batcher(config: ResolvedConfig | None) -> BatchController:
+    if config is None:
+        return BatchController(1)
+    return BatchController(
+        config.batch_size,
+        config.max_batch_size,
+        config.batch_bytes,
+        config.batch_target_latency,
+        config.adaptive_batching,
+    )
+
+
+def _create_retry_state(
+    config: ResolvedConfig | None,
+) -> Tuple[RetryPolicy, CircuitBreaker]:
+    if config is None:
+        return RetryPolicy(), CircuitBreaker()
+    return (
+        RetryPolicy(
+            config.max_retries, config.retry_base_delay, config.retry_max_delay
+        ),
+        CircuitBreaker(config.circuit_failure_threshold, config.circuit_reset_timeout),
+    )
 
 
 def get_config() -> ResolvedConfig:
@@ -26,6 +123,185 @@ def get_config() -> ResolvedConfig:
     return _config
 
 
+def set_transport(transport: Transport | None) -> None:
+    global _transport
+    with _transport_lock:
+        previous = _transport
+        _transport = transport
+    if previous is not None and previous is not transport:
+        previous.close()
+
+
+def get_transport() -> Transport:
+    global _transport
+    with _transport_lock:
+        if _transport is None:
+            _transport = create_transport(get_config())
+        return _transport
+
+
+def get_blob_store() -> BlobStore | None:
+    global _blob_store
+    cfg = get_config()
+    # Behind a collector, offload happens there: only the process that
+    # uploads a blob knows whether traces may reference it.
+    if not cfg.blob_offload or cfg.collector_socket:
+        return None
+    with _transport_lock:
+        if _blob_store is None:
+            _blob_store = BlobStore(
+                cfg.blob_min_bytes, cfg.blob_cache_size, cfg.blob_ttl
+            )
+        return _blob_store
+
+
+def get_delta_encoder() -> SessionDeltaEncoder | None:
+    global _delta_encoder
+    cfg = get_config()
+    # As with blobs: only the uploading process knows which parents arrived.
+    if not cfg.session_delta or cfg.collector_socket:
+        return None
+    with _transport_lock:
+        if _delta_encoder is None:
+            _delta_encoder = SessionDeltaEncoder(cfg.session_delta_cache_size)
+        return _delta_encoder
+
+
+def get_metrics() -> MetricAggregator | None:
+    global _metrics
+    aggregator = _metrics
+    if aggregator is not None:
+        return aggregator
+    cfg = get_config()
+    if not cfg.metrics:
+        return None
+    with _transport_lock:
+        if _metrics is None:
+            _metrics = MetricAggregator(cfg.metrics_max_series)
+        return _metrics
+
+
+def get_spool() -> Spool | None:
+    global _spool
+    cfg = get_config()
+    if not cfg.spool_dir:
+        return None
+    with _transport_lock:
+        if _spool is None:
+            _spool = Spool(
+                cfg.spool_dir,
+                cfg.spool_max_bytes,
+                cfg.spool_segment_bytes,
+                cfg.spool_fsync_interval,
+            )
+        return _spool
+
+
+def get_upload_pool() -> ThreadPoolExecutor | None:
+    """Threads for concurrent batch uploads; None when batches go one at a time.
+
+    Session deltas are always sent one at a time: a trace that references an
+    earlier one must not reach Pulse before it.
+    """
+    global _upload_pool
+    cfg = get_config()
+    if cfg.max_in_flight <= 1 or cfg.session_delta:
+        return None
+    with _transport_lock:
+        if _upload_pool is None:
+            _upload_pool = ThreadPoolExecutor(
+                cfg.max_in_flight, thread_name_prefix="pulse-sdk-upload"
+            )
+        return _upload_pool
+
+
+def _build(pending: PendingTrace) -> Trace | None:
+    try:
+        return pending.build(get_config())
+    except Exception as exc:
+        print(f"Pulse SDK: failed to build trace: {exc}")
+        return None
+
+
+def _build_pending(traces: List[Trace]) -> List[Trace]:
+    """Build deferred traces (``defer_trace_build``); others pass through.
+
+    Traces dropped by sampling, or whose build fails, are left out.
+    """
+    if not any(isinstance(trace, PendingTrace) for trace in traces):
+        return traces
+    built = (
+        _build(trace) if isinstance(trace, PendingTrace) else trace for trace in traces
+    )
+    return [trace for trace in built if trace is not None]
+
+
+def _build_entries(entries: List[Entry]) -> List[Entry]:
+    # Built once, before the first attempt, so retries resend the same trace.
+    if not any(isinstance(entry[0], PendingTrace) for entry in entries):
+        return entries
+    built: List[Entry] = []
+    for trace, size, attempts in entries:
+        if isinstance(trace, PendingTrace):
+            trace = _build(trace)
+        if trace is not None:
+            built.append((trace, size, attempts))
+    return built
+
+
+def _spool_traces(traces: List[Trace]) -> bool:
+    global _spooled
+    try:
+        spool = get_spool()
+        if spool is None:
+            return False
+        spool.append([to_wire(trace) for trace in _build_pending(traces)])
+    except Exception as exc:
+        print(f"Pulse SDK: failed to spool traces: {exc}")
+        return False
+    _spooled += len(traces)
+    return True
+
+
+def _hand_to_spool(traces: List[Trace]) -> None:
+    """``on_drop`` hook: queue evicted traces for the worker to spool.
+
+    Eviction happens on the caller's thread, which must never wait on disk
+    I/O. The handoff holds at most ``max_buffer_size`` traces; beyond that,
+    evicted traces are lost (they are already counted as dropped).
+    """
+    limit = _config.max_buffer_size if _config else len(traces)
+    with _spool_handoff_lock:
+        room = max(limit - len(_spool_handoff), 0)
+        _spool_handoff.extend(traces[:room])
+    wake_event = _wake_event
+    if wake_event is not None:
+        wake_event.set()
+
+
+def _drain_spool_handoff() -> None:
+    with _spool_handoff_lock:
+        if not _spool_handoff:
+            return
+        traces = _spool_handoff[:]
+        del _spool_handoff[:]
+    _spool_traces(traces)
+
+
+def _replay_spool() -> None:
+    # Only refill from disk while ingestion looks healthy and there is room.
+    spool = get_spool()
+    if spool is None or _send_blocked_for() > 0 or _circuit_breaker.state != "closed":
+        return
+    buffer = _buffer
+    while len(buffer) < buffer.max_size // 2 and spool.has_pending():
+        traces = spool.pop_segment()
+        if not traces:
+            break
+        for trace in traces:
+            buffer.put(trace)
+
+
 def is_enabled() -> bool:
     return bool(_config and _config.enabled)
 
@@ -34,41 +310,369 @@ def add_to_buffer(trace: Trace) -> None:
     if not is_enabled():
         return
 
-    with _buffer_lock:
-        _buffer.append(trace)
-        threshold = _config.batch_size if _config else 0
-        should_flush = len(_buffer) >= threshold > 0
+    if _restart_worker:
+        _restart_worker_after_fork()
 
-    if should_flush:
-        flush_buffer()
+    # Never send from the caller's thread: a full batch only wakes the worker.
+    length = _buffer.put(trace)
+    if length >= 0:
+        get_telemetry().record_enqueued()
+    cfg = _config
+    if cfg is not None and (
+        length >= _batcher.limit or _buffer.size_bytes >= cfg.batch_bytes
+    ):
+        _wake_flush_worker()
+    elif cfg is not None and cfg.encode_in_background:
+        wake_event = _wake_event
+        if wake_event is not None:
+            wake_event.set()
+
+
+def record_call(pending: PendingTrace) -> None:
+    """Count a finished call in the metric rollups, before any sampling."""
+    if not is_enabled():
+        return
+    aggregator = get_metrics()
+    if aggregator is None:
+        return
+    try:
+        normalized = pending.normalized_response()
+        tag = None
+        tag_key = _config.metrics_tag_key if _config else None
+        if tag_key and pending.metadata:
+            value = pending.metadata.get(tag_key)
+            tag = None if value is None else str(value)
+        aggregator.record(
+            pending.provider.value,
+            str(pending.request.get("model", "unknown")),
+            pending.latency_ms,
+            normalized,
+            response_cost(normalized) if normalized is not None else None,
+            pending.error is not None,
+            tag,
+        )
+    except Exception as exc:
+        print(f"Pulse SDK: failed to record metrics: {exc}")
+
+
+def flush_metrics() -> None:
+    aggregator = _metrics
+    if aggregator is None or not len(aggregator) or _send_blocked_for() > 0:
+        return
+    window = aggregator.swap()
+    try:
+        get_transport().send_metrics(window.to_wire())
+    except Exception as exc:
+        if getattr(exc, "retryable", True) and not isinstance(exc, NotImplementedError):
+            # Rollups merge, so the next window simply carries these too.
+            aggregator.restore(window)
+        print(f"Pulse SDK: failed to send metrics: {exc}")
+
+
+def get_stats(reset: bool = False) -> Dict[str, Any]:
+    """Snapshot of the SDK's own health: buffer, counters and timings.
+
+    Adds to ``get_buffer_stats`` the current batch size limit, the traces
+    enqueued, sent, retried and dropped as unencodable (also counted under
+    ``dropped``), the upload request count and duration percentiles (ms),
+    payload bytes before and after compression, and the time spent in the
+    SDK per wrapped call (us). With ``reset`` the percentiles start over (see
+    ``Telemetry``).
+    """
+    stats = get_buffer_stats()
+    stats["batch_limit"] = _batcher.limit
+    stats.update(get_telemetry().snapshot(reset))
+    stats["dropped"]["unencodable"] = stats["unencodable"]
+    stats["dropped_total"] = sum(stats["dropped"].values())
+    return stats
+
+
+def get_buffer_stats() -> Dict[str, Any]:
+    """Current buffer occupancy and the number of traces dropped per policy."""
+    buffer = _buffer
+    return {
+        "buffered": len(buffer),
+        "buffered_bytes": buffer.size_bytes,
+        "dropped": buffer.dropped,
+        "circuit": _circuit_breaker.state,
+        "spooled": _spooled,
+        "spool_bytes": _spool.size_bytes if _spool is not None else 0,
+    }
+
+
+def _wake_flush_worker() -> None:
+    global _flush_requested
+    wake_event = _wake_event
+    if wake_event is not None:
+        _flush_requested = True
+        wake_event.set()
+
+
+def _pre_encode() -> None:
+    serializer = get_transport().serializer
+    if serializer is None:
+        return
+    serializer.pre_encode(
+        [trace for trace in _buffer.peek_new() if not isinstance(trace, PendingTrace)]
+    )
+    # Sent traces leave the cache as they are encoded; only traces dropped
+    # from the buffer linger. Walking the buffer once they outnumber it keeps
+    # the pruning cost per dropped trace constant.
+    if serializer.cached > 2 * len(_buffer) + 64:
+        serializer.prune(_buffer.peek())
 
 
 def flush_buffer() -> None:
+    """Send what is buffered now, one batch per request (see ``BatchController``).
+
+    With ``max_in_flight`` above one, up to that many batches are uploaded at
+    once from the upload pool, so batches may reach Pulse out of order. The
+    flush still returns only once every batch it took is settled. It stops
+    taking batches after a failure; traces arriving meanwhile wait for the
+    next flush, so a steady stream of calls cannot keep this one going.
+    """
     if not is_enabled():
         return
 
-    traces: List[Trace]
-    with _buffer_lock:
-        if not _buffer:
-            return
-        traces = list(_buffer)
-        _buffer.clear()
+    buffer = _buffer
+    remaining = len(buffer)
+    flush_round = _FlushRound()
+    pool = get_upload_pool()
+    if pool is None:
+        while remaining > 0:
+            batch = _take_batch(buffer)
+            if batch is None:
+                break
+            taken, entries = batch
+            remaining -= len(taken)
+            if entries and not _send_batch(buffer, taken, entries, flush_round):
+                break
+        return
 
-    cfg = get_config()
+    # A slot is held from taking a batch until its upload settles, so at most
+    # max_in_flight batches are ever outside the buffer.
+    slots = threading.Semaphore(get_config().max_in_flight)
+    failed = threading.Event()
+    uploads: List[Future] = []
+
+    def settle(future: Future) -> None:
+        if future.exception() is not None or not future.result():
+            failed.set()
+        slots.release()
+
+    while remaining > 0 and not failed.is_set():
+        slots.acquire()
+        batch = None if failed.is_set() else _take_batch(buffer)
+        if batch is None:
+            slots.release()
+            break
+        taken, entries = batch
+        remaining -= len(taken)
+        if not entries:
+            slots.release()
+            continue
+        try:
+            upload = pool.submit(_send_batch, buffer, taken, entries, flush_round)
+        except RuntimeError:
+            # init_pulse replaced the pool mid-flush: send this batch here.
+            upload = Future()
+            upload.set_result(_send_batch(buffer, taken, entries, flush_round))
+        upload.add_done_callback(settle)
+        uploads.append(upload)
+    futures_wait(uploads)
+
+
+class _FlushRound:
+    """Failure bookkeeping shared by the batches of one ``flush_buffer``.
+
+    Concurrent batches failing together are one outage: the circuit breaker
+    counts it once, one backoff is scheduled (lengthened if a later batch
+    brings a longer Retry-After) and the batch size is halved once. A batch
+    succeeding after another failed does not cancel that backoff.
+    """
+
+    def __init__(self) -> None:
+        self.failures = 0  # breaker failure count, once the round has failed
+        self.delay = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def failed(self) -> bool:
+        return self.failures > 0
+
+    def record_failure(self, retry_after: float | None) -> Tuple[float, bool]:
+        """Backoff delay for a failed batch, and whether it was the first."""
+        with self._lock:
+            first = not self.failed
+            if first:
+                self.failures = _circuit_breaker.record_failure()
+                self.delay = _retry_policy.schedule(self.failures, retry_after)
+            elif retry_after is not None and retry_after > self.delay:
+                self.delay = _retry_policy.schedule(self.failures, retry_after)
+            return self.delay, first
+
+
+def _take_batch(buffer: TraceBuffer) -> Tuple[List[Entry], List[Entry]] | None:
+    """Take the next batch from the head of ``buffer``: the entries removed
+    and, built, the ones to send. None when nothing may be sent now."""
+    breaker = _circuit_breaker
+    if not len(buffer) or not breaker.allow_request():
+        return None
+    taken = buffer.take(_batcher.limit, _batcher.max_bytes)
+    entries = _build_entries(taken)
+    if not entries:
+        breaker.release()
+    return taken, entries
+
+
+def _send_batch(
+    buffer: TraceBuffer,
+    taken: List[Entry],
+    entries: List[Entry],
+    flush_round: _FlushRound,
+) -> bool:
+    """Upload one batch; on failure its entries go back to ``buffer``."""
+    breaker = _circuit_breaker
+    batcher = _batcher
+    traces: List[Trace] = [entry[0] for entry in entries]
+    delta_encoder = get_delta_encoder()
+    telemetry = get_telemetry()
+    started = time.perf_counter()
     try:
-        send_traces(cfg.api_url, cfg.api_key, traces)
+        transport = get_transport()
+        blob_store = get_blob_store()
+        if (
+            delta_encoder is not None
+            or blob_store is not None
+            or transport.serializer is None
+        ):
+            # Records are expanded lazily by the serializer; everything else
+            # (rewriting passes, custom transports) works on wire dicts.
+            traces = [to_wire(trace) for trace in traces]
+        if delta_encoder is not None:
+            traces = delta_encoder.encode(traces)
+        if blob_store is not None:
+            # Blobs go first so the server never sees a dangling reference.
+            traces, blobs = blob_store.offload(traces)
+            if blobs:
+                transport.send_blobs(blobs)
+                blob_store.mark_uploaded(list(blobs))
+        transport.send(traces)
     except Exception as exc:
+        elapsed = time.perf_counter() - started
+        telemetry.record_flush(elapsed, len(entries), False)
+        if delta_encoder is not None:
+            # The server never saw these traces, so they cannot be parents.
+            delta_encoder.forget(traces)
+        if _handle_send_failure(buffer, entries, exc, flush_round):
+            batcher.record(len(taken), elapsed, False)
+        return False
+
+    elapsed = time.perf_counter() - started
+    telemetry.record_flush(elapsed, len(entries), True)
+    batcher.record(len(taken), elapsed, True)
+    if not flush_round.failed:
+        breaker.record_success()
+        _retry_policy.reset()
+    return True
+
+
+def _handle_send_failure(
+    buffer: TraceBuffer, entries: List[Entry], exc: Exception, flush_round: _FlushRound
+) -> bool:
+    """Requeue, spool or drop a failed batch; True if it was the round's first
+    retryable failure."""
+    # Never sleeps: failed traces go back to the head of the buffer and the
+    # worker waits out the backoff before its next attempt.
+    if not getattr(exc, "retryable", True):
+        _circuit_breaker.release()
+        buffer.record_dropped("rejected", len(entries))
         print(f"Pulse SDK: failed to send traces: {exc}")
+        return False
+
+    delay, first = flush_round.record_failure(getattr(exc, "retry_after", None))
+    retry = [entry for entry in entries if entry[2] < _retry_policy.max_retries]
+    exhausted = [entry[0] for entry in entries if entry[2] >= _retry_policy.max_retries]
+    if exhausted and not _spool_traces(exhausted):
+        buffer.record_dropped("retries_exhausted", len(exhausted))
+    buffer.requeue(retry)
+    get_telemetry().record_retried(len(retry))
+    print(
+        f"Pulse SDK: failed to send traces: {exc} "
+        f"(retrying {len(retry)} in {delay:.1f}s, gave up on {len(exhausted)})"
+    )
+    return first
+
+
+def _send_blocked_for() -> float:
+    return max(_retry_policy.remaining(), _circuit_breaker.remaining())
 
 
-def _flush_loop(interval_ms: int, stop_event: threading.Event) -> None:
-    interval = max(interval_ms / 1000.0, 1.0)
-    while not stop_event.wait(interval):
+async def aflush() -> None:
+    # flush_buffer does blocking I/O; keep it off the event loop thread.
+    await asyncio.get_running_loop().run_in_executor(None, flush_buffer)
+
+
+def _flush_loop(
+    interval_ms: int,
+    stop_event: threading.Event,
+    wake_event: threading.Event,
+    metrics_interval_ms: int | None = None,
+) -> None:
+    global _flush_requested
+    interval = interval_ms / 1000.0
+    metrics_interval = metrics_interval_ms / 1000.0 if metrics_interval_ms else None
+    get_transport().prewarm()
+    _replay_spool()
+    next_flush = time.monotonic() + interval
+    next_metrics = time.monotonic() + metrics_interval if metrics_interval else math.inf
+    while not stop_event.is_set():
+        blocked = _send_blocked_for()
+        # Retry as soon as a backoff ends, but never earlier.
+        retry_due = blocked > 0 and len(_buffer) > 0
+        if retry_due:
+            timeout = blocked
+        else:
+            timeout = max(next_flush - time.monotonic(), 0.0)
+        timeout = min(timeout, max(next_metrics - time.monotonic(), 0.0))
+        woke = wake_event.wait(timeout)
+        wake_event.clear()
+        if stop_event.is_set():
+            break
+        _drain_spool_handoff()
+        if time.monotonic() >= next_metrics:
+            flush_metrics()
+            next_metrics = time.monotonic() + metrics_interval
+        if _send_blocked_for() > 0:
+            continue
+        if not woke and not retry_due and time.monotonic() < next_flush:
+            continue  # only the metrics were due
+        if woke and not _flush_requested and time.monotonic() < next_flush:
+            # A trace arrived (encode_in_background): encode it now so the
+            # flush only has to join bytes, and keep to the flush schedule.
+            _pre_encode()
+            continue
+        _flush_requested = False
         flush_buffer()
+        _replay_spool()
+        next_flush = time.monotonic() + interval
+
+
+def _stats_loop(
+    interval_ms: int,
+    callback: Callable[[Dict[str, Any]], None],
+    stop_event: threading.Event,
+) -> None:
+    # Its own thread, so a slow callback never delays a flush.
+    while not stop_event.wait(interval_ms / 1000.0):
+        try:
+            callback(get_stats(reset=True))
+        except Exception as exc:
+            print(f"Pulse SDK: stats_callback failed: {exc}")
 
 
 def start_flush_worker() -> None:
-    global _flush_thread, _stop_event
+    global _flush_thread, _stats_thread, _stop_event, _wake_event
 
     if not is_enabled():
         return
@@ -76,30 +680,145 @@ def start_flush_worker() -> None:
     stop_flush_worker()
     cfg = get_config()
     stop_event = threading.Event()
+    wake_event = threading.Event()
     thread = threading.Thread(
         target=_flush_loop,
-        args=(cfg.flush_interval, stop_event),
+        args=(
+            cfg.flush_interval,
+            stop_event,
+            wake_event,
+            cfg.metrics_interval if cfg.metrics else None,
+        ),
         name="pulse-sdk-flush",
         daemon=True,
     )
     _stop_event = stop_event
+    _wake_event = wake_event
     _flush_thread = thread
     thread.start()
+    if cfg.stats_callback is not None:
+        _stats_thread = threading.Thread(
+            target=_stats_loop,
+            args=(cfg.stats_interval, cfg.stats_callback, stop_event),
+            name="pulse-sdk-stats",
+            daemon=True,
+        )
+        _stats_thread.start()
 
 
 def stop_flush_worker() -> None:
-    global _flush_thread, _stop_event
+    global _flush_thread, _stats_thread, _stop_event, _wake_event
 
     if _stop_event:
         _stop_event.set()
+    if _wake_event:
+        _wake_event.set()
     if _flush_thread and _flush_thread.is_alive():
         _flush_thread.join(timeout=1)
+    if (
+        _stats_thread
+        and _stats_thread.is_alive()
+        and _stats_thread is not threading.current_thread()
+    ):
+        _stats_thread.join(timeout=1)
     _stop_event = None
+    _wake_event = None
+    _flush_thread = None
+    _stats_thread = None
+
+
+def persist_remaining() -> None:
+    """Last flush attempt at shutdown; whatever is left goes to the spool."""
+    if not is_enabled():
+        return
+    flush_metrics()
+    flush_buffer()
+    if get_spool() is not None:
+        _drain_spool_handoff()
+        _spool_traces(_buffer.drain())
+        _spool.close()
+
+
+def _before_fork() -> None:
+    spool = _spool
+    if spool is not None:
+        spool.before_fork()
+
+
+def _after_fork_in_parent() -> None:
+    spool = _spool
+    if spool is not None:
+        spool.after_fork_in_parent()
+
+
+def _after_fork_in_child() -> None:
+    # Only the forking thread survives: the worker is gone and any lock may
+    # have been held mid-operation. Traces inherited from the parent are the
+    # parent's to send, so the child starts with an empty buffer.
+    global _transport_lock, _buffer, _retry_policy, _circuit_breaker, _batcher
+    global _blob_store, _delta_encoder, _spooled, _restart_worker, _upload_pool
+    global _flush_thread, _stats_thread, _stop_event, _wake_event
+    global _spool_handoff_lock
+    _transport_lock = threading.Lock()
+    _spool_handoff_lock = threading.Lock()
+    del _spool_handoff[:]
+    _restart_worker = _flush_thread is not None
     _flush_thread = None
+    _stats_thread = None
+    _stop_event = None
+    _wake_event = None
+    _buffer = _create_buffer(_config)
+    _retry_policy, _circuit_breaker = _create_retry_state(_config)
+    _batcher = _create_batcher(_config)
+    _upload_pool = None
+    _blob_store = None
+    _delta_encoder = None
+    _spooled = 0
+    reset_telemetry()
+    if _transport is not None:
+        _transport.after_fork()
+    if _spool is not None:
+        _spool.after_fork_in_child()
+    if _metrics is not None:
+        _metrics.after_fork_in_child()
+
+
+def _restart_worker_after_fork() -> None:
+    global _restart_worker
+    with _transport_lock:
+        if not _restart_worker:
+            return
+        _restart_worker = False
+    start_flush_worker()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(
+        before=_before_fork,
+        after_in_parent=_after_fork_in_parent,
+        after_in_child=_after_fork_in_child,
+    )
 
 
 def reset_state() -> None:
-    global _buffer
+    global _buffer, _blob_store, _delta_encoder, _spool, _spooled, _restart_worker
+    global _metrics, _upload_pool
+    _restart_worker = False
     stop_flush_worker()
-    with _buffer_lock:
-        _buffer = []
+    if _upload_pool is not None:
+        _upload_pool.shutdown(wait=True)
+    _upload_pool = None
+    set_transport(None)
+    _blob_store = None
+    _delta_encoder = None
+    _metrics = None
+    reset_telemetry()
+    if _spool is not None:
+        _spool.close()
+    _spool = None
+    _spooled = 0
+    del _spool_handoff[:]
+    _buffer = _create_buffer(_config)
+    _retry_policy.reset()
+    _circuit_breaker.record_success()
+    _batcher.reset()
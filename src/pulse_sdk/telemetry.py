@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict
+
+from .metrics import Sketch
+
+DEFAULT_STATS_INTERVAL = 60_000  # ms
+
+
+class Telemetry:
+    """Counters about the SDK itself, cheap enough to leave on.
+
+    Counters are cumulative since ``init_pulse`` (or the last fork). The flush
+    duration and per-call overhead distributions cover the time since the
+    last ``snapshot(reset=True)``, which the periodic stats callback does, so
+    their percentiles describe recent behaviour rather than the whole run.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.enqueued = 0
+        self.sent = 0
+        self.retried = 0
+        self.unencodable = 0
+        self.flushes = 0
+        self.flush_failures = 0
+        self.payload_bytes = 0
+        self.wire_bytes = 0
+        self.calls = 0
+        self.overhead_seconds = 0.0
+        self.flush_ms = Sketch()
+        self.overhead_us = Sketch()
+
+    def record_enqueued(self) -> None:
+        with self._lock:
+            self.enqueued += 1
+
+    def record_call(self, overhead_seconds: float) -> None:
+        with self._lock:
+            self.calls += 1
+            self.overhead_seconds += overhead_seconds
+            self.overhead_us.add(overhead_seconds * 1e6)
+
+    def record_flush(self, seconds: float, sent: int, ok: bool) -> None:
+        with self._lock:
+            self.flushes += 1
+            if ok:
+                self.sent += sent
+            else:
+                self.flush_failures += 1
+            self.flush_ms.add(seconds * 1000)
+
+    def record_retried(self, count: int) -> None:
+        with self._lock:
+            self.retried += count
+
+    def record_unencodable(self) -> None:
+        with self._lock:
+            self.unencodable += 1
+
+    def record_payload(self, payload_bytes: int, wire_bytes: int) -> None:
+        with self._lock:
+            self.payload_bytes += payload_bytes
+            self.wire_bytes += wire_bytes
+
+    def snapshot(self, reset: bool = False) -> Dict[str, Any]:
+        with self._lock:
+            flush_ms, overhead_us = self.flush_ms, self.overhead_us
+            if reset:
+                self.flush_ms, self.overhead_us = Sketch(), Sketch()
+            return {
+                "enqueued": self.enqueued,
+                "sent": self.sent,
+                "retried": self.retried,
+                "unencodable": self.unencodable,
+                "flushes": self.flushes,
+                "flush_failures": self.flush_failures,
+                "flush_ms": _summary(flush_ms),
+                "payload_bytes": self.payload_bytes,
+                "wire_bytes": self.wire_bytes,
+                "calls": self.calls,
+                "overhead_ms_total": round(self.overhead_seconds * 1000, 3),
+                "overhead_us": _summary(overhead_us),
+            }
+
+
+def _summary(sketch: Sketch) -> Dict[str, Any]:
+    return {
+        "count": sketch.count,
+        "p50": _round(sketch.quantile(0.5)),
+        "p90": _round(sketch.quantile(0.9)),
+        "p99": _round(sketch.quantile(0.99)),
+        "max": _round(sketch.max if sketch.count else None),
+    }
+
+
+def _round(value: Any) -> Any:
+    return None if value is None else round(value, 3)
+
+
+_telemetry = Telemetry()
+
+
+def get_telemetry() -> Telemetry:
+    return _telemetry
+
+
+def reset_telemetry() -> None:
+    global _telemetry
+    _telemetry = Telemetry()
@@ -1,27 +1,45 @@
 from __future__ import annotations
 
-import copy
-import datetime
-import time
-import uuid
-from typing import Any, Dict, Optional
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
 
+from .buffer import estimate_size
+from .capture import (
+    CapturePolicy,
+    apply_capture_policy,
+    snapshot_request,
+    truncate_middle,
+)
+from .clock import format_timestamp, wall_time
+from .ids import generate_trace_id
 from .pricing import calculate_cost
 from .types import NormalizedResponse, Provider, Trace, TraceStatus
 
+if TYPE_CHECKING:
+    from .config import ResolvedConfig
+    from .sampling import SamplingPolicy
 
-def generate_trace_id() -> str:
-    return str(uuid.uuid4())
+
+def _text_size(value: Any) -> int:
+    """Total length of the strings (and bytes) nested in ``value``."""
+    if isinstance(value, (str, bytes, bytearray)):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(_text_size(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(_text_size(item) for item in value)
+    return 0
 
 
 def current_timestamp() -> str:
-    return datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc).isoformat()
+    return format_timestamp(wall_time())
 
 
 def extract_pulse_params(
     payload: Dict[str, Any],
 ) -> tuple[Dict[str, Any], Optional[str], Optional[Dict[str, Any]]]:
-    clean = copy.deepcopy(payload)
+    # Shallow: only the pulse_* keys are removed. Snapshotting the request
+    # for the trace is left to capture.snapshot_request.
+    clean = dict(payload)
     session = None
     metadata = None
 
@@ -51,71 +69,407 @@ def resolve_trace_metadata(
     return session_id, metadata
 
 
-def build_trace(
+def response_cost(response: NormalizedResponse) -> Optional[float]:
+    """The provider-reported cost, else one computed from token counts."""
+    if response.cost_cents is not None:
+        return response.cost_cents
+    if response.input_tokens is None or response.output_tokens is None:
+        return None
+    return calculate_cost(
+        response.model,
+        response.input_tokens,
+        response.output_tokens,
+        response.cache_read_tokens or 0,
+        response.cache_write_tokens or 0,
+        response.cache_in_input,
+    )
+
+
+class TraceRecord:
+    """Compact in-memory form of a trace while it waits to be sent.
+
+    Each value is stored once, with no per-trace dict; ``to_wire`` expands
+    it into the public ``Trace`` shape (including ``response_body``, which
+    repeats the output fields) only when the batch is serialized.
+    """
+
+    __slots__ = (
+        "trace_id",
+        "ended_at",
+        "provider",
+        "model_requested",
+        "request_body",
+        "latency_ms",
+        "status",
+        "responded",
+        "model_used",
+        "output_text",
+        "input_tokens",
+        "output_tokens",
+        "cache_read_tokens",
+        "cache_write_tokens",
+        "finish_reason",
+        "provider_request_id",
+        "cost_cents",
+        "truncated_fields",
+        "time_to_first_token_ms",
+        "session_id",
+        "metadata",
+        "error",
+        "sample_rate",
+        "sample_reason",
+    )
+
+    def __init__(
+        self,
+        provider: str,
+        model_requested: str,
+        request_body: Dict[str, Any],
+        latency_ms: int,
+        status: str,
+        ended_at: Optional[float] = None,
+    ) -> None:
+        self.ended_at = wall_time() if ended_at is None else ended_at
+        self.trace_id = generate_trace_id(self.ended_at)
+        self.provider = provider
+        self.model_requested = model_requested
+        self.request_body = request_body
+        self.latency_ms = latency_ms
+        self.status = status
+        self.responded = False
+        self.model_used: Optional[str] = None
+        self.output_text: Optional[str] = None
+        self.input_tokens: Optional[int] = None
+        self.output_tokens: Optional[int] = None
+        self.cache_read_tokens: Optional[int] = None
+        self.cache_write_tokens: Optional[int] = None
+        self.finish_reason: Optional[str] = None
+        self.provider_request_id: Optional[str] = None
+        self.cost_cents: Optional[float] = None
+        self.truncated_fields: Optional[List[str]] = None
+        self.time_to_first_token_ms: Optional[int] = None
+        self.session_id: Optional[str] = None
+        self.metadata: Optional[Dict[str, Any]] = None
+        self.error: Optional[Dict[str, str]] = None
+        self.sample_rate: Optional[float] = None
+        self.sample_reason: Optional[str] = None
+
+    @property
+    def estimated_size(self) -> int:
+        return (
+            512
+            + estimate_size(self.request_body)
+            + (len(self.output_text) if self.output_text else 0)
+            + (estimate_size(self.metadata) if self.metadata else 0)
+        )
+
+    def to_wire(self) -> Trace:
+        trace: Trace = {
+            "trace_id": self.trace_id,
+            "timestamp": format_timestamp(self.ended_at),
+            "provider": self.provider,
+            "model_requested": self.model_requested,
+            "request_body": self.request_body,
+            "latency_ms": self.latency_ms,
+            "status": self.status,
+        }
+        if self.responded:
+            trace["model_used"] = self.model_used
+            trace["response_body"] = {
+                "content": self.output_text,
+                "inputTokens": self.input_tokens,
+                "outputTokens": self.output_tokens,
+                "finishReason": self.finish_reason,
+                "model": self.model_used,
+            }
+            trace["input_tokens"] = self.input_tokens
+            trace["output_tokens"] = self.output_tokens
+            if self.cache_read_tokens:
+                trace["cache_read_tokens"] = self.cache_read_tokens
+            if self.cache_write_tokens:
+                trace["cache_write_tokens"] = self.cache_write_tokens
+            trace["output_text"] = self.output_text
+            trace["finish_reason"] = self.finish_reason
+            if self.provider_request_id:
+                trace["provider_request_id"] = self.provider_request_id
+            if self.cost_cents is not None:
+                trace["cost_cents"] = self.cost_cents
+        if self.truncated_fields:
+            trace["truncated_fields"] = self.truncated_fields
+        if self.time_to_first_token_ms is not None:
+            trace["time_to_first_token_ms"] = self.time_to_first_token_ms
+        if self.session_id:
+            trace["session_id"] = self.session_id
+        if self.metadata:
+            trace["metadata"] = self.metadata
+        if self.error is not None:
+            trace["error"] = self.error
+        if self.sample_rate is not None:
+            trace["sample_rate"] = self.sample_rate
+            trace["sample_reason"] = self.sample_reason
+        return trace
+
+
+def to_wire(trace: Any) -> Trace:
+    return trace.to_wire() if isinstance(trace, TraceRecord) else trace
+
+
+def build_record(
     request: Dict[str, Any],
     response: Optional[NormalizedResponse],
     provider: Provider,
     latency_ms: float,
     session_id: Optional[str] = None,
     metadata: Optional[Dict[str, Any]] = None,
-) -> Trace:
-    trace: Trace = {
-        "trace_id": generate_trace_id(),
-        "timestamp": current_timestamp(),
-        "provider": provider.value,
-        "model_requested": str(request.get("model", "unknown")),
-        "request_body": request,
-        "latency_ms": int(round(latency_ms)),
-        "status": TraceStatus.SUCCESS.value if response else TraceStatus.ERROR.value,
-    }
+    time_to_first_token_ms: Optional[float] = None,
+    policy: Optional[CapturePolicy] = None,
+    ended_at: Optional[float] = None,
+) -> TraceRecord:
+    truncated_fields = []
+    request_body, truncated = apply_capture_policy(request, policy)
+    if truncated:
+        truncated_fields.append("request_body")
+
+    record = TraceRecord(
+        provider.value,
+        str(request.get("model", "unknown")),
+        request_body,
+        int(round(latency_ms)),
+        TraceStatus.SUCCESS.value if response else TraceStatus.ERROR.value,
+        ended_at,
+    )
 
     if response:
-        trace["model_used"] = response.model
-        trace["response_body"] = {
-            "content": response.content,
-            "inputTokens": response.input_tokens,
-            "outputTokens": response.output_tokens,
-            "finishReason": response.finish_reason,
-            "model": response.model,
-        }
-        trace["input_tokens"] = response.input_tokens
-        trace["output_tokens"] = response.output_tokens
-        trace["output_text"] = response.content
-        trace["finish_reason"] = response.finish_reason
-        if response.provider_request_id:
-            trace["provider_request_id"] = response.provider_request_id
-
-        if response.cost_cents is not None:
-            trace["cost_cents"] = response.cost_cents
-        elif response.input_tokens is not None and response.output_tokens is not None:
-            calculated = calculate_cost(
-                response.model, response.input_tokens, response.output_tokens
-            )
-            if calculated is not None:
-                trace["cost_cents"] = calculated
-    else:
-        trace["status"] = TraceStatus.ERROR.value
+        content = response.content
+        if content is not None and policy is not None:
+            content, truncated = truncate_middle(content, policy.max_field_bytes)
+            if truncated:
+                truncated_fields.append("output_text")
 
-    if session_id:
-        trace["session_id"] = session_id
-    if metadata:
-        trace["metadata"] = metadata
+        record.responded = True
+        record.model_used = response.model
+        record.output_text = content
+        record.input_tokens = response.input_tokens
+        record.output_tokens = response.output_tokens
+        record.cache_read_tokens = response.cache_read_tokens
+        record.cache_write_tokens = response.cache_write_tokens
+        record.finish_reason = response.finish_reason
+        record.provider_request_id = response.provider_request_id
 
-    return trace
+        record.cost_cents = response_cost(response)
 
+    if truncated_fields:
+        record.truncated_fields = truncated_fields
+    if time_to_first_token_ms is not None:
+        record.time_to_first_token_ms = int(round(time_to_first_token_ms))
+    record.session_id = session_id
+    record.metadata = metadata
+    return record
 
-def build_error_trace(
+
+def build_error_record(
     request: Dict[str, Any],
-    error: Exception,
+    error: BaseException,
     provider: Provider,
     latency_ms: float,
     session_id: Optional[str] = None,
     metadata: Optional[Dict[str, Any]] = None,
-) -> Trace:
-    trace = build_trace(request, None, provider, latency_ms, session_id, metadata)
-    trace["status"] = TraceStatus.ERROR.value
-    trace["error"] = {
+    policy: Optional[CapturePolicy] = None,
+    ended_at: Optional[float] = None,
+) -> TraceRecord:
+    record = build_record(
+        request,
+        None,
+        provider,
+        latency_ms,
+        session_id,
+        metadata,
+        policy=policy,
+        ended_at=ended_at,
+    )
+    record.error = {
         "name": error.__class__.__name__,
         "message": str(error),
     }
-    return trace
+    return record
+
+
+def build_trace(
+    request: Dict[str, Any],
+    response: Optional[NormalizedResponse],
+    provider: Provider,
+    latency_ms: float,
+    session_id: Optional[str] = None,
+    metadata: Optional[Dict[str, Any]] = None,
+    time_to_first_token_ms: Optional[float] = None,
+    policy: Optional[CapturePolicy] = None,
+    ended_at: Optional[float] = None,
+) -> Trace:
+    return build_record(
+        request,
+        response,
+        provider,
+        latency_ms,
+        session_id,
+        metadata,
+        time_to_first_token_ms,
+        policy,
+        ended_at,
+    ).to_wire()
+
+
+def build_error_trace(
+    request: Dict[str, Any],
+    error: Exception,
+    provider: Provider,
+    latency_ms: float,
+    session_id: Optional[str] = None,
+    metadata: Optional[Dict[str, Any]] = None,
+    policy: Optional[CapturePolicy] = None,
+    ended_at: Optional[float] = None,
+) -> Trace:
+    return build_error_record(
+        request, error, provider, latency_ms, session_id, metadata, policy, ended_at
+    ).to_wire()
+
+
+class PendingTrace:
+    """A finished call whose trace has not been built yet.
+
+    Holds references only: the raw provider response (or the normalized one
+    for streams), the request as captured on the call path, timings and
+    context. ``build`` normalizes, applies sampling tail rules, snapshots
+    the request if ``snapshot_mode`` is set, prices and builds the trace. With
+    ``defer_trace_build`` it runs on the flush worker; otherwise right away.
+    """
+
+    __slots__ = (
+        "provider",
+        "request",
+        "snapshot_mode",
+        "response",
+        "normalize",
+        "normalized",
+        "error",
+        "latency_ms",
+        "time_to_first_token_ms",
+        "ended_at",
+        "session_id",
+        "metadata",
+        "sampled",
+        "sample_rate",
+    )
+
+    def __init__(
+        self,
+        provider: Provider,
+        request: Dict[str, Any],
+        latency_ms: float,
+        *,
+        snapshot_mode: Optional[str] = None,
+        response: Any = None,
+        normalize: Optional[Callable[[Any], NormalizedResponse]] = None,
+        normalized: Optional[NormalizedResponse] = None,
+        error: Optional[BaseException] = None,
+        time_to_first_token_ms: Optional[float] = None,
+        session_id: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        sampled: bool = True,
+        sample_rate: float = 1.0,
+        ended_at: Optional[float] = None,
+    ) -> None:
+        self.provider = provider
+        self.request = request
+        self.snapshot_mode = snapshot_mode
+        self.response = response
+        self.normalize = normalize
+        self.normalized = normalized
+        self.error = error
+        self.latency_ms = latency_ms
+        self.time_to_first_token_ms = time_to_first_token_ms
+        self.ended_at = wall_time() if ended_at is None else ended_at
+        self.session_id = session_id
+        self.metadata = metadata
+        self.sampled = sampled
+        self.sample_rate = sample_rate
+
+    @property
+    def estimated_size(self) -> int:
+        # Cheaper stand-in for estimate_size(): sums the lengths of the
+        # string leaves (message content parts, data-URL images, system,
+        # tools) without pricing keys and scalars, and never normalizes.
+        size = 512 + _text_size(self.request)
+        messages = self.request.get("messages")
+        if isinstance(messages, list):
+            size += 64 * len(messages)
+        return size
+
+    def may_be_kept(self, sampling: "SamplingPolicy") -> bool:
+        """False when sampling certainly drops the call, before any work."""
+        if self.sampled or sampling.keep_cost_cents is not None:
+            return True
+        return (
+            sampling.tail_reason(self.error is not None, self.latency_ms, None)
+            is not None
+        )
+
+    def build(self, config: "ResolvedConfig") -> Optional[TraceRecord]:
+        reason = self._sample_reason(config.sampling)
+        if reason is None:
+            return None
+        request = self.request
+        if self.snapshot_mode is not None:
+            request = snapshot_request(request, self.snapshot_mode)
+        if self.error is not None:
+            record = build_error_record(
+                request,
+                self.error,
+                self.provider,
+                self.latency_ms,
+                self.session_id,
+                self.metadata,
+                policy=config.capture_policy,
+                ended_at=self.ended_at,
+            )
+        else:
+            record = build_record(
+                request,
+                self.normalized_response(),
+                self.provider,
+                self.latency_ms,
+                self.session_id,
+                self.metadata,
+                self.time_to_first_token_ms,
+                policy=config.capture_policy,
+                ended_at=self.ended_at,
+            )
+        # Lets the server re-weight aggregates: a head-sampled trace stands
+        # for 1 / sample_rate calls, a tail-kept one (rate 1.0) only for
+        # itself. Every call a tail rule matches is kept with its tail reason,
+        # so none of them is also counted through the head-sampled weight.
+        if self.sample_rate < 1.0:
+            record.sample_rate = self.sample_rate if reason == "head" else 1.0
+            record.sample_reason = reason
+        return record
+
+    def normalized_response(self) -> Optional[NormalizedResponse]:
+        if self.normalized is None and self.normalize is not None:
+            self.normalized = self.normalize(self.response)
+            self.response = None
+        return self.normalized
+
+    def _sample_reason(self, sampling: "SamplingPolicy") -> Optional[str]:
+        if self.sample_rate >= 1.0:
+            return "head"
+        # Tail rules first: they keep every matching call whether or not
+        # head sampling picked it.
+        error = self.error is not None
+        cost_cents = None
+        if not error and sampling.keep_cost_cents is not None:
+            normalized = self.normalized_response()
+            if normalized is not None:
+                cost_cents = response_cost(normalized)
+        reason = sampling.tail_reason(error, self.latency_ms, cost_cents)
+        if reason is None and self.sampled:
+            return "head"
+        return reason
@@ -1,28 +1,337 @@
 from __future__ import annotations
 
-import json
-from typing import List
+import datetime
+import email.utils
+import socket
+import struct
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
 
+from .compression import Compressor
+from .config import ResolvedConfig
+from .serialization import Serializer
+from .telemetry import get_telemetry
 from .types import Trace
 
 DEFAULT_TIMEOUT = 10  # seconds
+RETRYABLE_STATUS_CODES = frozenset({408, 429, 500, 502, 503, 504})
 
+# Collector frames: a big-endian payload length followed by a JSON object
+# holding either "traces" or "metrics" (a list of rollups).
+FRAME_HEADER = struct.Struct(">I")
+MAX_FRAME_BYTES = 64 * 1024 * 1024
 
-def send_traces(api_url: str, api_key: str, traces: List[Trace]) -> None:
-    if not traces:
-        return
 
-    url = f"{api_url.rstrip('/')}/v1/traces/async"
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json",
-    }
-    response = requests.post(
-        url, headers=headers, data=json.dumps(traces), timeout=DEFAULT_TIMEOUT
-    )
-    if not response.ok:
-        raise RuntimeError(
-            f"Pulse SDK: failed to send traces ({response.status_code}): {response.text}"
+class TransportError(RuntimeError):
+    """Raised by transports when a batch could not be delivered.
+
+    ``retryable`` tells the exporter whether sending the same batch again can
+    succeed; ``retry_after`` carries the server's ``Retry-After`` in seconds.
+    """
+
+    def __init__(
+        self,
+        message: str,
+        *,
+        status_code: Optional[int] = None,
+        retryable: bool = True,
+        retry_after: Optional[float] = None,
+    ) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return max((when - now).total_seconds(), 0.0)
+
+
+class Transport(ABC):
+    """Delivers batches of traces to Pulse.
+
+    A single instance is built by ``init_pulse`` and reused by the flush
+    worker for the lifetime of the process. Transports that encode JSON
+    expose their ``serializer`` so the worker can pre-encode buffered traces.
+    """
+
+    serializer: Optional[Serializer] = None
+
+    @abstractmethod
+    def send(self, traces: List[Trace]) -> None:
+        """Deliver one batch.
+
+        Raise ``TransportError`` on failure; any other exception is treated as
+        a retryable failure.
+        """
+
+    def send_blobs(self, blobs: Dict[str, str]) -> None:
+        """Upload offloaded content keyed by digest (see ``BlobStore``)."""
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support blob offload"
+        )
+
+    def send_metrics(self, rollups: List[Dict[str, Any]]) -> None:
+        """Deliver metric rollups (see ``MetricAggregator``)."""
+        raise NotImplementedError(f"{type(self).__name__} does not support metrics")
+
+    def prewarm(self) -> None:
+        """Open connections ahead of the first batch. Optional."""
+
+    def close(self) -> None:
+        """Release pooled resources. Optional."""
+
+    def after_fork(self) -> None:
+        """Called in a forked child before the transport is used there.
+
+        Connections inherited from the parent must not be reused by the
+        child. Optional.
+        """
+
+
+class HttpTransport(Transport):
+    def __init__(
+        self,
+        api_url: str,
+        api_key: str,
+        *,
+        pool_connections: int = 1,
+        pool_maxsize: int = 2,
+        timeout: float = DEFAULT_TIMEOUT,
+        compressor: Compressor | None = None,
+        serializer: Serializer | None = None,
+    ) -> None:
+        self.base_url = api_url.rstrip("/")
+        self.url = f"{self.base_url}/v1/traces/async"
+        self.blobs_url = f"{self.base_url}/v1/blobs"
+        self.metrics_url = f"{self.base_url}/v1/metrics"
+        self.timeout = timeout
+        self.compressor = compressor or Compressor()
+        self.serializer = serializer or Serializer()
+        self._api_key = api_key
+        self._pool_connections = pool_connections
+        self._pool_maxsize = pool_maxsize
+        self._session = self._new_session()
+
+    def _new_session(self) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self._pool_connections, pool_maxsize=self._pool_maxsize
         )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers.update(
+            {
+                "Authorization": f"Bearer {self._api_key}",
+                "Content-Type": "application/json",
+            }
+        )
+        return session
+
+    def send(self, traces: List[Trace]) -> None:
+        if not traces:
+            return
+        self._post(self.url, self.serializer.encode_batch(traces), "traces")
+
+    def send_blobs(self, blobs: Dict[str, str]) -> None:
+        if not blobs:
+            return
+        payload = [
+            {"digest": digest, "content": content} for digest, content in blobs.items()
+        ]
+        self._post(self.blobs_url, self.serializer.dumps(payload), "blobs")
+
+    def send_metrics(self, rollups: List[Dict[str, Any]]) -> None:
+        if not rollups:
+            return
+        self._post(self.metrics_url, self.serializer.dumps(rollups), "metrics")
+
+    def _post(self, url: str, payload: bytes, what: str) -> None:
+        body, encoding = self.compressor.encode(payload)
+        get_telemetry().record_payload(len(payload), len(body))
+        headers = {"Content-Encoding": encoding} if encoding else None
+        try:
+            response = self._session.post(
+                url, data=body, headers=headers, timeout=self.timeout
+            )
+        except requests.RequestException as exc:
+            raise TransportError(f"Pulse SDK: failed to send {what}: {exc}") from exc
+        if not response.ok:
+            raise TransportError(
+                f"Pulse SDK: failed to send {what} ({response.status_code}): {response.text}",
+                status_code=response.status_code,
+                retryable=response.status_code in RETRYABLE_STATUS_CODES,
+                retry_after=parse_retry_after(response.headers.get("Retry-After")),
+            )
+
+    def prewarm(self) -> None:
+        # Any response will do: the point is to leave a connection (and its
+        # TLS session) in the pool before the first real batch.
+        try:
+            self._session.head(self.base_url, timeout=self.timeout)
+        except requests.RequestException:
+            pass
+
+    def close(self) -> None:
+        self._session.close()
+
+    def after_fork(self) -> None:
+        # The pooled sockets are shared with the parent; leave them to it.
+        self._session = self._new_session()
+        self.serializer.after_fork()
+
+
+class InMemoryTransport(Transport):
+    """Keeps sent batches in memory. Useful for tests."""
+
+    def __init__(self) -> None:
+        self.batches: List[List[Trace]] = []
+        self.blobs: Dict[str, str] = {}
+        self.metrics: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def send(self, traces: List[Trace]) -> None:
+        with self._lock:
+            self.batches.append(list(traces))
+
+    def send_blobs(self, blobs: Dict[str, str]) -> None:
+        with self._lock:
+            self.blobs.update(blobs)
+
+    def send_metrics(self, rollups: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            self.metrics.extend(rollups)
+
+    def after_fork(self) -> None:
+        self._lock = threading.Lock()
+
+    @property
+    def traces(self) -> List[Trace]:
+        with self._lock:
+            return [trace for batch in self.batches for trace in batch]
+
+
+def encode_frame(payload: bytes) -> bytes:
+    return FRAME_HEADER.pack(len(payload)) + payload
+
+
+class UnixSocketTransport(Transport):
+    """Hands batches to a local collector (``python -m pulse_sdk.collector``).
+
+    Each batch is one fire-and-forget frame written to a Unix domain socket;
+    the collector batches, compresses and uploads on behalf of every process
+    on the host, so the application itself does no network I/O.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        timeout: float = DEFAULT_TIMEOUT,
+        serializer: Serializer | None = None,
+    ) -> None:
+        self.path = path
+        self.timeout = timeout
+        self.serializer = serializer or Serializer()
+        self._sock: socket.socket | None = None
+        self._lock = threading.Lock()
+
+    def send(self, traces: List[Trace]) -> None:
+        if not traces:
+            return
+        batch = self.serializer.encode_batch(traces)
+        self._write(encode_frame(b'{"traces":' + batch + b"}"), "traces")
+
+    def send_metrics(self, rollups: List[Dict[str, Any]]) -> None:
+        if not rollups:
+            return
+        frame = encode_frame(self.serializer.dumps({"metrics": rollups}))
+        self._write(frame, "metrics")
+
+    def _write(self, frame: bytes, what: str) -> None:
+        with self._lock:
+            try:
+                if self._sock is None:
+                    self._sock = self._connect()
+                self._sock.sendall(frame)
+                get_telemetry().record_payload(len(frame), len(frame))
+            except OSError as exc:
+                # A partial frame is discarded by the collector along with
+                # the connection; the next batch reconnects.
+                self._disconnect()
+                raise TransportError(
+                    f"Pulse SDK: failed to send {what} to collector at {self.path}: {exc}"
+                ) from exc
+
+    def _connect(self) -> socket.socket:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.path)
+        except OSError:
+            sock.close()
+            raise
+        return sock
+
+    def _disconnect(self) -> None:
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    def prewarm(self) -> None:
+        with self._lock:
+            if self._sock is None:
+                try:
+                    self._sock = self._connect()
+                except OSError:
+                    pass
+
+    def close(self) -> None:
+        with self._lock:
+            self._disconnect()
+
+    def after_fork(self) -> None:
+        self._lock = threading.Lock()
+        self._disconnect()
+        self.serializer.after_fork()
+
+
+def create_transport(config: ResolvedConfig) -> Transport:
+    if config.transport is not None:
+        return config.transport
+    if config.collector_socket:
+        return UnixSocketTransport(
+            config.collector_socket,
+            timeout=config.request_timeout / 1000.0,
+            serializer=Serializer(config.serializer),
+        )
+    return HttpTransport(
+        config.api_url,
+        config.api_key,
+        pool_connections=config.pool_connections,
+        # One connection per concurrent upload, or the pool would discard
+        # and reopen them.
+        pool_maxsize=max(config.pool_maxsize, config.max_in_flight),
+        timeout=config.request_timeout / 1000.0,
+        compressor=Compressor(
+            config.compression,
+            config.compression_level,
+            config.compression_min_bytes,
+        ),
+        serializer=Serializer(config.serializer),
+    )
@@ -2,7 +2,10 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from enum import Enum
-from typing import Any, Dict, Optional, TypedDict
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, TypedDict
+
+if TYPE_CHECKING:
+    from .transport import Transport
 
 
 class Provider(str, Enum):
@@ -27,14 +30,22 @@ class Trace(TypedDict, total=False):
     response_body: Dict[str, Any]
     input_tokens: Optional[int]
     output_tokens: Optional[int]
+    cache_read_tokens: int
+    cache_write_tokens: int
     output_text: Optional[str]
     finish_reason: Optional[str]
     status: str
     error: Dict[str, Any]
     cost_cents: Optional[float]
     latency_ms: int
+    time_to_first_token_ms: int
     session_id: Optional[str]
     metadata: Dict[str, Any]
+    truncated_fields: List[str]
+    parent_trace_id: str
+    messages_offset: int
+    sample_rate: float
+    sample_reason: str
 
 
 class PulseConfig(TypedDict, total=False):
@@ -42,7 +53,58 @@ class PulseConfig(TypedDict, total=False):
     api_url: str
     batch_size: int
     flush_interval: int
+    max_batch_size: int
+    batch_bytes: int
+    adaptive_batching: bool
+    batch_target_latency: int
+    max_in_flight: int
     enabled: bool
+    pool_connections: int
+    pool_maxsize: int
+    compression: str
+    compression_level: int
+    compression_min_bytes: int
+    capture_mode: str
+    max_field_bytes: Optional[int]
+    binary_parts: str
+    sample_rate: float
+    provider_sample_rates: Dict[str, float]
+    model_sample_rates: Dict[str, float]
+    keep_errors: bool
+    keep_slow_ms: float
+    keep_cost_cents: float
+    blob_offload: bool
+    blob_min_bytes: int
+    blob_cache_size: int
+    blob_ttl: float
+    session_delta: bool
+    session_delta_cache_size: int
+    max_buffer_size: int
+    max_buffer_bytes: Optional[int]
+    overflow_policy: str
+    block_timeout: int
+    request_timeout: int
+    max_retries: int
+    retry_base_delay: int
+    retry_max_delay: int
+    circuit_failure_threshold: int
+    circuit_reset_timeout: int
+    spool_dir: str
+    spool_max_bytes: int
+    spool_segment_bytes: int
+    spool_fsync_interval: int
+    collector_socket: str
+    defer_trace_build: bool
+    serializer: str
+    encode_in_background: bool
+    pricing_file: str
+    metrics: bool
+    metrics_interval: int
+    metrics_max_series: int
+    metrics_tag_key: str
+    stats_callback: Callable[[Dict[str, Any]], None]
+    stats_interval: int
+    transport: "Transport"
 
 
 @dataclass
@@ -60,3 +122,8 @@ class NormalizedResponse:
     finish_reason: Optional[str]
     cost_cents: Optional[float] = None
     provider_request_id: Optional[str] = None
+    # Prompt tokens read from / written to the provider's cache. OpenAI
+    # counts them in input_tokens; Anthropic (cache_in_input=False) does not.
+    cache_read_tokens: Optional[int] = None
+    cache_write_tokens: Optional[int] = None
+    cache_in_input: bool = True
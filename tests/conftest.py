@@ -0,0 +1,177 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+
+from pulse_sdk import state
+from pulse_sdk.config import load_config
+from pulse_sdk.transport import InMemoryTransport
+
+
+@pytest.fixture(autouse=True)
+def _reset_pulse_state():
+    yield
+    state.reset_state()
+    state._config = None
+
+
+@pytest.fixture
+def configure():
+    """Install a config for ``transport`` without starting the flush worker,
+    and return the transport (a new ``InMemoryTransport`` if none is given).
+
+    Retries back off for a millisecond so failure paths stay fast.
+    """
+
+    def configure(transport=None, **overrides):
+        if transport is None:
+            transport = InMemoryTransport()
+        config = {
+            "api_key": "pulse_sk_test",
+            "transport": transport,
+            "flush_interval": 60_000,
+            "retry_base_delay": 1,
+            "retry_max_delay": 1,
+            **overrides,
+        }
+        state.set_config(load_config(config))
+        return transport
+
+    return configure
+
+
+@pytest.fixture
+def wait_for():
+    """Poll ``predicate`` until it holds or ``timeout`` seconds pass."""
+
+    def wait_for(predicate, timeout: float = 5.0) -> bool:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if predicate():
+                return True
+            time.sleep(0.01)
+        return predicate()
+
+    return wait_for
+
+
+@pytest.fixture
+def openai_response():
+    """Build a chat completion shaped like the ``openai`` SDK's."""
+
+    def openai_response(
+        content="hi there",
+        prompt_tokens=12,
+        completion_tokens=3,
+        response_type=SimpleNamespace,
+    ):
+        return response_type(
+            id="chatcmpl-1",
+            model="gpt-4o-mini-2024-07-18",
+            choices=[
+                SimpleNamespace(
+                    message=SimpleNamespace(content=content), finish_reason="stop"
+                )
+            ],
+            usage=SimpleNamespace(
+                prompt_tokens=prompt_tokens, completion_tokens=completion_tokens
+            ),
+        )
+
+    return openai_response
+
+
+@pytest.fixture
+def anthropic_response():
+    """Build a message shaped like the ``anthropic`` SDK's."""
+
+    def anthropic_response(content="hi there"):
+        return SimpleNamespace(
+            id="msg_1",
+            model="claude-3-5-haiku-20241022",
+            content=[SimpleNamespace(type="text", text=content)],
+            usage=SimpleNamespace(input_tokens=12, output_tokens=3),
+            stop_reason="end_turn",
+        )
+
+    return anthropic_response
+
+
+@pytest.fixture
+def openai_client():
+    """Stand-in for ``OpenAI()`` whose ``chat.completions.create`` is ``create``."""
+
+    def openai_client(create):
+        return SimpleNamespace(
+            chat=SimpleNamespace(completions=SimpleNamespace(create=create))
+        )
+
+    return openai_client
+
+
+@pytest.fixture
+def anthropic_client():
+    """Stand-in for ``Anthropic()`` whose ``messages.create`` is ``create``."""
+
+    def anthropic_client(create):
+        return SimpleNamespace(messages=SimpleNamespace(create=create))
+
+    return anthropic_client
+
+
+class FakeIngestion:
+    """Minimal local stand-in for the Pulse ingestion API."""
+
+    def __init__(self) -> None:
+        self.requests = []
+        self.client_ports = set()
+        # (status, headers) to answer the next POSTs with, instead of 202.
+        self.responses = []
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _reply(self, status: int = 202, headers=None) -> None:
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def do_HEAD(self):
+                fake.client_ports.add(self.client_address[1])
+                self._reply(200)
+
+            def do_POST(self):
+                fake.client_ports.add(self.client_address[1])
+                length = int(self.headers.get("Content-Length", 0))
+                body = self.rfile.read(length)
+                fake.requests.append((self.path, dict(self.headers), body))
+                if fake.responses:
+                    self._reply(*fake.responses.pop(0))
+                else:
+                    self._reply()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def fake_ingestion():
+    with FakeIngestion() as fake:
+        yield fake
@@ -0,0 +1,234 @@
+import threading
+import time
+
+import pytest
+
+from pulse_sdk import state
+from pulse_sdk.batching import BatchController
+from pulse_sdk.buffer import TraceBuffer
+from pulse_sdk.config import ConfigError, load_config
+from pulse_sdk.transport import InMemoryTransport, TransportError
+
+
+class RecordingTransport(InMemoryTransport):
+    def __init__(self, delay: float = 0.0, failures: int = 0) -> None:
+        super().__init__()
+        self.delay = delay
+        self.failures = failures
+        self.sizes = []
+
+    def send(self, traces):
+        time.sleep(self.delay)
+        if self.failures:
+            self.failures -= 1
+            raise TransportError("ingestion unavailable", retryable=True)
+        self.sizes.append(len(traces))
+        super().send(traces)
+
+
+def test_controller_grows_additively_and_halves_on_trouble():
+    controller = BatchController(10, max_size=40, target_latency=100)
+
+    controller.record(10, 0.01, ok=True)
+    controller.record(15, 0.01, ok=True)
+    assert controller.limit == 20
+    controller.record(3, 0.01, ok=True)  # not full: nothing learned
+    assert controller.limit == 20
+    controller.record(20, 0.5, ok=True)  # slower than the target
+    assert controller.limit == 10
+    controller.record(10, 0.01, ok=False)
+    assert controller.limit == 5
+    for _ in range(20):
+        controller.record(controller.limit, 0.01, ok=True)
+    assert controller.limit == 40
+
+
+def test_fixed_batches_without_adaptive_batching():
+    controller = BatchController(10, adaptive=False)
+
+    controller.record(10, 0.01, ok=True)
+    controller.record(10, 5.0, ok=False)
+    assert controller.limit == 10
+
+
+def test_take_stops_at_the_byte_budget():
+    buffer = TraceBuffer(max_bytes=None, measure=True)
+    buffer.put({"trace_id": "big", "output_text": "x" * 5_000})
+    for index in range(5):
+        buffer.put({"trace_id": str(index), "output_text": "x" * 1_000})
+
+    assert [t["trace_id"] for t, _, _ in buffer.take(10, 3_000)] == ["big"]
+    assert [t["trace_id"] for t, _, _ in buffer.take(10, 3_000)] == ["0", "1"]
+    assert len(buffer.take(2)) == 2
+
+
+def test_flush_splits_the_buffer_by_count_and_bytes(configure):
+    transport = RecordingTransport()
+    configure(transport, batch_size=4, adaptive_batching=False, batch_bytes=4_096)
+    for index in range(10):
+        state.add_to_buffer({"trace_id": str(index)})
+    for index in range(3):
+        state.add_to_buffer({"trace_id": f"big-{index}", "output_text": "x" * 3_000})
+
+    state.flush_buffer()
+
+    assert transport.sizes == [4, 4, 3, 1, 1]
+    assert len(transport.traces) == 13
+
+
+def test_flush_stops_at_a_failed_batch_and_shrinks_the_next(configure):
+    transport = RecordingTransport(failures=1)
+    configure(transport, batch_size=8)
+    for index in range(16):
+        state.add_to_buffer({"trace_id": str(index)})
+
+    state.flush_buffer()
+    assert transport.sizes == []
+    assert len(state._buffer) == 16
+    assert state.get_stats()["batch_limit"] == 4
+
+    state._retry_policy.reset()
+    state.flush_buffer()
+    assert sum(transport.sizes) == 16
+    assert transport.sizes[0] == 4
+
+
+def test_batches_grow_while_ingestion_keeps_up(configure):
+    transport = RecordingTransport()
+    configure(transport, batch_size=10, max_batch_size=60, max_buffer_size=1_000)
+    for index in range(1_000):
+        state.add_to_buffer({"trace_id": str(index)})
+
+    state.flush_buffer()
+
+    assert transport.sizes[:3] == [10, 15, 20]
+    assert max(transport.sizes) == 60
+    assert sum(transport.sizes) == 1_000
+
+
+def test_linger_below_one_second(configure, wait_for):
+    transport = RecordingTransport()
+    configure(transport, batch_size=100, flush_interval=50)
+    state.start_flush_worker()
+
+    state.add_to_buffer({"trace_id": "1"})
+    assert wait_for(lambda: transport.traces, timeout=1.0)
+    assert [t["trace_id"] for t in transport.traces] == ["1"]
+
+
+def test_batch_options_are_validated():
+    config = load_config(
+        {"api_key": "pulse_sk_test", "batch_size": 2_000, "flush_interval": 10}
+    )
+    assert (config.batch_size, config.max_batch_size) == (2_000, 2_000)
+    with pytest.raises(ConfigError):
+        load_config({"api_key": "pulse_sk_test", "flush_interval": 5})
+    with pytest.raises(ConfigError):
+        load_config({"api_key": "pulse_sk_test", "batch_size": 50_000})
+    with pytest.raises(ConfigError):
+        load_config(
+            {"api_key": "pulse_sk_test", "batch_size": 50, "max_batch_size": 20}
+        )
+    with pytest.raises(ConfigError):
+        load_config({"api_key": "pulse_sk_test", "batch_bytes": 10})
+
+
+class ConcurrencyTrackingTransport(InMemoryTransport):
+    def __init__(self, delay: float, fail_batches=()) -> None:
+        super().__init__()
+        self.delay = delay
+        self.fail_batches = set(fail_batches)
+        self.active = 0
+        self.peak = 0
+        self.calls = 0
+        self._count_lock = threading.Lock()
+
+    def send(self, traces):
+        with self._count_lock:
+            self.calls += 1
+            call = self.calls
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(self.delay)
+            if call in self.fail_batches:
+                raise TransportError("ingestion unavailable", retryable=True)
+            super().send(traces)
+        finally:
+            with self._count_lock:
+                self.active -= 1
+
+
+def test_concurrent_uploads_are_bounded_by_max_in_flight(configure):
+    transport = ConcurrencyTrackingTransport(delay=0.05)
+    configure(transport, batch_size=5, adaptive_batching=False, max_in_flight=4)
+    for index in range(60):
+        state.add_to_buffer({"trace_id": str(index)})
+
+    start = time.perf_counter()
+    state.flush_buffer()
+    elapsed = time.perf_counter() - start
+
+    assert transport.peak == 4
+    assert sorted(int(t["trace_id"]) for t in transport.traces) == list(range(60))
+    assert elapsed < 12 * 0.05  # sequential would take 12 round trips
+    assert len(state._buffer) == 0
+
+
+def test_failed_concurrent_batch_is_requeued_and_stops_the_flush(configure):
+    transport = ConcurrencyTrackingTransport(delay=0.02, fail_batches={1})
+    configure(transport, batch_size=5, adaptive_batching=False, max_in_flight=2)
+    for index in range(50):
+        state.add_to_buffer({"trace_id": str(index)})
+
+    state.flush_buffer()
+
+    sent = len(transport.traces)
+    assert sent < 45
+    assert len(state._buffer) == 50 - sent
+    assert state.get_stats()["retried"] == 5
+
+
+def test_session_deltas_are_uploaded_one_batch_at_a_time(configure):
+    configure(InMemoryTransport(), max_in_flight=4, session_delta=True)
+    assert state.get_upload_pool() is None
+
+    configure(InMemoryTransport(), max_in_flight=4)
+    assert state.get_upload_pool() is not None
+
+
+def test_reconfiguring_replaces_the_upload_pool(configure):
+    configure(InMemoryTransport(), max_in_flight=2)
+    first = state.get_upload_pool()
+
+    configure(InMemoryTransport(), max_in_flight=4)
+    second = state.get_upload_pool()
+    assert second is not first and second._max_workers == 4
+    with pytest.raises(RuntimeError):
+        first.submit(print)
+
+    configure(InMemoryTransport())
+    assert state.get_upload_pool() is None
+
+
+def test_concurrent_failures_count_as_one_outage(configure):
+    transport = ConcurrencyTrackingTransport(delay=0.05, fail_batches=range(1, 100))
+    configure(
+        transport,
+        batch_size=5,
+        max_in_flight=8,
+        max_buffer_size=1_000,
+        retry_base_delay=5_000,
+        retry_max_delay=5_000,
+    )
+    for index in range(80):
+        state.add_to_buffer({"trace_id": str(index)})
+
+    state.flush_buffer()
+
+    assert transport.calls == 8
+    assert state._circuit_breaker.failures == 1
+    assert state._circuit_breaker.state == "closed"
+    assert state.get_stats()["batch_limit"] == 2  # halved once, not eight times
+    assert len(state._buffer) == 80
+    assert state._send_blocked_for() > 0
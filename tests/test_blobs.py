@@ -0,0 +1,103 @@
+import json
+
+import pytest
+
+from pulse_sdk import flush_buffer, init_pulse, state
+from pulse_sdk.blobs import BlobStore, blob_digest, resolve_blob_refs
+from pulse_sdk.config import ConfigError, load_config
+from pulse_sdk.transport import InMemoryTransport, Transport
+
+SYSTEM_PROMPT = "You are a meticulous support agent. " * 600
+
+
+def _trace(trace_id: str, question: str):
+    return {
+        "trace_id": trace_id,
+        "request_body": {
+            "model": "gpt-4o-mini",
+            "messages": [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": question},
+            ],
+        },
+    }
+
+
+def test_blob_store_replaces_large_strings_once():
+    store = BlobStore(min_bytes=1024)
+    original = _trace("1", "short question")
+
+    (trace,), blobs = store.offload([original])
+    digest = blob_digest(SYSTEM_PROMPT)
+
+    assert blobs == {digest: SYSTEM_PROMPT}
+    assert trace["request_body"]["messages"][0]["content"] == {"pulse_blob": digest}
+    assert (
+        trace["request_body"]["messages"][1] is original["request_body"]["messages"][1]
+    )
+    assert original["request_body"]["messages"][0]["content"] == SYSTEM_PROMPT
+
+    store.mark_uploaded(list(blobs))
+    _, blobs_again = store.offload([_trace("2", "another question")])
+    assert blobs_again == {}
+
+
+def test_blob_store_lru_is_bounded():
+    store = BlobStore(min_bytes=256, cache_size=2)
+    store.mark_uploaded(["sha256:a", "sha256:b", "sha256:c"])
+    assert not store._is_uploaded("sha256:a")
+    assert store._is_uploaded("sha256:c")
+
+
+def test_offloaded_traces_round_trip_through_ingestion(fake_ingestion):
+    init_pulse(
+        {
+            "api_key": "pulse_sk_test",
+            "api_url": fake_ingestion.url,
+            "flush_interval": 60_000,
+            "blob_offload": True,
+        }
+    )
+    originals = [_trace("1", "first"), _trace("2", "second")]
+
+    state.add_to_buffer(originals[0])
+    flush_buffer()
+    state.add_to_buffer(originals[1])
+    flush_buffer()
+
+    posts = [(path, json.loads(body)) for path, _, body in fake_ingestion.requests]
+    assert [path for path, _ in posts] == [
+        "/v1/blobs",
+        "/v1/traces/async",
+        "/v1/traces/async",
+    ]
+    blobs = {blob["digest"]: blob["content"] for blob in posts[0][1]}
+    received = [trace for _, batch in posts[1:] for trace in batch]
+    assert len(json.dumps(received)) < len(SYSTEM_PROMPT)
+    for sent, original in zip(received, originals):
+        restored = resolve_blob_refs(sent["request_body"], blobs)
+        assert restored == original["request_body"]
+
+
+class TracesOnlyTransport(Transport):
+    def send(self, traces):
+        pass
+
+
+def test_blob_offload_requires_a_transport_with_send_blobs():
+    with pytest.raises(ConfigError, match="send_blobs"):
+        load_config(
+            {
+                "api_key": "pulse_sk_test",
+                "transport": TracesOnlyTransport(),
+                "blob_offload": True,
+            }
+        )
+    load_config({"api_key": "pulse_sk_test", "transport": TracesOnlyTransport()})
+    load_config(
+        {
+            "api_key": "pulse_sk_test",
+            "transport": InMemoryTransport(),
+            "blob_offload": True,
+        }
+    )
@@ -0,0 +1,134 @@
+import pytest
+
+from pulse_sdk.capture import (
+    CapturePolicy,
+    apply_capture_policy,
+    snapshot_request,
+    truncate_middle,
+)
+from pulse_sdk.config import ConfigError, load_config
+from pulse_sdk.trace import build_trace, extract_pulse_params
+from pulse_sdk.types import NormalizedResponse, Provider
+
+
+def _payload():
+    return {
+        "model": "gpt-4o-mini",
+        "temperature": 0.2,
+        "messages": [
+            {"role": "system", "content": "be brief"},
+            {"role": "user", "content": [{"type": "text", "text": "hi"}]},
+        ],
+        "tools": [{"type": "function", "function": {"name": "lookup"}}],
+    }
+
+
+def test_extract_pulse_params_does_not_copy_nested_values():
+    payload = {**_payload(), "pulse_session_id": "s", "pulse_metadata": {"a": 1}}
+
+    clean, session, metadata = extract_pulse_params(payload)
+
+    assert session == "s" and metadata == {"a": 1}
+    assert "pulse_session_id" in payload
+    assert "pulse_session_id" not in clean
+    assert clean["messages"] is payload["messages"]
+
+
+def test_full_snapshot_is_independent_of_caller():
+    payload = _payload()
+    snapshot = snapshot_request(payload, "full")
+
+    payload["messages"][1]["content"][0]["text"] = "changed"
+
+    assert snapshot["messages"][1]["content"][0]["text"] == "hi"
+
+
+def test_shallow_snapshot_survives_list_and_message_mutation():
+    payload = _payload()
+    snapshot = snapshot_request(payload, "shallow")
+
+    payload["messages"].append({"role": "assistant", "content": "hello"})
+    payload["messages"][0]["content"] = "replaced"
+
+    assert len(snapshot["messages"]) == 2
+    assert snapshot["messages"][0]["content"] == "be brief"
+    assert snapshot["tools"] is payload["tools"]
+
+
+def test_none_snapshot_keeps_scalar_parameters_only():
+    snapshot = snapshot_request({**_payload(), "system": "secret"}, "none")
+
+    assert snapshot == {"model": "gpt-4o-mini", "temperature": 0.2}
+
+
+def test_capture_mode_is_validated():
+    with pytest.raises(ConfigError):
+        load_config({"api_key": "pulse_sk_test", "capture_mode": "everything"})
+
+
+def test_truncate_middle_keeps_head_and_tail():
+    text = "HEAD" + "x" * 10_000 + "TAIL"
+
+    truncated, changed = truncate_middle(text, 1024)
+
+    assert changed
+    assert truncated.startswith("HEAD") and truncated.endswith("TAIL")
+    assert len(truncated.encode("utf-8")) <= 1024
+    assert "truncated" in truncated
+
+
+def test_binary_parts_are_replaced_without_mutating_the_request():
+    image = "iVBORw0KGgo" * 1000
+    request = {
+        "model": "claude-3-5-haiku",
+        "messages": [
+            {
+                "role": "user",
+                "content": [
+                    {"type": "text", "text": "what is this?"},
+                    {
+                        "type": "image",
+                        "source": {
+                            "type": "base64",
+                            "media_type": "image/png",
+                            "data": image,
+                        },
+                    },
+                    {
+                        "type": "image_url",
+                        "image_url": {"url": f"data:image/jpeg;base64,{image}"},
+                    },
+                ],
+            }
+        ],
+    }
+
+    bounded, changed = apply_capture_policy(request, CapturePolicy())
+
+    assert changed
+    parts = bounded["messages"][0]["content"]
+    assert parts[0] is request["messages"][0]["content"][0]
+    assert parts[1]["source"]["data"].startswith(
+        "[binary image/png, 8250 bytes, sha256:"
+    )
+    assert parts[2]["image_url"]["url"].startswith("[binary image/jpeg")
+    assert request["messages"][0]["content"][1]["source"]["data"] == image
+
+
+def test_build_trace_marks_truncated_fields():
+    policy = CapturePolicy(max_field_bytes=512)
+    request = {"model": "gpt-4o-mini", "messages": [{"role": "user", "content": "hi"}]}
+    response = NormalizedResponse(
+        model="gpt-4o-mini",
+        content="y" * 5_000,
+        input_tokens=1,
+        output_tokens=1,
+        finish_reason="stop",
+    )
+
+    trace = build_trace(request, response, Provider.OPENAI, 1.0, policy=policy)
+
+    assert trace["truncated_fields"] == ["output_text"]
+    assert trace["request_body"] is request
+    assert len(trace["output_text"]) < 600
+    assert trace["response_body"]["content"] == trace["output_text"]
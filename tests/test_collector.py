@@ -0,0 +1,182 @@
+import gzip
+import json
+import os
+import signal
+import subprocess
+import sys
+
+import pytest
+
+from pulse_sdk import init_pulse, state
+from pulse_sdk.blobs import blob_digest
+from pulse_sdk.collector import Collector
+from pulse_sdk.metrics import MetricAggregator
+from pulse_sdk.transport import (
+    InMemoryTransport,
+    TransportError,
+    UnixSocketTransport,
+)
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(os, "fork"), reason="requires Unix domain sockets"
+)
+
+
+def test_collector_batches_traces_from_many_connections(tmp_path, wait_for):
+    upstream = InMemoryTransport()
+    init_pulse(
+        {
+            "api_key": "pulse_sk_test",
+            "transport": upstream,
+            "flush_interval": 60_000,
+            "blob_offload": True,
+        }
+    )
+    state.stop_flush_worker()
+    path = str(tmp_path / "collector.sock")
+    collector = Collector(path)
+    collector.start()
+    prompt = "You are a careful assistant. " * 500
+    try:
+        clients = [UnixSocketTransport(path) for _ in range(4)]
+        for i, client in enumerate(clients):
+            client.send(
+                [
+                    {"trace_id": f"{i}-a", "request_body": {"system": prompt}},
+                    {"trace_id": f"{i}-b"},
+                ]
+            )
+
+        assert wait_for(lambda: len(state._buffer) == 8)
+        state.flush_buffer()
+    finally:
+        collector.stop()
+        for client in clients:
+            client.close()
+
+    assert len(upstream.batches) == 1
+    assert len(upstream.traces) == 8
+    # Offloaded by the collector, so the blob is uploaded only once.
+    assert list(upstream.blobs) == [blob_digest(prompt)]
+
+
+def test_workers_behind_a_collector_leave_offload_to_it(tmp_path):
+    init_pulse(
+        {
+            "api_key": "pulse_sk_test",
+            "collector_socket": str(tmp_path / "collector.sock"),
+            "blob_offload": True,
+            "session_delta": True,
+        }
+    )
+
+    assert state.get_blob_store() is None
+    assert state.get_delta_encoder() is None
+
+
+class FlakyMetricsTransport(InMemoryTransport):
+    def __init__(self) -> None:
+        super().__init__()
+        self.failures = 1
+
+    def send_metrics(self, rollups):
+        if self.failures:
+            self.failures -= 1
+            raise TransportError("ingestion unavailable", retryable=True)
+        super().send_metrics(rollups)
+
+
+def test_collector_retries_forwarded_metrics(tmp_path, wait_for):
+    upstream = FlakyMetricsTransport()
+    init_pulse(
+        {
+            "api_key": "pulse_sk_test",
+            "transport": upstream,
+            "flush_interval": 60_000,
+            "metrics": True,
+        }
+    )
+    state.stop_flush_worker()
+    worker = MetricAggregator()
+    for latency in (100.0, 300.0):
+        worker.record("openai", "gpt-4o-mini", latency)
+    path = str(tmp_path / "collector.sock")
+    collector = Collector(path)
+    collector.start()
+    client = UnixSocketTransport(path)
+    try:
+        client.send_metrics(worker.swap().to_wire())
+        assert wait_for(lambda: len(state.get_metrics()) == 1)
+    finally:
+        collector.stop()
+        client.close()
+
+    state.flush_metrics()
+    assert upstream.metrics == []
+    state._retry_policy.reset()
+    state.flush_metrics()
+
+    [rollup] = upstream.metrics
+    assert (rollup["model"], rollup["count"]) == ("gpt-4o-mini", 2)
+    assert rollup["latency_ms"]["max"] == 300.0
+
+
+def test_unix_socket_transport_fails_retryably_without_collector(tmp_path):
+    transport = UnixSocketTransport(str(tmp_path / "missing.sock"))
+
+    with pytest.raises(TransportError) as excinfo:
+        transport.send([{"trace_id": "1"}])
+
+    assert excinfo.value.retryable
+
+
+def test_collector_socket_selects_unix_transport(tmp_path):
+    init_pulse(
+        {
+            "api_key": "pulse_sk_test",
+            "collector_socket": str(tmp_path / "collector.sock"),
+        }
+    )
+
+    assert isinstance(state.get_transport(), UnixSocketTransport)
+
+
+def test_collector_process_uploads_on_shutdown(tmp_path, fake_ingestion):
+    path = str(tmp_path / "collector.sock")
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "pulse_sdk.collector",
+            "--socket",
+            path,
+            "--api-key",
+            "pulse_sk_test",
+            "--api-url",
+            fake_ingestion.url,
+            "--flush-interval",
+            "60000",
+        ],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    try:
+        assert "listening" in process.stdout.readline()
+        for i in range(5):
+            client = UnixSocketTransport(path)
+            client.send([{"trace_id": str(i), "output": "x" * 500}])
+            client.close()
+    finally:
+        # No pause: frames the collector has not read yet must still arrive.
+        process.send_signal(signal.SIGTERM)
+        process.wait(timeout=10)
+
+    posted = [
+        body
+        for url, headers, body in fake_ingestion.requests
+        if url.endswith("traces/async")
+    ]
+    assert process.returncode == 0
+    received = [trace for body in posted for trace in json.loads(gzip.decompress(body))]
+    assert sorted(trace["trace_id"] for trace in received) == list("01234")
+    assert not os.path.exists(path)
@@ -0,0 +1,111 @@
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("openai")
+pytest.importorskip("anthropic")
+
+import pulse_sdk
+from pulse_sdk import InMemoryTransport, Provider, observe, state
+from pulse_sdk.buffer import estimate_size
+from pulse_sdk.trace import PendingTrace
+from pulse_sdk.transport import TransportError
+
+
+class CountingResponse(SimpleNamespace):
+    reads = 0
+
+    def __getattribute__(self, name):
+        if not name.startswith("__"):
+            type(self).reads += 1
+        return super().__getattribute__(name)
+
+
+def test_response_is_normalized_on_flush_not_on_the_call(
+    configure, openai_client, openai_response
+):
+    transport = configure(defer_trace_build=True)
+    CountingResponse.reads = 0
+    messages = [{"role": "user", "content": "Hello"}]
+
+    observe(
+        openai_client(
+            lambda **kwargs: openai_response("hi", response_type=CountingResponse)
+        ),
+        Provider.OPENAI,
+    ).chat.completions.create(model="gpt-4o-mini", messages=messages)
+    messages.append({"role": "assistant", "content": "hi"})
+
+    assert CountingResponse.reads == 0
+    (pending,) = state._buffer.peek()
+    assert isinstance(pending, PendingTrace)
+
+    pulse_sdk.flush_buffer()
+    (trace,) = transport.traces
+    assert CountingResponse.reads > 0
+    assert trace["output_text"] == "hi"
+    assert trace["cost_cents"] is not None
+    assert trace["request_body"]["messages"] == [{"role": "user", "content": "Hello"}]
+
+
+def test_retries_resend_the_trace_built_first(
+    configure, openai_client, openai_response
+):
+    class FailOnce(InMemoryTransport):
+        failed = False
+
+        def send(self, traces):
+            if not self.failed:
+                self.failed = True
+                raise TransportError("Pulse SDK: unavailable", retryable=True)
+            super().send(traces)
+
+    transport = FailOnce()
+    configure(transport, defer_trace_build=True)
+    observe(
+        openai_client(
+            lambda **kwargs: openai_response("hi", response_type=CountingResponse)
+        ),
+        Provider.OPENAI,
+    ).chat.completions.create(model="gpt-4o-mini", messages=[])
+
+    pulse_sdk.flush_buffer()
+    (requeued,) = state._buffer.peek()
+    state._retry_policy.reset()
+    pulse_sdk.flush_buffer()
+
+    assert transport.traces == [requeued.to_wire()]
+
+
+def test_sampled_out_calls_are_not_buffered(configure, openai_client, openai_response):
+    configure(defer_trace_build=True, sample_rate=0.0)
+
+    observe(
+        openai_client(
+            lambda **kwargs: openai_response("hi", response_type=CountingResponse)
+        ),
+        Provider.OPENAI,
+    ).chat.completions.create(model="gpt-4o-mini", messages=[])
+
+    assert len(state._buffer) == 0
+
+
+def test_estimated_size_counts_multimodal_content_system_and_tools():
+    image = "data:image/png;base64," + "A" * 5_000_000
+    request = {
+        "model": "claude-3-5-sonnet-latest",
+        "system": "s" * 2_000_000,
+        "tools": [{"name": "lookup", "description": "d" * 10_000}],
+        "messages": [
+            {
+                "role": "user",
+                "content": [
+                    {"type": "text", "text": "What is in this image?"},
+                    {"type": "image_url", "image_url": {"url": image}},
+                ],
+            }
+        ],
+    }
+    pending = PendingTrace(Provider.ANTHROPIC, request, 1.0)
+
+    assert pending.estimated_size == pytest.approx(estimate_size(request), rel=0.01)
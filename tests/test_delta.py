@@ -0,0 +1,68 @@
+from pulse_sdk.delta import SessionDeltaEncoder
+
+
+def _trace(trace_id, messages, session_id="s1"):
+    return {
+        "trace_id": trace_id,
+        "session_id": session_id,
+        "request_body": {"model": "gpt-4o-mini", "messages": list(messages)},
+    }
+
+
+def _rebuild(sent, full_messages_by_trace):
+    body = sent["request_body"]
+    if "parent_trace_id" not in sent:
+        return body["messages"]
+    parent = full_messages_by_trace[sent["parent_trace_id"]]
+    return parent[: sent["messages_offset"]] + body["messages"]
+
+
+def test_appended_turns_are_sent_as_deltas():
+    encoder = SessionDeltaEncoder()
+    history = [{"role": "system", "content": "be brief"}]
+    rebuilt = {}
+    sent_messages = 0
+
+    for turn in range(5):
+        history += [
+            {"role": "user", "content": f"question {turn}"},
+            {"role": "assistant", "content": f"answer {turn}"},
+        ]
+        (sent,) = encoder.encode([_trace(str(turn), history)])
+        rebuilt[str(turn)] = _rebuild(sent, rebuilt)
+        sent_messages += len(sent["request_body"]["messages"])
+        assert rebuilt[str(turn)] == history
+
+    assert sent_messages == len(history)
+
+
+def test_diverging_history_falls_back_to_full_body():
+    encoder = SessionDeltaEncoder()
+    first = [{"role": "user", "content": "a"}, {"role": "assistant", "content": "b"}]
+    encoder.encode([_trace("1", first)])
+
+    edited = [{"role": "user", "content": "A"}, {"role": "assistant", "content": "b"}]
+    (sent,) = encoder.encode([_trace("2", edited + [{"role": "user", "content": "c"}])])
+
+    assert "parent_trace_id" not in sent
+    assert len(sent["request_body"]["messages"]) == 3
+
+
+def test_forgotten_and_evicted_sessions_send_full_bodies():
+    encoder = SessionDeltaEncoder(cache_size=1)
+    messages = [{"role": "user", "content": "a"}]
+    lost = _trace("1", messages)
+    encoder.encode([lost])
+    encoder.forget([lost])
+    (sent,) = encoder.encode([_trace("2", messages * 2)])
+    assert "parent_trace_id" not in sent
+
+    encoder.encode([_trace("3", messages, session_id="other")])
+    (sent,) = encoder.encode([_trace("4", messages * 3)])
+    assert "parent_trace_id" not in sent
+
+
+def test_traces_without_session_are_untouched():
+    encoder = SessionDeltaEncoder()
+    trace = _trace("1", [{"role": "user", "content": "a"}], session_id=None)
+    assert encoder.encode([trace]) == [trace]
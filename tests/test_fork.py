@@ -0,0 +1,111 @@
+import json
+import os
+
+import pytest
+
+from pulse_sdk import init_pulse, state
+from pulse_sdk.transport import InMemoryTransport
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+
+
+def _run_in_child(fn):
+    """Run ``fn`` in a forked child and return what it wrote as JSON."""
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        status = 0
+        try:
+            result = fn()
+            os.write(write_fd, json.dumps(result).encode("utf-8"))
+        except BaseException:
+            status = 1
+        finally:
+            os._exit(status)
+    os.close(write_fd)
+    with os.fdopen(read_fd, "rb") as reader:
+        output = reader.read()
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+    return json.loads(output)
+
+
+def test_child_starts_with_an_empty_buffer_and_its_own_worker():
+    transport = InMemoryTransport()
+    init_pulse(
+        {"api_key": "pulse_sk_test", "transport": transport, "flush_interval": 60_000}
+    )
+    state.add_to_buffer({"trace_id": "parent"})
+    parent_worker = state._flush_thread
+
+    def child():
+        inherited = len(state._buffer)
+        state.add_to_buffer({"trace_id": "child"})
+        worker = state._flush_thread
+        state.flush_buffer()
+        return {
+            "inherited": inherited,
+            "worker_alive": worker is not None and worker.is_alive(),
+            "new_worker": worker is not parent_worker,
+            "sent": [t["trace_id"] for t in transport.traces],
+        }
+
+    result = _run_in_child(child)
+
+    assert result == {
+        "inherited": 0,
+        "worker_alive": True,
+        "new_worker": True,
+        "sent": ["child"],
+    }
+    assert [t["trace_id"] for t in state._buffer.drain()] == ["parent"]
+
+
+def test_child_opens_new_http_connections(fake_ingestion):
+    init_pulse(
+        {
+            "api_key": "pulse_sk_test",
+            "api_url": fake_ingestion.url,
+            "flush_interval": 60_000,
+        }
+    )
+    state.stop_flush_worker()
+    state.add_to_buffer({"trace_id": "parent"})
+    state.flush_buffer()
+    parent_session = state.get_transport()._session
+
+    def child():
+        state.add_to_buffer({"trace_id": "child"})
+        state.flush_buffer()
+        return {"new_session": state.get_transport()._session is not parent_session}
+
+    assert _run_in_child(child) == {"new_session": True}
+    assert len(fake_ingestion.requests) >= 2
+    assert len(fake_ingestion.client_ports) >= 2
+
+
+def test_child_does_not_inherit_the_serializer_lock_or_cache(fake_ingestion):
+    init_pulse(
+        {
+            "api_key": "pulse_sk_test",
+            "api_url": fake_ingestion.url,
+            "flush_interval": 60_000,
+        }
+    )
+    state.stop_flush_worker()
+    serializer = state.get_transport().serializer
+    serializer.pre_encode([{"trace_id": "parent"}])
+
+    def child():
+        state.add_to_buffer({"trace_id": "child"})
+        state.flush_buffer()
+        return {"cached": len(serializer._encoded)}
+
+    # Fork while the parent is mid pre-encode, holding the serializer lock.
+    with serializer._lock:
+        result = _run_in_child(child)
+
+    assert result == {"cached": 0}
+    sent = [json.loads(body) for _, _, body in fake_ingestion.requests]
+    assert any(t["trace_id"] == "child" for batch in sent for t in batch)
@@ -0,0 +1,66 @@
+import datetime
+import os
+import threading
+import uuid
+
+import pytest
+
+from pulse_sdk.clock import format_timestamp, wall_time
+from pulse_sdk.ids import TraceIdGenerator, generate_trace_id
+
+
+def test_ids_are_uuid7_and_sort_in_generation_order():
+    generate = TraceIdGenerator()
+    epoch = 1_700_000_000.123
+    ids = [generate(epoch) for _ in range(10_000)]  # overflows the counter
+
+    assert ids == sorted(ids)
+    assert len(set(ids)) == len(ids)
+    parsed = uuid.UUID(ids[0])
+    assert parsed.version == 7
+    assert parsed.variant == uuid.RFC_4122
+    assert parsed.int >> 80 == 1_700_000_000_123
+
+
+def test_ids_are_unique_across_threads():
+    generate = TraceIdGenerator()
+    results = [[] for _ in range(8)]
+
+    def run(out):
+        out.extend(generate() for _ in range(2_000))
+
+    threads = [threading.Thread(target=run, args=(out,)) for out in results]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    ids = [trace_id for out in results for trace_id in out]
+    assert len(set(ids)) == len(ids)
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+def test_forked_child_generates_different_ids():
+    generate_trace_id()
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        os.write(write_fd, "\n".join(generate_trace_id() for _ in range(100)).encode())
+        os._exit(0)
+    os.close(write_fd)
+    parent = {generate_trace_id() for _ in range(100)}
+    with os.fdopen(read_fd) as pipe:
+        child = set(pipe.read().split("\n"))
+    os.waitpid(pid, 0)
+
+    assert len(child) == 100
+    assert not parent & child
+
+
+def test_timestamps_match_isoformat():
+    for epoch in (0.5, 1_700_000_000.000006, 1_700_000_000.999999, wall_time()):
+        expected = datetime.datetime.fromtimestamp(
+            epoch, datetime.timezone.utc
+        ).isoformat(timespec="microseconds")
+        assert format_timestamp(epoch) == expected
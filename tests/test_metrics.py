@@ -0,0 +1,166 @@
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from pulse_sdk.config import ConfigError, load_config
+from pulse_sdk.metrics import OVERFLOW_LABEL, MetricAggregator, Sketch
+from pulse_sdk.transport import InMemoryTransport, Transport, TransportError
+
+
+def test_sketch_quantiles_are_within_relative_accuracy():
+    rng = random.Random(7)
+    values = sorted(rng.lognormvariate(5, 1.5) for _ in range(20_000))
+    left, right = Sketch(), Sketch()
+    for i, value in enumerate(values):
+        (left if i % 2 else right).add(value)
+    left.merge(right)
+
+    assert left.count == len(values)
+    for q in (0.5, 0.9, 0.99):
+        expected = values[int(q * (len(values) - 1))]
+        assert left.quantile(q) == pytest.approx(expected, rel=0.011)
+
+
+def test_series_are_bounded_under_high_cardinality():
+    aggregator = MetricAggregator(max_series=10)
+
+    for i in range(1_000):
+        aggregator.record("openai", f"model-{i}", 5.0, tag=f"user-{i}")
+
+    window = aggregator.swap()
+    assert len(window.series) <= 11
+    overflow = window.series[("openai", OVERFLOW_LABEL, "success", OVERFLOW_LABEL)]
+    assert overflow.count == 990
+    assert sum(series.count for series in window.series.values()) == 1_000
+
+
+def test_unsent_window_is_merged_into_the_next():
+    aggregator = MetricAggregator()
+    aggregator.record("openai", "gpt-4o", 10.0, cost_cents=1.5)
+    first = aggregator.swap()
+    aggregator.record("openai", "gpt-4o", 20.0, cost_cents=0.5)
+    aggregator.restore(first)
+
+    (rollup,) = aggregator.swap().to_wire()
+    assert (rollup["count"], rollup["cost_cents"]) == (2, 2.0)
+    assert (rollup["latency_ms"]["min"], rollup["latency_ms"]["max"]) == (10.0, 20.0)
+    assert rollup["window_start"] <= rollup["window_end"]
+    assert len(aggregator) == 0
+
+
+pytest.importorskip("openai")
+
+
+def test_rollups_count_calls_that_sampling_drops():
+    import pulse_sdk
+    from pulse_sdk import Provider, init_pulse, observe, state
+
+    transport = InMemoryTransport()
+    init_pulse(
+        {
+            "api_key": "pulse_sk_test",
+            "transport": transport,
+            "flush_interval": 60_000,
+            "sample_rate": 0.0,
+            "keep_errors": False,
+            "metrics": True,
+            "metrics_tag_key": "endpoint",
+        }
+    )
+    response = SimpleNamespace(
+        id="chatcmpl-1",
+        model="gpt-4o-mini-2024-07-18",
+        choices=[
+            SimpleNamespace(message=SimpleNamespace(content="hi"), finish_reason="stop")
+        ],
+        usage=SimpleNamespace(prompt_tokens=100, completion_tokens=10),
+    )
+
+    def create(**kwargs):
+        if kwargs.get("fail"):
+            raise RuntimeError("boom")
+        return response
+
+    client = observe(
+        SimpleNamespace(
+            chat=SimpleNamespace(completions=SimpleNamespace(create=create))
+        ),
+        Provider.OPENAI,
+    )
+    for _ in range(50):
+        client.chat.completions.create(
+            model="gpt-4o-mini", messages=[], pulse_metadata={"endpoint": "/chat"}
+        )
+    with pytest.raises(RuntimeError):
+        client.chat.completions.create(model="gpt-4o-mini", messages=[], fail=True)
+    pulse_sdk.flush_buffer()
+    state.flush_metrics()
+
+    assert transport.traces == []
+    by_status = {rollup["status"]: rollup for rollup in transport.metrics}
+    ok = by_status["success"]
+    assert (ok["count"], ok["input_tokens"], ok["output_tokens"]) == (50, 5000, 500)
+    assert ok["tag"] == "/chat"
+    assert ok["cost_cents"] == pytest.approx(50 * (100 * 15 + 10 * 60) / 1e6)
+    assert ok["latency_ms"]["count"] == 50
+    assert by_status["error"]["errors"] == 1
+
+
+def test_failed_metric_upload_is_retried_with_the_next_window():
+    from pulse_sdk import init_pulse, state
+
+    class Flaky(InMemoryTransport):
+        fail = True
+
+        def send_metrics(self, rollups):
+            if self.fail:
+                raise TransportError("Pulse SDK: unavailable", retryable=True)
+            super().send_metrics(rollups)
+
+    transport = Flaky()
+    init_pulse({"api_key": "pulse_sk_test", "transport": transport, "metrics": True})
+    state.get_metrics().record("openai", "gpt-4o", 10.0)
+    state.flush_metrics()
+    state._circuit_breaker.record_success()
+    state._retry_policy.reset()
+    transport.fail = False
+    state.get_metrics().record("openai", "gpt-4o", 30.0)
+    state.flush_metrics()
+
+    (rollup,) = transport.metrics
+    assert rollup["count"] == 2
+
+
+def test_metrics_require_a_transport_with_send_metrics():
+    class TracesOnly(Transport):
+        def send(self, traces):
+            pass
+
+    with pytest.raises(ConfigError, match="send_metrics"):
+        load_config(
+            {"api_key": "pulse_sk_test", "transport": TracesOnly(), "metrics": True}
+        )
+    load_config({"api_key": "pulse_sk_test", "transport": TracesOnly()})
+
+
+def test_reconfiguring_flushes_and_replaces_the_aggregator():
+    from pulse_sdk import init_pulse, state
+
+    transport = InMemoryTransport()
+    init_pulse({"api_key": "pulse_sk_test", "transport": transport, "metrics": True})
+    state.get_metrics().record("openai", "gpt-4o", 10.0)
+
+    init_pulse(
+        {
+            "api_key": "pulse_sk_test",
+            "transport": transport,
+            "metrics": True,
+            "metrics_max_series": 5,
+        }
+    )
+    assert [rollup["count"] for rollup in transport.metrics] == [1]
+    assert state.get_metrics().max_series == 5
+
+    init_pulse({"api_key": "pulse_sk_test", "transport": transport})
+    assert state.get_metrics() is None
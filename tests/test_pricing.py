@@ -0,0 +1,141 @@
+import json
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from pulse_sdk.config import ConfigError, load_config
+from pulse_sdk.normalize import normalize_anthropic_response, normalize_openai_response
+from pulse_sdk.pricing import PricingIndex, calculate_cost
+from pulse_sdk.trace import response_cost
+
+
+@pytest.mark.parametrize(
+    "model, expected",
+    [
+        ("gpt-4o-mini", "gpt-4o-mini"),
+        ("gpt-4o-mini-2025-01-31", "gpt-4o-mini"),
+        ("openai/gpt-4.1-mini", "gpt-4.1-mini"),
+        ("GPT-4o", "gpt-4o"),
+        ("anthropic/claude-3.5-sonnet:beta", "claude-3-5-sonnet-20241022"),
+        ("claude-sonnet-4-5", "claude-sonnet-4-5-20250929"),
+        ("claude-haiku-4-5-latest", "claude-haiku-4-5-20251001"),
+        ("o3-mini-2025-01-31", "o3-mini"),
+    ],
+)
+def test_model_strings_resolve_by_normalized_name_and_family(model, expected):
+    index = PricingIndex()
+    resolved = index.resolve(model)
+    assert resolved is not None
+    assert resolved["input"] == index.resolve(expected)["input"]
+    assert resolved["output"] == index.resolve(expected)["output"]
+
+
+def test_unknown_models_are_cached_as_misses():
+    index = PricingIndex(cache_size=8)
+
+    for i in range(100):
+        assert index.resolve(f"custom-model-{i}") is None
+
+    assert len(index._cache) <= 8
+
+
+def test_cache_tokens_are_priced_separately():
+    # gpt-4o: 250 cents/M input, cached input at half price.
+    assert calculate_cost("gpt-4o", 1_000_000, 0) == 250
+    assert calculate_cost("gpt-4o", 1_000_000, 0, cache_read_tokens=800_000) == 150
+    # Claude: cache reads at 10% and cache writes at 125% of input.
+    assert calculate_cost(
+        "claude-sonnet-4-5", 1_000_000, 0, 500_000, 500_000
+    ) == pytest.approx(15 + 187.5)
+    # Anthropic reports cache tokens on top of input_tokens.
+    assert calculate_cost(
+        "claude-sonnet-4-5", 0, 0, 500_000, 500_000, cache_in_input=False
+    ) == pytest.approx(15 + 187.5)
+
+
+@pytest.mark.parametrize("model", ["gpt-5-pro", "o1-pro-2025-03-19", "o3-pro"])
+def test_pro_models_get_no_cached_input_discount(model):
+    index = PricingIndex()
+    input_price = index.resolve(model)["input"]
+
+    assert index.cost(model, 1_000_000, 0, cache_read_tokens=1_000_000) == input_price
+
+
+def test_cache_ratios_follow_the_entry_an_alias_resolves_to():
+    index = PricingIndex(
+        pricing={"o1-pro": {"input": 1800, "output": 7200}},
+        aliases={"o1-deluxe": "o1-pro"},
+    )
+
+    assert index.resolve("o1-deluxe")["cached_input"] == 1800
+
+
+def test_pricing_file_overrides_and_reloads(tmp_path):
+    path = tmp_path / "pricing.json"
+    path.write_text(
+        json.dumps(
+            {
+                "models": {"acme-large": {"input": 100, "output": 200}},
+                "aliases": {"acme": "acme-large"},
+            }
+        )
+    )
+    index = PricingIndex(pricing_file=str(path), reload_interval=0)
+    assert index.cost("acme-large-2025-06-01", 1_000_000, 0) == 100
+    assert index.cost("acme", 0, 1_000_000) == 200
+
+    path.write_text(json.dumps({"models": {"acme-large": {"input": 1, "output": 2}}}))
+    os.utime(path, (1, 1))
+    assert index.cost("acme-large", 1_000_000, 0) == 1
+
+    path.write_text("not json")
+    os.utime(path, (2, 2))
+    assert index.cost("acme-large", 1_000_000, 0) == 1  # previous prices kept
+
+
+def test_invalid_pricing_file_is_a_config_error(tmp_path):
+    path = tmp_path / "pricing.json"
+    path.write_text(json.dumps({"models": {"acme": {"input": "cheap"}}}))
+
+    with pytest.raises(ConfigError):
+        load_config({"api_key": "pulse_sk_test", "pricing_file": str(path)})
+
+
+def test_normalizers_report_cache_tokens():
+    openai = normalize_openai_response(
+        SimpleNamespace(
+            id="chatcmpl-1",
+            model="gpt-4o",
+            choices=[],
+            usage=SimpleNamespace(
+                prompt_tokens=1000,
+                completion_tokens=10,
+                prompt_tokens_details=SimpleNamespace(cached_tokens=800),
+            ),
+        )
+    )
+    anthropic = normalize_anthropic_response(
+        SimpleNamespace(
+            model="claude-sonnet-4-5",
+            content=[],
+            usage=SimpleNamespace(
+                input_tokens=100,
+                output_tokens=10,
+                cache_read_input_tokens=800,
+                cache_creation_input_tokens=100,
+            ),
+            stop_reason="end_turn",
+        )
+    )
+
+    assert (openai.input_tokens, openai.cache_read_tokens) == (1000, 800)
+    assert (
+        anthropic.input_tokens,
+        anthropic.cache_read_tokens,
+        anthropic.cache_write_tokens,
+    ) == (100, 800, 100)
+    # 100 uncached + 800 read at 10% + 100 written at 125% of $3/M.
+    assert response_cost(anthropic) == pytest.approx(
+        (100 + 80 + 125) * 300 / 1_000_000 + 10 * 1500 / 1_000_000
+    )
@@ -0,0 +1,321 @@
+import asyncio
+import gc
+import time
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("openai")
+pytest.importorskip("anthropic")
+
+import pulse_sdk
+from pulse_sdk import InMemoryTransport, Provider, init_pulse, observe, state
+
+
+@pytest.fixture
+def transport():
+    transport = InMemoryTransport()
+    init_pulse(
+        {"api_key": "pulse_sk_test", "transport": transport, "flush_interval": 60_000}
+    )
+    return transport
+
+
+def test_sync_openai_call_is_traced(transport, openai_response, openai_client):
+    client = observe(openai_client(lambda **kwargs: openai_response()), Provider.OPENAI)
+
+    client.chat.completions.create(
+        model="gpt-4o-mini",
+        messages=[{"role": "user", "content": "Hello"}],
+        pulse_session_id="session-1",
+    )
+    pulse_sdk.flush_buffer()
+
+    (trace,) = transport.traces
+    assert trace["output_text"] == "hi there"
+    assert trace["session_id"] == "session-1"
+    assert "pulse_session_id" not in trace["request_body"]
+
+
+def test_async_openai_call_records_awaited_latency(
+    transport, openai_response, openai_client
+):
+    async def create(**kwargs):
+        await asyncio.sleep(0.05)
+        return openai_response()
+
+    client = observe(openai_client(create), Provider.OPENAI)
+
+    async def run():
+        response = await client.chat.completions.create(
+            model="gpt-4o-mini", messages=[{"role": "user", "content": "Hello"}]
+        )
+        await pulse_sdk.aflush()
+        return response
+
+    response = asyncio.run(run())
+
+    assert response.choices[0].message.content == "hi there"
+    (trace,) = transport.traces
+    assert trace["status"] == "success"
+    assert trace["output_text"] == "hi there"
+    assert trace["latency_ms"] >= 50
+
+
+def test_async_anthropic_errors_are_traced(transport, anthropic_client):
+    async def create(**kwargs):
+        raise RuntimeError("boom")
+
+    client = observe(anthropic_client(create), Provider.ANTHROPIC)
+
+    async def run():
+        with pytest.raises(RuntimeError):
+            await client.messages.create(model="claude-3-5-haiku", max_tokens=10)
+        await pulse_sdk.aflush()
+
+    asyncio.run(run())
+
+    (trace,) = transport.traces
+    assert trace["status"] == "error"
+    assert trace["error"] == {"name": "RuntimeError", "message": "boom"}
+
+
+def test_aflush_does_not_block_the_event_loop(
+    transport, anthropic_response, anthropic_client
+):
+    class SlowTransport(InMemoryTransport):
+        def send(self, traces):
+            time.sleep(0.3)
+            super().send(traces)
+
+    state.set_transport(SlowTransport())
+    client = observe(
+        anthropic_client(lambda **kwargs: anthropic_response()), Provider.ANTHROPIC
+    )
+    client.messages.create(model="claude-3-5-haiku", max_tokens=10)
+
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        await pulse_sdk.aflush()
+        task.cancel()
+        return ticks
+
+    assert asyncio.run(run()) >= 10
+
+
+def openai_chunks(texts, usage=True):
+    for index, text in enumerate(texts):
+        last = index == len(texts) - 1
+        yield SimpleNamespace(
+            id="chatcmpl-1",
+            model="gpt-4o-mini-2024-07-18",
+            choices=[
+                SimpleNamespace(
+                    index=0,
+                    delta=SimpleNamespace(content=text),
+                    finish_reason="stop" if last else None,
+                )
+            ],
+            usage=None,
+        )
+    if usage:
+        yield SimpleNamespace(
+            id="chatcmpl-1",
+            model="gpt-4o-mini-2024-07-18",
+            choices=[],
+            usage=SimpleNamespace(prompt_tokens=12, completion_tokens=len(texts)),
+        )
+
+
+class FakeStream:
+    def __init__(self, items, delay: float = 0.0):
+        self._items = iter(items)
+        self.delay = delay
+        self.closed = False
+
+    def __iter__(self):
+        for item in self._items:
+            time.sleep(self.delay)
+            yield item
+
+    def close(self):
+        self.closed = True
+
+
+class FakeAsyncStream:
+    def __init__(self, items):
+        self._items = list(items)
+        self.closed = False
+
+    async def __aiter__(self):
+        for item in self._items:
+            await asyncio.sleep(0.01)
+            yield item
+
+    async def close(self):
+        self.closed = True
+
+
+def test_openai_stream_is_traced_once_when_exhausted(transport, openai_client):
+    stream = FakeStream(openai_chunks(["Hel", "lo", "!"]), delay=0.02)
+    client = observe(openai_client(lambda **kwargs: stream), Provider.OPENAI)
+
+    result = client.chat.completions.create(
+        model="gpt-4o-mini", messages=[], stream=True
+    )
+    pulse_sdk.flush_buffer()
+    assert transport.traces == []
+
+    texts = [chunk.choices[0].delta.content for chunk in result if chunk.choices]
+    result.close()
+    pulse_sdk.flush_buffer()
+
+    assert texts == ["Hel", "lo", "!"]
+    (trace,) = transport.traces
+    assert trace["output_text"] == "Hello!"
+    assert trace["input_tokens"] == 12
+    assert trace["output_tokens"] == 3
+    assert trace["finish_reason"] == "stop"
+    assert 20 <= trace["time_to_first_token_ms"] < trace["latency_ms"]
+    assert trace["latency_ms"] >= 60
+
+
+def test_stream_closed_early_emits_partial_trace(transport, openai_client):
+    stream = FakeStream(openai_chunks(["a", "b", "c"], usage=False))
+    client = observe(openai_client(lambda **kwargs: stream), Provider.OPENAI)
+
+    with client.chat.completions.create(
+        model="gpt-4o-mini", messages=[], stream=True
+    ) as result:
+        next(result)
+    pulse_sdk.flush_buffer()
+
+    assert stream.closed
+    (trace,) = transport.traces
+    assert trace["status"] == "success"
+    assert trace["output_text"] == "a"
+    assert trace["input_tokens"] is None
+
+
+def test_abandoned_stream_is_traced_when_collected(transport, openai_client):
+    stream = FakeStream(openai_chunks(["a", "b", "c"]))
+    client = observe(openai_client(lambda **kwargs: stream), Provider.OPENAI)
+
+    for chunk in client.chat.completions.create(
+        model="gpt-4o-mini", messages=[], stream=True
+    ):
+        break  # no close(): the proxy is dropped with the loop
+    gc.collect()
+    pulse_sdk.flush_buffer()
+
+    (trace,) = transport.traces
+    assert trace["status"] == "error"
+    assert trace["error"]["name"] == "StreamAbandoned"
+
+
+def test_interrupted_stream_is_traced(transport, openai_client):
+    def interrupted():
+        yield from openai_chunks(["a"], usage=False)
+        raise KeyboardInterrupt
+
+    client = observe(
+        openai_client(lambda **kwargs: FakeStream(interrupted())), Provider.OPENAI
+    )
+    result = client.chat.completions.create(
+        model="gpt-4o-mini", messages=[], stream=True
+    )
+
+    with pytest.raises(KeyboardInterrupt):
+        list(result)
+    pulse_sdk.flush_buffer()
+
+    (trace,) = transport.traces
+    assert trace["error"]["name"] == "KeyboardInterrupt"
+
+
+def test_cancelled_async_stream_is_traced(transport, openai_client):
+    async def create(**kwargs):
+        return FakeAsyncStream(openai_chunks(["a", "b", "c", "d"]))
+
+    client = observe(openai_client(create), Provider.OPENAI)
+
+    async def consume():
+        stream = await client.chat.completions.create(
+            model="gpt-4o-mini", messages=[], stream=True
+        )
+        async for _ in stream:
+            pass
+
+    async def run():
+        task = asyncio.create_task(consume())
+        await asyncio.sleep(0.025)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await pulse_sdk.aflush()
+
+    asyncio.run(run())
+
+    (trace,) = transport.traces
+    assert trace["status"] == "error"
+    assert trace["error"]["name"] == "CancelledError"
+
+
+def test_async_anthropic_stream_is_traced(transport, anthropic_client):
+    events = [
+        SimpleNamespace(
+            type="message_start",
+            message=SimpleNamespace(
+                id="msg_1",
+                model="claude-3-5-haiku-20241022",
+                usage=SimpleNamespace(input_tokens=9, output_tokens=1),
+            ),
+        ),
+        SimpleNamespace(
+            type="content_block_delta",
+            delta=SimpleNamespace(type="text_delta", text="Hi "),
+        ),
+        SimpleNamespace(
+            type="content_block_delta",
+            delta=SimpleNamespace(type="text_delta", text="there"),
+        ),
+        SimpleNamespace(
+            type="message_delta",
+            delta=SimpleNamespace(stop_reason="end_turn"),
+            usage=SimpleNamespace(output_tokens=4),
+        ),
+        SimpleNamespace(type="message_stop"),
+    ]
+
+    async def create(**kwargs):
+        return FakeAsyncStream(events)
+
+    client = observe(anthropic_client(create), Provider.ANTHROPIC)
+
+    async def run():
+        stream = await client.messages.create(
+            model="claude-3-5-haiku", max_tokens=10, stream=True
+        )
+        async with stream:
+            received = [event.type async for event in stream]
+        await pulse_sdk.aflush()
+        return received
+
+    received = asyncio.run(run())
+
+    assert received[-1] == "message_stop"
+    (trace,) = transport.traces
+    assert trace["output_text"] == "Hi there"
+    assert trace["input_tokens"] == 9
+    assert trace["output_tokens"] == 4
+    assert trace["finish_reason"] == "stop"
+    assert trace["provider_request_id"] == "msg_1"
+    assert trace["time_to_first_token_ms"] <= trace["latency_ms"]
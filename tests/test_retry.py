@@ -0,0 +1,146 @@
+import time
+
+import pytest
+
+from pulse_sdk import state
+from pulse_sdk.retry import MAX_RETRY_AFTER, CircuitBreaker, RetryPolicy
+from pulse_sdk.transport import (
+    HttpTransport,
+    InMemoryTransport,
+    TransportError,
+    parse_retry_after,
+)
+
+
+class FlakyTransport(InMemoryTransport):
+    def __init__(self, failures: int, error: Exception) -> None:
+        super().__init__()
+        self.failures = failures
+        self.error = error
+        self.attempts = 0
+
+    def send(self, traces):
+        self.attempts += 1
+        if self.attempts <= self.failures:
+            raise self.error
+        super().send(traces)
+
+
+def test_http_transport_reports_retry_after(fake_ingestion):
+    fake_ingestion.responses.append((503, {"Retry-After": "7"}))
+    fake_ingestion.responses.append((400, {}))
+    transport = HttpTransport(fake_ingestion.url, "pulse_sk_test")
+
+    with pytest.raises(TransportError) as unavailable:
+        transport.send([{"trace_id": "1"}])
+    with pytest.raises(TransportError) as bad_request:
+        transport.send([{"trace_id": "1"}])
+
+    assert unavailable.value.retryable and unavailable.value.retry_after == 7
+    assert not bad_request.value.retryable
+
+
+def test_parse_retry_after_accepts_http_dates():
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0
+    assert parse_retry_after("garbage") is None
+
+
+def test_failed_batches_are_requeued_and_retried(configure):
+    transport = FlakyTransport(2, TransportError("unavailable", status_code=503))
+    configure(transport)
+    state.add_to_buffer({"trace_id": "1"})
+
+    for _ in range(3):
+        state.flush_buffer()
+        time.sleep(0.002)
+
+    assert transport.attempts == 3
+    assert transport.traces == [{"trace_id": "1"}]
+    assert state.get_buffer_stats()["buffered"] == 0
+
+
+def test_retries_are_bounded(configure):
+    transport = FlakyTransport(100, ConnectionError("down"))
+    configure(transport, max_retries=2, circuit_failure_threshold=100)
+    state.add_to_buffer({"trace_id": "1"})
+
+    for _ in range(5):
+        state.flush_buffer()
+        time.sleep(0.002)
+
+    assert transport.attempts == 3
+    assert state.get_buffer_stats()["dropped"]["retries_exhausted"] == 1
+
+
+def test_non_retryable_errors_drop_the_batch(configure):
+    transport = FlakyTransport(1, TransportError("bad", retryable=False))
+    configure(transport)
+    state.add_to_buffer({"trace_id": "1"})
+
+    state.flush_buffer()
+
+    stats = state.get_buffer_stats()
+    assert stats["buffered"] == 0
+    assert stats["dropped"]["rejected"] == 1
+
+
+def test_circuit_opens_and_probes_after_reset_timeout():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=50)
+
+    breaker.record_failure()
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow_request()
+
+    time.sleep(0.06)
+    assert breaker.allow_request()
+    assert not breaker.allow_request()  # a single probe at a time
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    time.sleep(0.06)
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_open_circuit_skips_sends_without_waiting(configure):
+    transport = FlakyTransport(100, TransportError("unavailable", status_code=503))
+    configure(transport, circuit_failure_threshold=1, circuit_reset_timeout=60_000)
+    state.add_to_buffer({"trace_id": "1"})
+
+    state.flush_buffer()
+    start = time.perf_counter()
+    for _ in range(10):
+        state.flush_buffer()
+
+    assert transport.attempts == 1
+    assert time.perf_counter() - start < 0.05
+    assert state.get_buffer_stats()["circuit"] == "open"
+    assert state.get_buffer_stats()["buffered"] == 1
+
+
+def test_backoff_honours_retry_after():
+    policy = RetryPolicy(base_delay=10, max_delay=60_000)
+    assert policy.schedule(1, retry_after=5) >= 5
+    assert 4.9 < policy.remaining() <= 5
+    policy.reset()
+    assert policy.remaining() == 0
+
+
+def test_retry_after_beyond_max_delay_is_honoured():
+    policy = RetryPolicy(base_delay=10, max_delay=30_000)
+    assert policy.schedule(1, retry_after=120) == 120
+    assert policy.schedule(1, retry_after=1e9) == MAX_RETRY_AFTER
+
+
+def test_flush_worker_retries_after_backoff(configure, wait_for):
+    transport = FlakyTransport(2, TransportError("unavailable", status_code=503))
+    configure(transport, batch_size=1, retry_base_delay=20, retry_max_delay=50)
+    state.start_flush_worker()
+
+    state.add_to_buffer({"trace_id": "1"})
+
+    assert wait_for(lambda: transport.traces, timeout=2.0)
+    assert transport.traces == [{"trace_id": "1"}]
+    assert transport.attempts == 3
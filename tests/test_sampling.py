@@ -0,0 +1,116 @@
+import pytest
+
+pytest.importorskip("openai")
+pytest.importorskip("anthropic")
+
+import pulse_sdk
+from pulse_sdk import Provider, observe
+from pulse_sdk.config import ConfigError, load_config
+from pulse_sdk.sampling import SamplingPolicy
+
+
+def test_rates_resolve_by_model_prefix_then_provider():
+    policy = SamplingPolicy(0.5, {"openai": 0.2}, {"gpt-4o": 0.1, "gpt-4o-mini": 0.01})
+
+    assert policy.head_rate("openai", "gpt-4o-mini-2024-07-18") == 0.01
+    assert policy.head_rate("openai", "gpt-4o-2024-08-06") == 0.1
+    assert policy.head_rate("openai", "gpt-3.5-turbo") == 0.2
+    assert policy.head_rate("anthropic", "claude-3-5-haiku") == 0.5
+
+
+def test_sessions_are_sampled_whole():
+    policy = SamplingPolicy(0.5)
+
+    for session in (f"session-{i}" for i in range(50)):
+        decisions = {policy.head_sample("openai", "m", session)[0] for _ in range(5)}
+        assert len(decisions) == 1
+
+
+def test_sampled_out_calls_are_not_copied_or_traced(
+    openai_response, openai_client, configure
+):
+    transport = configure(sample_rate=0.0)
+    messages = [{"role": "user", "content": "Hello"}]
+    seen = []
+
+    def create(**kwargs):
+        seen.append(kwargs["messages"])
+        return openai_response()
+
+    client = observe(openai_client(create), Provider.OPENAI)
+    client.chat.completions.create(model="gpt-4o-mini", messages=messages)
+    pulse_sdk.flush_buffer()
+
+    assert transport.traces == []
+    assert seen[0] is messages
+
+
+def test_head_sampled_traces_record_rate(openai_response, openai_client, configure):
+    transport = configure(sample_rate=0.5)
+    client = observe(openai_client(lambda **kwargs: openai_response()), Provider.OPENAI)
+
+    for i in range(400):
+        client.chat.completions.create(
+            model="gpt-4o-mini", messages=[], pulse_session_id=f"s-{i}"
+        )
+    pulse_sdk.flush_buffer()
+
+    traces = transport.traces
+    assert 120 < len(traces) < 280
+    assert {(t["sample_rate"], t["sample_reason"]) for t in traces} == {(0.5, "head")}
+
+
+def test_tail_rules_keep_errors_and_expensive_calls(
+    openai_response, openai_client, configure
+):
+    transport = configure(sample_rate=0.0, keep_cost_cents=1.0)
+
+    def create(**kwargs):
+        if kwargs.get("fail"):
+            raise RuntimeError("boom")
+        return openai_response(prompt_tokens=kwargs["prompt_tokens"])
+
+    client = observe(openai_client(create), Provider.OPENAI)
+    client.chat.completions.create(model="gpt-4o-mini", messages=[], prompt_tokens=10)
+    client.chat.completions.create(
+        model="gpt-4o-mini", messages=[], prompt_tokens=10_000_000
+    )
+    with pytest.raises(RuntimeError):
+        client.chat.completions.create(model="gpt-4o-mini", messages=[], fail=True)
+    pulse_sdk.flush_buffer()
+
+    reasons = sorted(t["sample_reason"] for t in transport.traces)
+    assert reasons == ["error", "expensive"]
+    # Tail-kept traces stand only for themselves; never a rate of 0.
+    assert all(t["sample_rate"] == 1.0 for t in transport.traces)
+
+
+def test_tail_rules_win_over_head_sampling(openai_response, openai_client, configure):
+    transport = configure(sample_rate=0.1)
+
+    def create(**kwargs):
+        if kwargs.get("fail"):
+            raise RuntimeError("boom")
+        return openai_response()
+
+    client = observe(openai_client(create), Provider.OPENAI)
+    for i in range(2_000):
+        with pytest.raises(RuntimeError):
+            client.chat.completions.create(model="gpt-4o-mini", messages=[], fail=True)
+        client.chat.completions.create(model="gpt-4o-mini", messages=[])
+    pulse_sdk.flush_buffer()
+
+    errors = [t for t in transport.traces if "error" in t]
+    successes = [t for t in transport.traces if "error" not in t]
+    assert len(errors) == 2_000
+    assert {(t["sample_rate"], t["sample_reason"]) for t in errors} == {(1.0, "error")}
+    assert {(t["sample_rate"], t["sample_reason"]) for t in successes} == {
+        (0.1, "head")
+    }
+    # Re-weighting by 1 / sample_rate counts every error exactly once.
+    assert sum(1 / t["sample_rate"] for t in errors) == 2_000
+
+
+def test_sample_rates_are_validated():
+    with pytest.raises(ConfigError):
+        load_config({"api_key": "pulse_sk_test", "model_sample_rates": {"gpt-4o": 2}})
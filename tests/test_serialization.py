@@ -0,0 +1,165 @@
+import dataclasses
+import datetime
+import enum
+import json
+import time
+
+import pytest
+
+from pulse_sdk import Provider, init_pulse, state
+from pulse_sdk.serialization import Serializer, orjson_available
+from pulse_sdk.trace import build_error_record, build_record
+from pulse_sdk.transport import HttpTransport
+from pulse_sdk.types import NormalizedResponse
+
+BACKENDS = [
+    "json",
+    pytest.param(
+        "orjson",
+        marks=pytest.mark.skipif(not orjson_available(), reason="orjson not installed"),
+    ),
+]
+
+
+class Color(enum.Enum):
+    RED = "red"
+
+
+@dataclasses.dataclass
+class Point:
+    x: int
+    y: int
+
+
+class FakeModel:
+    def model_dump(self, mode="python"):
+        return {"mode": mode}
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_non_json_metadata_is_encoded(backend):
+    trace = {
+        "trace_id": "1",
+        "metadata": {
+            "color": Color.RED,
+            "at": datetime.datetime(2024, 1, 2, 3, 4, 5),
+            "point": Point(1, 2),
+            "model": FakeModel(),
+            "raw": b"\x00\x01",
+            "tags": {"a"},
+        },
+    }
+
+    (decoded,) = json.loads(Serializer(backend).encode_batch([trace]))
+
+    assert decoded["metadata"] == {
+        "color": "red",
+        "at": "2024-01-02T03:04:05",
+        "point": {"x": 1, "y": 2},
+        "model": {"mode": "json"},
+        "raw": "[binary data, 2 bytes]",
+        "tags": ["a"],
+    }
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_unencodable_trace_is_dropped_alone(backend):
+    circular = {}
+    circular["self"] = circular
+    serializer = Serializer(backend)
+
+    batch = serializer.encode_batch(
+        [{"trace_id": "1"}, {"trace_id": "2", "metadata": circular}]
+    )
+
+    assert json.loads(batch) == [{"trace_id": "1"}]
+    assert serializer.dropped == 1
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_records_encode_to_the_wire_shape(backend):
+    request = {"model": "gpt-4o-mini", "messages": [{"role": "user", "content": "hi"}]}
+    response = NormalizedResponse(
+        model="gpt-4o-mini-2024-07-18",
+        content="hello",
+        input_tokens=3,
+        output_tokens=1,
+        finish_reason="stop",
+        provider_request_id="chatcmpl-1",
+    )
+    records = [
+        build_record(request, response, Provider.OPENAI, 12.4, session_id="s"),
+        build_error_record(request, RuntimeError("boom"), Provider.OPENAI, 3.0),
+    ]
+    serializer = Serializer(backend)
+
+    decoded = json.loads(serializer.encode_batch(records))
+
+    assert decoded == [record.to_wire() for record in records]
+    assert list(decoded[0]) == list(records[0].to_wire())
+    assert decoded[0]["response_body"]["content"] == "hello"
+    assert decoded[1]["error"] == {"name": "RuntimeError", "message": "boom"}
+
+
+def test_pre_encoded_bytes_are_reused():
+    serializer = Serializer("json")
+    trace = {"trace_id": "1"}
+    serializer.pre_encode([trace])
+    trace["trace_id"] = "changed"  # not seen: the cached bytes win
+
+    assert json.loads(serializer.encode_batch([trace])) == [{"trace_id": "1"}]
+    assert json.loads(serializer.encode_batch([trace])) == [{"trace_id": "changed"}]
+
+
+def test_worker_encodes_traces_as_they_arrive(fake_ingestion):
+    init_pulse(
+        {
+            "api_key": "pulse_sk_test",
+            "api_url": fake_ingestion.url,
+            "flush_interval": 60_000,
+            "encode_in_background": True,
+        }
+    )
+    serializer = state.get_transport().serializer
+    assert isinstance(state.get_transport(), HttpTransport)
+
+    state.add_to_buffer({"trace_id": "1"})
+    deadline = time.monotonic() + 2
+    while not serializer._encoded and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert len(serializer._encoded) == 1
+    assert len(fake_ingestion.requests) == 0
+    state.flush_buffer()
+    assert json.loads(fake_ingestion.requests[-1][2]) == [{"trace_id": "1"}]
+    assert serializer._encoded == {}
+
+
+def test_background_encoding_only_walks_new_traces(fake_ingestion, monkeypatch):
+    init_pulse(
+        {
+            "api_key": "pulse_sk_test",
+            "api_url": fake_ingestion.url,
+            "flush_interval": 60_000,
+            "encode_in_background": True,
+        }
+    )
+    state.stop_flush_worker()
+    serializer = state.get_transport().serializer
+    encoded = []
+    dumps = serializer.dumps
+    monkeypatch.setattr(
+        serializer, "dumps", lambda value: encoded.append(value) or dumps(value)
+    )
+    for index in range(500):
+        state.add_to_buffer({"trace_id": str(index)})
+    state._pre_encode()
+    assert len(encoded) == 500
+
+    monkeypatch.setattr(state._buffer, "peek", pytest.fail)
+    state.add_to_buffer({"trace_id": "new"})
+    state._pre_encode()
+    state._pre_encode()
+
+    assert [value["trace_id"] for value in encoded[500:]] == ["new"]
+    assert serializer.cached == 501
@@ -0,0 +1,136 @@
+import os
+import threading
+import time
+
+from pulse_sdk import init_pulse, shutdown, state
+from pulse_sdk.spool import Spool, read_segment
+from pulse_sdk.transport import InMemoryTransport, TransportError
+
+
+class DownTransport(InMemoryTransport):
+    def send(self, traces):
+        raise TransportError("Pulse SDK: ingestion unavailable", retryable=True)
+
+
+def _trace(i):
+    return {"trace_id": str(i), "request": {"messages": [{"content": "x" * 64}]}}
+
+
+def test_spool_round_trips_traces(tmp_path):
+    spool = Spool(str(tmp_path))
+    spool.append([_trace(1), _trace(2)])
+    spool.append([_trace(3)])
+
+    assert spool.has_pending()
+    traces = spool.pop_segment()
+
+    assert [t["trace_id"] for t in traces] == ["1", "2", "3"]
+    assert not spool.has_pending()
+    assert os.listdir(tmp_path) == []
+
+
+def test_torn_tail_is_ignored(tmp_path):
+    spool = Spool(str(tmp_path))
+    spool.append([_trace(1), _trace(2)])
+    spool.close()
+    (path,) = [os.path.join(tmp_path, name) for name in os.listdir(tmp_path)]
+    with open(path, "r+b") as handle:
+        handle.truncate(os.path.getsize(path) - 5)
+
+    assert [t["trace_id"] for t in read_segment(path)] == ["1"]
+
+
+def test_oldest_segments_are_evicted_over_budget(tmp_path):
+    spool = Spool(str(tmp_path), max_bytes=2_000, segment_bytes=500)
+    for i in range(40):
+        spool.append([_trace(i)])
+
+    assert spool.size_bytes <= 2_000
+    assert spool.evicted_segments > 0
+    replayed = []
+    while spool.has_pending():
+        replayed.extend(t["trace_id"] for t in spool.pop_segment())
+    assert replayed[-1] == "39"
+
+
+def test_segments_survive_a_restart(tmp_path):
+    Spool(str(tmp_path)).append([_trace(1)])  # never closed, like a crash
+
+    spool = Spool(str(tmp_path))
+
+    assert [t["trace_id"] for t in spool.pop_segment()] == ["1"]
+
+
+def test_unsent_traces_are_replayed_after_restart(tmp_path):
+    config = {
+        "api_key": "pulse_sk_test",
+        "flush_interval": 60_000,
+        "spool_dir": str(tmp_path),
+        "max_retries": 0,
+    }
+    init_pulse({**config, "transport": DownTransport()})
+    for i in range(3):
+        state.add_to_buffer(_trace(i))
+    shutdown()
+
+    transport = InMemoryTransport()
+    init_pulse({**config, "transport": transport})
+    state.stop_flush_worker()
+    state._replay_spool()
+    state.flush_buffer()
+    shutdown()
+
+    assert sorted(t["trace_id"] for t in transport.traces) == ["0", "1", "2"]
+
+
+def test_overflow_is_spooled_by_the_worker_not_the_caller(tmp_path, monkeypatch):
+    appended_on = []
+    append = Spool.append
+
+    def recording_append(self, traces):
+        appended_on.append(threading.current_thread().name)
+        append(self, traces)
+
+    monkeypatch.setattr(Spool, "append", recording_append)
+    init_pulse(
+        {
+            "api_key": "pulse_sk_test",
+            "transport": DownTransport(),
+            "flush_interval": 60_000,
+            "spool_dir": str(tmp_path),
+            "max_buffer_size": 10,
+            "batch_size": 10,
+            "overflow_policy": "drop_oldest",
+        }
+    )
+    state.stop_flush_worker()
+    for i in range(15):
+        state.add_to_buffer(_trace(i))
+
+    assert appended_on == []  # nothing touched the disk on the caller's thread
+    assert len(state._spool_handoff) == 5
+
+    state.start_flush_worker()
+    deadline = time.monotonic() + 2
+    while state._spool_handoff and time.monotonic() < deadline:
+        state._wake_event.set()
+        time.sleep(0.01)
+
+    assert state.get_buffer_stats()["spooled"] == 5
+    assert appended_on and set(appended_on) == {"pulse-sdk-flush"}
+
+
+def test_reconfiguring_reopens_the_spool(tmp_path):
+    config = {"api_key": "pulse_sk_test", "transport": InMemoryTransport()}
+    init_pulse({**config, "spool_dir": str(tmp_path / "a")})
+    first = state.get_spool()
+    first.append([_trace(1)])
+
+    init_pulse({**config, "spool_dir": str(tmp_path / "b"), "blob_offload": True})
+    assert state.get_spool().directory == str(tmp_path / "b")
+    assert first._file is None  # sealed, so the trace can be replayed
+    assert state.get_blob_store().min_bytes == 4096
+
+    init_pulse({**config, "blob_offload": True, "blob_min_bytes": 512})
+    assert state.get_spool() is None
+    assert state.get_blob_store().min_bytes == 512
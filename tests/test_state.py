@@ -0,0 +1,125 @@
+import threading
+import time
+
+from pulse_sdk import state
+from pulse_sdk.buffer import TraceBuffer
+from pulse_sdk.config import load_config
+from pulse_sdk.transport import InMemoryTransport
+
+
+class SlowTransport(InMemoryTransport):
+    def __init__(self, delay: float) -> None:
+        super().__init__()
+        self.delay = delay
+        self.sender_threads = set()
+
+    def send(self, traces):
+        self.sender_threads.add(threading.current_thread().name)
+        time.sleep(self.delay)
+        super().send(traces)
+
+
+def _start(transport, **overrides):
+    config = {"api_key": "pulse_sk_test", "transport": transport, **overrides}
+    state.set_config(load_config(config))
+    state.start_flush_worker()
+
+
+def test_add_to_buffer_does_not_block_on_slow_ingestion(wait_for):
+    transport = SlowTransport(delay=0.5)
+    _start(transport, batch_size=1)
+
+    start = time.perf_counter()
+    for index in range(5):
+        state.add_to_buffer({"trace_id": str(index)})
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 0.1
+    assert wait_for(lambda: len(transport.traces) == 5)
+    assert transport.sender_threads == {"pulse-sdk-flush"}
+
+
+def test_flush_worker_wakes_when_batch_fills(wait_for):
+    transport = InMemoryTransport()
+    _start(transport, batch_size=2, flush_interval=60_000)
+
+    state.add_to_buffer({"trace_id": "a"})
+    time.sleep(0.1)
+    assert transport.traces == []
+
+    state.add_to_buffer({"trace_id": "b"})
+    assert wait_for(lambda: len(transport.traces) == 2, timeout=2.0)
+
+
+def test_buffer_drop_newest_and_drop_oldest():
+    newest = TraceBuffer(max_size=2, max_bytes=None, overflow_policy="drop_newest")
+    oldest = TraceBuffer(max_size=2, max_bytes=None, overflow_policy="drop_oldest")
+    for index in range(4):
+        newest.put({"trace_id": str(index)})
+        oldest.put({"trace_id": str(index)})
+
+    assert [t["trace_id"] for t in newest.drain()] == ["0", "1"]
+    assert [t["trace_id"] for t in oldest.drain()] == ["2", "3"]
+    assert newest.dropped["drop_newest"] == 2
+    assert oldest.dropped["drop_oldest"] == 2
+
+
+def test_buffer_peek_new_returns_each_arrival_once():
+    buffer = TraceBuffer(max_size=3, max_bytes=None, overflow_policy="drop_oldest")
+    for index in range(2):
+        buffer.put({"trace_id": str(index)})
+    assert [t["trace_id"] for t in buffer.peek_new()] == ["0", "1"]
+    assert buffer.peek_new() == []
+
+    for index in range(2, 6):
+        buffer.put({"trace_id": str(index)})
+    assert [t["trace_id"] for t in buffer.peek_new()] == ["3", "4", "5"]
+    assert len(buffer) == 3
+
+
+def test_buffer_is_bounded_by_estimated_bytes():
+    buffer = TraceBuffer(max_size=100, max_bytes=5_000, overflow_policy="drop_newest")
+    for index in range(10):
+        buffer.put({"trace_id": str(index), "output_text": "x" * 1_000})
+
+    assert len(buffer) == 4
+    assert buffer.size_bytes <= 5_000
+    assert buffer.dropped["drop_newest"] == 6
+
+
+def test_buffer_block_waits_for_room_then_gives_up():
+    buffer = TraceBuffer(
+        max_size=1, max_bytes=None, overflow_policy="block", block_timeout=50
+    )
+    buffer.put({"trace_id": "0"})
+
+    start = time.perf_counter()
+    assert buffer.put({"trace_id": "1"}) == -1
+    assert 0.04 <= time.perf_counter() - start < 1.0
+
+    threading.Timer(0.05, buffer.drain).start()
+    buffer.block_timeout = 2.0
+    assert buffer.put({"trace_id": "2"}) == 1
+
+
+def test_buffer_sample_keeps_a_uniform_subset():
+    buffer = TraceBuffer(max_size=100, max_bytes=None, overflow_policy="sample")
+    for index in range(1_000):
+        buffer.put({"trace_id": index})
+
+    kept = [trace["trace_id"] for trace in buffer.drain()]
+    assert len(kept) == 100
+    assert sum(1 for trace_id in kept if trace_id >= 500) > 25
+    assert buffer.dropped["sample"] == 900
+
+
+def test_overflow_is_reported_in_buffer_stats():
+    _start(InMemoryTransport(), batch_size=1, max_buffer_size=1, flush_interval=60_000)
+    state.stop_flush_worker()
+
+    for index in range(3):
+        state.add_to_buffer({"trace_id": str(index)})
+
+    stats = state.get_buffer_stats()
+    assert stats["buffered"] == 1
+    assert stats["dropped"]["drop_newest"] == 2
@@ -0,0 +1,149 @@
+import threading
+
+import pytest
+
+from pulse_sdk import get_stats, init_pulse, state
+from pulse_sdk.config import ConfigError, load_config
+from pulse_sdk.serialization import Serializer
+from pulse_sdk.transport import InMemoryTransport, TransportError
+
+
+class FailingTransport(InMemoryTransport):
+    def send(self, traces):
+        raise TransportError("ingestion unavailable", retryable=True)
+
+
+def test_stats_count_enqueued_and_sent_bytes(fake_ingestion):
+    init_pulse(
+        {
+            "api_key": "pulse_sk_test",
+            "api_url": fake_ingestion.url,
+            "batch_size": 20,
+            "flush_interval": 60_000,
+            "compression": "gzip",
+        }
+    )
+    for index in range(20):
+        state.add_to_buffer({"trace_id": str(index), "output_text": "hello " * 100})
+    state.flush_buffer()
+
+    stats = get_stats()
+    assert (stats["enqueued"], stats["sent"], stats["retried"]) == (20, 20, 0)
+    assert (stats["flushes"], stats["flush_failures"]) == (1, 0)
+    assert stats["flush_ms"]["count"] == 1
+    assert stats["wire_bytes"] == len(fake_ingestion.requests[-1][2])
+    assert stats["payload_bytes"] > stats["wire_bytes"]
+    assert stats["buffered"] == 0 and stats["dropped_total"] == 0
+
+
+def test_failed_flushes_count_retried_traces():
+    state.set_config(
+        load_config(
+            {
+                "api_key": "pulse_sk_test",
+                "transport": FailingTransport(),
+                "flush_interval": 60_000,
+                "retry_base_delay": 1,
+                "retry_max_delay": 1,
+            }
+        )
+    )
+    for index in range(3):
+        state.add_to_buffer({"trace_id": str(index)})
+    state.flush_buffer()
+
+    stats = get_stats()
+    assert (stats["sent"], stats["retried"]) == (0, 3)
+    assert (stats["flushes"], stats["flush_failures"]) == (1, 1)
+
+
+def test_unencodable_traces_count_as_dropped():
+    circular = {}
+    circular["self"] = circular
+    serializer = Serializer()
+    state.set_config(load_config({"api_key": "pulse_sk_test"}))
+
+    threads = [
+        threading.Thread(
+            target=serializer.encode_batch,
+            args=([{"trace_id": "1", "metadata": circular}] * 50,),
+        )
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = get_stats()
+    assert stats["unencodable"] == stats["dropped"]["unencodable"] == 200
+    assert stats["dropped_total"] == 200
+    assert serializer.dropped == 200
+
+
+def test_stats_callback_receives_periodic_snapshots():
+    received = []
+    called = threading.Event()
+
+    def callback(stats):
+        received.append(stats)
+        called.set()
+
+    init_pulse(
+        {
+            "api_key": "pulse_sk_test",
+            "transport": InMemoryTransport(),
+            "stats_callback": callback,
+            "stats_interval": 1000,
+        }
+    )
+    state.add_to_buffer({"trace_id": "1"})
+
+    assert called.wait(timeout=3)
+    assert received[0]["enqueued"] == 1
+    assert "overhead_us" in received[0] and "flush_ms" in received[0]
+
+
+def test_stats_options_are_validated():
+    with pytest.raises(ConfigError):
+        load_config({"api_key": "pulse_sk_test", "stats_callback": "print"})
+    with pytest.raises(ConfigError):
+        load_config({"api_key": "pulse_sk_test", "stats_interval": 10})
+
+
+pytest.importorskip("openai")
+
+
+def test_wrapped_calls_record_sdk_overhead():
+    from types import SimpleNamespace
+
+    from pulse_sdk import Provider, observe
+
+    init_pulse(
+        {
+            "api_key": "pulse_sk_test",
+            "transport": InMemoryTransport(),
+            "flush_interval": 60_000,
+        }
+    )
+    response = SimpleNamespace(
+        id="chatcmpl-1",
+        model="gpt-4o-mini",
+        choices=[
+            SimpleNamespace(message=SimpleNamespace(content="hi"), finish_reason="stop")
+        ],
+        usage=SimpleNamespace(prompt_tokens=3, completion_tokens=1),
+    )
+    client = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=lambda **_: response))
+    )
+    client = observe(client, Provider.OPENAI)
+    for _ in range(5):
+        client.chat.completions.create(model="gpt-4o-mini", messages=[])
+
+    stats = get_stats(reset=True)
+    assert stats["calls"] == 5
+    assert stats["overhead_us"]["count"] == 5
+    assert stats["overhead_us"]["p50"] > 0
+    assert stats["overhead_ms_total"] > 0
+    assert get_stats()["overhead_us"]["count"] == 0
@@ -0,0 +1,69 @@
+import gzip
+import json
+
+import pytest
+
+from pulse_sdk.compression import Compressor
+from pulse_sdk.config import ConfigError, load_config
+from pulse_sdk.transport import HttpTransport, InMemoryTransport, create_transport
+
+
+def test_http_transport_reuses_prewarmed_connection(fake_ingestion):
+    fake = fake_ingestion
+    transport = HttpTransport(fake.url, "pulse_sk_test")
+    transport.prewarm()
+    for index in range(5):
+        transport.send([{"trace_id": str(index)}])
+    transport.close()
+
+    assert len(fake.requests) == 5
+    assert len(fake.client_ports) == 1
+    path, headers, body = fake.requests[0]
+    assert path == "/v1/traces/async"
+    assert headers["Authorization"] == "Bearer pulse_sk_test"
+    assert json.loads(body) == [{"trace_id": "0"}]
+
+
+def test_create_transport_prefers_configured_instance():
+    transport = InMemoryTransport()
+    config = load_config({"api_key": "pulse_sk_test", "transport": transport})
+    assert create_transport(config) is transport
+
+
+def test_pool_limits_are_validated():
+    with pytest.raises(ConfigError):
+        load_config({"api_key": "pulse_sk_test", "pool_maxsize": 0})
+
+
+@pytest.mark.parametrize("codec", ["gzip", "zstd"])
+def test_http_transport_compresses_large_batches(fake_ingestion, codec):
+    if codec == "zstd":
+        zstandard = pytest.importorskip("zstandard")
+    compressor = Compressor(codec, min_bytes=256)
+    transport = HttpTransport(
+        fake_ingestion.url, "pulse_sk_test", compressor=compressor
+    )
+    large = [{"trace_id": "big", "output_text": "hello world " * 200}]
+    transport.send([{"trace_id": "small"}])
+    transport.send(large)
+    transport.close()
+
+    (_, small_headers, small_body), (_, headers, body) = fake_ingestion.requests
+    assert "Content-Encoding" not in small_headers
+    assert json.loads(small_body) == [{"trace_id": "small"}]
+    assert headers["Content-Encoding"] == codec
+    if codec == "gzip":
+        decoded = gzip.decompress(body)
+    else:
+        decoded = zstandard.ZstdDecompressor().decompress(body)
+    assert json.loads(decoded) == large
+    assert len(body) < len(decoded)
+
+
+def test_compression_options_are_validated():
+    with pytest.raises(ConfigError):
+        load_config({"api_key": "pulse_sk_test", "compression": "brotli"})
+    with pytest.raises(ConfigError):
+        load_config(
+            {"api_key": "pulse_sk_test", "compression": "gzip", "compression_level": 12}
+        )